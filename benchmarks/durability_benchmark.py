@@ -0,0 +1,144 @@
+"""
+Mede o custo de persistência do grafo de resposta em cada modo de durabilidade
+(sync, async, exit) e estratégia de memória.
+
+O grafo tem a mesma forma do workflow real (input_digest -> memory_compaction
+-> main_bot -> formatter), com o main_bot executando um subgrafo de passos
+ReAct, mas os nós não chamam LLMs: o tempo medido é só o de checkpoint.
+
+Uso:
+  uv run python benchmarks/durability_benchmark.py --messages 50 --react-steps 4
+  uv run python benchmarks/durability_benchmark.py --strategies in_memory postgres
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from typing import Annotated, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.graphs.memories.checkpointer import STRATEGIES  # noqa: E402
+
+MODES = ("sync", "async", "exit")
+
+
+class BenchState(TypedDict):
+  messages: Annotated[list, add_messages]
+  chat_input: str
+
+
+def _build_graph(checkpointer, react_steps: int):
+  def react_step(state: BenchState) -> dict:
+    return {"messages": [AIMessage(content="passo " + "x" * 400)]}
+
+  react = StateGraph(BenchState)
+  previous = START
+  for i in range(react_steps):
+    react.add_node(f"step_{i}", react_step)
+    react.add_edge(previous, f"step_{i}")
+    previous = f"step_{i}"
+  react.add_edge(previous, END)
+  agent = react.compile()
+
+  async def input_digest(state: BenchState) -> dict:
+    return {"messages": [HumanMessage(content=state["chat_input"])]}
+
+  async def memory_compaction(state: BenchState) -> dict:
+    return {}
+
+  async def main_bot(state: BenchState) -> dict:
+    result = await agent.ainvoke(state)
+    return {"messages": result["messages"][-react_steps:]}
+
+  async def formatter(state: BenchState) -> dict:
+    return {}
+
+  return (
+    StateGraph(BenchState)
+    .add_node("input_digest", input_digest)
+    .add_node("memory_compaction", memory_compaction)
+    .add_node("main_bot", main_bot)
+    .add_node("formatter", formatter)
+    .add_edge(START, "input_digest")
+    .add_edge("input_digest", "memory_compaction")
+    .add_edge("memory_compaction", "main_bot")
+    .add_edge("main_bot", "formatter")
+    .add_edge("formatter", END)
+    .compile(checkpointer=checkpointer)
+  )
+
+
+def _count_writes(saver, counters: dict[str, int]) -> None:
+  """Envolve aput/aput_writes do saver para contar as gravações."""
+  for name in ("aput", "aput_writes"):
+    original = getattr(saver, name)
+
+    async def counted(*args, _original=original, _name=name, **kwargs):
+      counters[_name] += 1
+      return await _original(*args, **kwargs)
+
+    setattr(saver, name, counted)
+
+
+async def _run(strategy: str, mode: str, messages: int, react_steps: int) -> dict:
+  base = STRATEGIES[strategy]()
+  await base.open()
+  try:
+    saver = await base.get_checkpointer()
+    counters = {"aput": 0, "aput_writes": 0}
+    _count_writes(saver, counters)
+    graph = _build_graph(saver, react_steps)
+    config = {"configurable": {"thread_id": f"bench-{uuid.uuid4()}"}}
+
+    latencies = []
+    for i in range(messages):
+      start = time.perf_counter()
+      await graph.ainvoke(
+        {"chat_input": f"mensagem {i}"}, config=config, durability=mode
+      )
+      latencies.append((time.perf_counter() - start) * 1000)
+
+    await base.reset_thread(config["configurable"]["thread_id"])
+    return {
+      "checkpoints": counters["aput"] / messages,
+      "writes": counters["aput_writes"] / messages,
+      "p50": statistics.median(latencies),
+      "p95": statistics.quantiles(latencies, n=20)[-1],
+    }
+  finally:
+    await base.close()
+
+
+async def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--messages", type=int, default=50)
+  parser.add_argument("--react-steps", type=int, default=4)
+  parser.add_argument(
+    "--strategies", nargs="+", default=["in_memory", "postgres"]
+  )
+  args = parser.parse_args()
+
+  print(
+    f"{'estratégia':<16}{'modo':<8}{'checkpoints/msg':>17}"
+    f"{'writes/msg':>12}{'p50 (ms)':>10}{'p95 (ms)':>10}"
+  )
+  for strategy in args.strategies:
+    for mode in MODES:
+      r = await _run(strategy, mode, args.messages, args.react_steps)
+      print(
+        f"{strategy:<16}{mode:<8}{r['checkpoints']:>17.1f}"
+        f"{r['writes']:>12.1f}{r['p50']:>10.2f}{r['p95']:>10.2f}"
+      )
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
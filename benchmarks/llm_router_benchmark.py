@@ -0,0 +1,95 @@
+"""
+Compara a latência de cauda e a taxa de erro das chamadas de LLM com um único
+modelo, com fallback e com fallback + hedging, usando provedores stub.
+
+O modelo principal responde em --latency segundos, mas uma fração das chamadas
+(--slow-rate) demora --slow-latency segundos e outra fração (--fail-rate)
+falha. O fallback é um stub com a mesma latência base e sem falhas.
+
+Uso:
+  uv run python benchmarks/llm_router_benchmark.py --calls 300 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+from langchain_core.messages import HumanMessage
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.graphs.llm import router  # noqa: E402
+
+
+def _percentile(values: list[float], q: float) -> float:
+  ordered = sorted(values)
+  return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def _run(name: str, model, calls: int, concurrency: int) -> None:
+  router._breakers.clear()
+  router._latencies.clear()
+  semaphore = asyncio.Semaphore(concurrency)
+  latencies: list[float] = []
+  errors = 0
+
+  async def call():
+    nonlocal errors
+    async with semaphore:
+      start = time.perf_counter()
+      try:
+        await model.ainvoke([HumanMessage(content="Qual o consumo de hoje?")])
+      except Exception:
+        errors += 1
+        return
+      latencies.append(time.perf_counter() - start)
+
+  await asyncio.gather(*(call() for _ in range(calls)))
+  print(
+    f"{name:<20}{statistics.median(latencies) * 1000:>10.0f}"
+    f"{_percentile(latencies, 0.95) * 1000:>10.0f}"
+    f"{_percentile(latencies, 0.99) * 1000:>10.0f}"
+    f"{errors / calls:>10.1%}"
+  )
+
+
+async def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--calls", type=int, default=300)
+  parser.add_argument("--concurrency", type=int, default=10)
+  parser.add_argument("--latency", type=float, default=0.2)
+  parser.add_argument("--slow-rate", type=float, default=0.05)
+  parser.add_argument("--slow-latency", type=float, default=3.0)
+  parser.add_argument("--fail-rate", type=float, default=0.02)
+  args = parser.parse_args()
+
+  primary = (
+    f"stub:latency={args.latency},slow_rate={args.slow_rate},"
+    f"slow_latency={args.slow_latency},fail_rate={args.fail_rate}"
+  )
+  fallback = f"stub:latency={args.latency}"
+  names = [primary, fallback]
+
+  def build(hedge: bool):
+    return router.FallbackChatModel(
+      models=[router.StubChatModel.from_spec(n.removeprefix("stub:")) for n in names],
+      names=names,
+      hedge=hedge,
+    )
+
+  print(f"{'cenário':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'erros':>10}")
+  await _run(
+    "único modelo",
+    router.StubChatModel.from_spec(primary.removeprefix("stub:")),
+    args.calls,
+    args.concurrency,
+  )
+  await _run("fallback", build(False), args.calls, args.concurrency)
+  await _run("fallback + hedging", build(True), args.calls, args.concurrency)
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
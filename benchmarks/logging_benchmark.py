@@ -0,0 +1,110 @@
+"""
+Mede o custo de CPU do logging por mensagem processada.
+
+Simula os logs emitidos durante uma mensagem (entrada, nós do grafo, tools,
+resposta), com um estado do LangGraph de tamanho realista, em três cenários:
+
+- antes: f-strings avaliadas sempre e estado completo em INFO, handler síncrono
+- depois (color/json): argumentos lazy, estado em DEBUG, QueueHandler
+
+O tempo de CPU na thread da requisição (thread_time) mostra o que sai do
+caminho da requisição. O tempo de CPU do processo inclui a thread do listener.
+A saída vai para /dev/null.
+
+Uso:
+  uv run python benchmarks/logging_benchmark.py --messages 2000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import logger as logger_module  # noqa: E402
+
+logger = logging.getLogger("benchmark")
+
+
+def _sample_state() -> dict:
+  messages = [
+    {"type": "human", "content": f"pergunta {i} sobre o consumo da fase {i % 3}"}
+    for i in range(10)
+  ] + [
+    {"type": "tool", "content": "| fase | kWh |\n" + "| f1 | 120.5 |\n" * 40}
+    for _ in range(3)
+  ]
+  return {
+    "messages": messages,
+    "messages_history": messages[:10],
+    "formatted_output": [{"output": "O consumo total foi de 361,5 kWh."}],
+    "chat_id": 123456,
+  }
+
+
+def _message_before(state: dict) -> None:
+  chat_id = state["chat_id"]
+  logger.info(f"Processing message from chat ID: {chat_id}")
+  logger.info(f"Invoking LangGraph with user input: {state['messages'][0]}")
+  for tool in ("DataAccess", "WebSearch", "MaintenanceSheet"):
+    logger.info(f"{tool} called: action=consulta, period=hoje")
+  logger.debug(f"Tool payload: {state['messages'][-1]}")
+  logger.info(f"Agent answer: {state['formatted_output']}")
+  logger.info(f"LangGraph response: {state}")
+  logger.info(f"Agent reply: {state['formatted_output']}")
+  logger.info(f"Sending message to chat ID {chat_id}")
+
+
+def _message_after(state: dict) -> None:
+  chat_id = state["chat_id"]
+  logger.info("Processing message from chat ID: %s", chat_id)
+  logger.debug("Invoking LangGraph with user input: %s", state["messages"][0])
+  for tool in ("DataAccess", "WebSearch", "MaintenanceSheet"):
+    logger.info("%s called: action=%s, period=%s", tool, "consulta", "hoje")
+  logger.debug("Tool payload: %s", state["messages"][-1])
+  logger.debug("Agent answer: %s", state["formatted_output"])
+  logger.debug("LangGraph response: %s", state)
+  logger.debug("Agent reply: %s", state["formatted_output"])
+  logger.info("Sending message to chat ID %s", chat_id)
+
+
+def _run(name: str, emit, fmt: str, use_queue: bool, messages: int) -> None:
+  devnull = open(os.devnull, "w")
+  stdout = sys.stdout
+  sys.stdout = devnull
+  try:
+    logger_module.init_logging("INFO", fmt, use_queue)
+    state = _sample_state()
+    thread_start = time.thread_time()
+    process_start = time.process_time()
+    for i in range(messages):
+      with logger_module.log_context(chat_id=state["chat_id"], message_id=i):
+        emit(state)
+    thread_cpu = time.thread_time() - thread_start
+    # Espera o listener esvaziar a fila antes de medir o processo todo
+    logger_module._stop_listener()
+    process_cpu = time.process_time() - process_start
+  finally:
+    sys.stdout = stdout
+    devnull.close()
+  print(
+    f"{name:<22}{thread_cpu / messages * 1e6:>18.1f}"
+    f"{process_cpu / messages * 1e6:>20.1f}"
+  )
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--messages", type=int, default=2000)
+  args = parser.parse_args()
+
+  print(f"{'cenário':<22}{'requisição (us/msg)':>18}{'processo (us/msg)':>20}")
+  _run("antes (color, sync)", _message_before, "color", False, args.messages)
+  _run("depois (color, queue)", _message_after, "color", True, args.messages)
+  _run("depois (json, queue)", _message_after, "json", True, args.messages)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,111 @@
+"""
+Compara requisições por segundo com o DBSessionMiddleware antigo
+(BaseHTTPMiddleware, sessão aberta em toda requisição) e o atual (ASGI puro,
+sessão criada sob demanda).
+
+As requisições vão direto para a aplicação via httpx.ASGITransport, sem rede,
+e o grafo de resposta é substituído por um stub, então o que sobra é o custo
+do FastAPI e dos middlewares. O /bot/chat precisa de SECURITY__TYPE=NONE ou da
+chave em SECURITY__SECRET.
+
+Uso:
+  uv run python benchmarks/middleware_benchmark.py --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+from starlette.middleware.base import BaseHTTPMiddleware
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI  # noqa: E402
+from src.api.routers import bot, health  # noqa: E402
+from src.core.config import settings  # noqa: E402
+from src.core.middleware import DBSessionMiddleware  # noqa: E402
+from src.core.readings_database import (  # noqa: E402
+  AsyncSessionMaker,
+  LazySession,
+  db_session_context,
+)
+
+
+class LegacyDBSessionMiddleware(BaseHTTPMiddleware):
+  """Implementação anterior, mantida aqui apenas para comparação."""
+
+  async def dispatch(self, request, call_next):
+    async with AsyncSessionMaker() as session:
+      holder = LazySession()
+      holder.session = session
+      token = db_session_context.set(holder)
+      try:
+        return await call_next(request)
+      finally:
+        db_session_context.reset(token)
+
+
+class StubGraph:
+  async def ainvoke(self, state, config=None, **kwargs):
+    return {"formatted_output": [{"output": "ok"}]}
+
+
+def _build_app(middleware) -> FastAPI:
+  app = FastAPI()
+  app.add_middleware(middleware)
+  app.include_router(health.router)
+  app.include_router(bot.router, prefix="/bot")
+  app.state.response_generation_graph = StubGraph()
+  return app
+
+
+async def _measure(
+  app: FastAPI, method: str, path: str, total: int, concurrency: int
+) -> float:
+  headers = {"X-Api-Key": settings.security.SECRET.get_secret_value()}
+  body = {"chat_id": 1, "chat_input": "qual o consumo de hoje?"}
+  transport = httpx.ASGITransport(app=app)
+  async with httpx.AsyncClient(
+    transport=transport, base_url="http://bench", headers=headers
+  ) as client:
+    remaining = total
+
+    async def worker():
+      nonlocal remaining
+      while remaining > 0:
+        remaining -= 1
+        if method == "GET":
+          response = await client.get(path)
+        else:
+          response = await client.post(path, json=body)
+        response.raise_for_status()
+
+    # Aquecimento
+    await client.get("/health")
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+
+async def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--requests", type=int, default=2000)
+  parser.add_argument("--concurrency", type=int, default=50)
+  args = parser.parse_args()
+
+  print(f"{'middleware':<12}{'rota':<12}{'req/s':>10}")
+  for name, middleware in (
+    ("legacy", LegacyDBSessionMiddleware),
+    ("asgi", DBSessionMiddleware),
+  ):
+    app = _build_app(middleware)
+    for method, path in (("GET", "/health"), ("POST", "/bot/chat")):
+      rps = await _measure(app, method, path, args.requests, args.concurrency)
+      print(f"{name:<12}{path:<12}{rps:>10.0f}")
+
+
+if __name__ == "__main__":
+  asyncio.run(main())
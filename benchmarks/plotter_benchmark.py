@@ -0,0 +1,143 @@
+"""
+Compara os backends de renderização de gráficos (seaborn x lite).
+
+Cada backend roda em um processo separado para que o custo de importação e o
+pico de memória (RSS) não se misturem entre as medições.
+
+Uso:
+  uv run python benchmarks/plotter_benchmark.py --repeat 20
+"""
+
+import argparse
+import importlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKENDS = {
+  "seaborn": "src.services.plotters.SeabornPlotter",
+  "lite": "src.services.plotters.LitePlotter",
+}
+
+
+def _sample_data() -> dict[str, list[dict]]:
+  """Gera dados sintéticos no mesmo formato retornado pelo repositório."""
+  now = datetime(2025, 1, 15, 12, 0, 0)
+  fases = ["fase1", "fase2", "fase3"]
+  return {
+    "plot_consumo_total_kwh": [
+      {"fase": f, "total_kwh": 120.5 + i * 10, "min_demand_kw": 0.2,
+       "max_demand_kw": 4.1 + i}
+      for i, f in enumerate(fases)
+    ],
+    "plot_picos_demanda": [
+      {"fase": f, "pico_kw": 3.2 + i,
+       "momento": (now - timedelta(hours=i * 5)).isoformat()}
+      for i, f in enumerate(fases)
+    ],
+    "plot_saude_eletrica": [
+      {"fase": f, "voltagem_media": 219.4 + i, "fator_potencia_medio": 0.88 + i * 0.04}
+      for i, f in enumerate(fases)
+    ],
+    "plot_perfil_horario": [
+      {"hora": f"{h}:00", "media_kw_f1": 1.0 + h / 10, "media_kw_f2": 1.2,
+       "media_kw_f3": None if h == 3 else 0.8, "media_geral_kw": 1.1}
+      for h in range(24)
+    ],
+    "plot_desbalanceamento": [
+      {"avg_amp_f1": 10.2, "avg_amp_f2": 12.8, "avg_amp_f3": 9.1,
+       "diferenca_max_amperes": 3.7}
+    ],
+    "plot_anomalias_voltagem": [
+      {"timestamp": (now - timedelta(minutes=i * 35)).isoformat(),
+       "sensor": fases[i % 3], "voltage": 250 - i if i % 2 else 190 + i,
+       "tipo": "ALTA" if i % 2 else "BAIXA", "desvio_pct": 8.5}
+      for i in range(12)
+    ],
+  }
+
+
+def _worker(backend: str, repeat: int) -> dict:
+  """Mede importação, renderização por gráfico e RSS de um backend."""
+  workdir = tempfile.mkdtemp(prefix="plot_bench_")
+  os.chdir(workdir)
+  sys.path.insert(0, ROOT)
+
+  rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  start = time.perf_counter()
+  module = importlib.import_module(BACKENDS[backend])
+  import_ms = (time.perf_counter() - start) * 1000
+
+  charts = {}
+  for func_name, data in _sample_data().items():
+    func = getattr(module, func_name)
+    func(data, "ultimos_7_dias", f"warmup_{func_name}")
+    timings = []
+    for i in range(repeat):
+      start = time.perf_counter()
+      path = func(data, "ultimos_7_dias", f"{func_name}_{i}")
+      timings.append((time.perf_counter() - start) * 1000)
+      if not os.path.isfile(path):
+        raise RuntimeError(f"{backend}.{func_name} failed: {path}")
+    timings.sort()
+    charts[func_name] = {
+      "mean_ms": sum(timings) / len(timings),
+      "p50_ms": timings[len(timings) // 2],
+      "max_ms": timings[-1],
+    }
+
+  rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  return {
+    "backend": backend,
+    "import_ms": import_ms,
+    "charts": charts,
+    "max_rss_mb": rss_after / 1024,
+    "rss_growth_mb": (rss_after - rss_before) / 1024,
+  }
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--repeat", type=int, default=10)
+  parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+  parser.add_argument("--worker", choices=list(BACKENDS), help=argparse.SUPPRESS)
+  args = parser.parse_args()
+
+  if args.worker:
+    print(json.dumps(_worker(args.worker, args.repeat)))
+    return
+
+  results = []
+  for backend in args.backends:
+    output = subprocess.run(
+      [sys.executable, os.path.abspath(__file__), "--worker", backend,
+       "--repeat", str(args.repeat)],
+      check=True,
+      capture_output=True,
+      text=True,
+    ).stdout
+    results.append(json.loads(output.strip().splitlines()[-1]))
+
+  header = f"{'chart':<26}" + "".join(f"{r['backend'] + ' mean/p50 (ms)':>28}" for r in results)
+  print(header)
+  print("-" * len(header))
+  for chart in results[0]["charts"]:
+    row = f"{chart:<26}"
+    for r in results:
+      c = r["charts"][chart]
+      row += f"{c['mean_ms']:>18.1f} / {c['p50_ms']:<7.1f}"
+    print(row)
+  print("-" * len(header))
+  print(f"{'import (ms)':<26}" + "".join(f"{r['import_ms']:>28.1f}" for r in results))
+  print(f"{'max RSS (MB)':<26}" + "".join(f"{r['max_rss_mb']:>28.1f}" for r in results))
+  print(f"{'RSS growth (MB)':<26}" + "".join(f"{r['rss_growth_mb']:>28.1f}" for r in results))
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,117 @@
+"""
+Mede vazão e latência do grafo de resposta completo sem rede, reproduzindo as
+chamadas de LLM, Tavily, API de medições e Google Sheets gravadas em
+FIXTURES__DIR (ver src/core/fixtures.py).
+
+Primeiro grave as fixtures uma vez, com as chaves reais no .env e as mesmas
+perguntas; depois o replay roda em qualquer máquina ou no CI. A memória é
+in_memory e é apagada antes de cada rodada, para que toda rodada faça as
+mesmas requisições, e o horário fica congelado em FIXTURES__FROZEN_NOW.
+
+Cada linha do arquivo de perguntas é um JSON com "chat_id" e "input", como no
+BatchService.
+
+Uso:
+  uv run python benchmarks/replay_benchmark.py perguntas.jsonl --record
+  uv run python benchmarks/replay_benchmark.py perguntas.jsonl --concurrency 1 4 16
+  uv run python benchmarks/replay_benchmark.py perguntas.jsonl --no-latency --profile replay.prof
+"""
+
+import argparse
+import asyncio
+import cProfile
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _configure(args: argparse.Namespace) -> None:
+  # Precisa acontecer antes do primeiro import de src, que carrega as settings
+  os.environ["FIXTURES__MODE"] = "record" if args.record else "replay"
+  os.environ.setdefault("FIXTURES__FROZEN_NOW", "2025-06-02T10:00:00")
+  os.environ["MEMORY__STRATEGY"] = "in_memory"
+  # Sem cache de respostas, a mesma pergunta gera as mesmas chamadas em toda rodada
+  os.environ["ANSWER_CACHE__ENABLED"] = "False"
+  os.environ["RATE_LIMIT__MAX_CONCURRENT_RUNS"] = str(max(args.concurrency))
+  if args.no_latency:
+    os.environ["FIXTURES__LATENCY_SECONDS"] = "{}"
+
+
+async def _round(graph, checkpointer, items: list[dict], concurrency: int) -> dict:
+  from src.services.BatchService import run_batch
+
+  summary: dict = {}
+  failures: list[str] = []
+  async for result in run_batch(graph, items, concurrency, checkpointer):
+    if "summary" in result:
+      summary = result["summary"]
+    elif result.get("error"):
+      failures.append(f"item {result['index']}: {result['error']}")
+  for failure in failures[:5]:
+    print(f"  erro em {failure}")
+  return summary
+
+
+async def main(args: argparse.Namespace) -> None:
+  from src.graphs.builder import get_response_generation_workflow
+  from src.graphs.memories.checkpointer import get_base_checkpointer
+  from src.services.BatchService import parse_items
+
+  with open(args.input, encoding="utf-8") as f:
+    items = parse_items(f)
+
+  base_checkpointer = get_base_checkpointer()
+  await base_checkpointer.open()
+  try:
+    graph = get_response_generation_workflow(await base_checkpointer.get_checkpointer())
+    if args.record:
+      summary = await _round(graph, base_checkpointer, items, 1)
+      print(f"Gravadas as chamadas de {summary['items']} perguntas ({summary['errors']} erros)")
+      return
+
+    print(
+      f"{'concorrência':>12}{'itens':>7}{'erros':>7}{'msg/s':>8}"
+      f"{'média (ms)':>12}{'p50 (ms)':>10}{'p95 (ms)':>10}"
+    )
+    for concurrency in args.concurrency:
+      for _ in range(args.rounds):
+        started_at = time.perf_counter()
+        s = await _round(graph, base_checkpointer, items, concurrency)
+        throughput = s["items"] / (time.perf_counter() - started_at)
+        print(
+          f"{concurrency:>12}{s['items']:>7}{s['errors']:>7}{throughput:>8.2f}"
+          f"{s['latency_ms_avg'] or 0:>12.1f}{s['latency_ms_p50'] or 0:>10.1f}"
+          f"{s['latency_ms_p95'] or 0:>10.1f}"
+        )
+  finally:
+    await base_checkpointer.close()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+    description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+  )
+  parser.add_argument("input", help="Arquivo JSONL com chat_id e input por linha")
+  parser.add_argument(
+    "--record", action="store_true", help="Faz as chamadas reais e grava as fixtures"
+  )
+  parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+  parser.add_argument("--rounds", type=int, default=1, help="Rodadas por concorrência")
+  parser.add_argument(
+    "--no-latency",
+    action="store_true",
+    help="Replay sem latência simulada, para medir só o custo do próprio processo",
+  )
+  parser.add_argument("--profile", help="Grava um perfil do cProfile neste arquivo")
+  args = parser.parse_args()
+  _configure(args)
+
+  if args.profile:
+    profiler = cProfile.Profile()
+    profiler.runcall(asyncio.run, main(args))
+    profiler.dump_stats(args.profile)
+    print(f"Perfil salvo em {args.profile} (veja com: python -m pstats {args.profile})")
+  else:
+    asyncio.run(main(args))
@@ -0,0 +1,115 @@
+"""
+Relatório de tempo de inicialização da aplicação.
+
+Executa `import main` com `python -X importtime` em um processo limpo e agrega o
+custo de importação por pacote de terceiros e por módulo do projeto. Com
+`--serve`, também sobe o uvicorn e mede o tempo até o `/health` responder.
+
+Uso:
+  uv run python benchmarks/startup_profile.py --top 25
+  uv run python benchmarks/startup_profile.py --serve --port 8010
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+  """Retorna (módulo, self_us, cumulative_us) de cada linha do -X importtime."""
+  entries = []
+  for line in stderr.splitlines():
+    if not line.startswith("import time:") or "[us]" in line:
+      continue
+    self_us, cumulative_us, module = line.split(":", 1)[1].split("|")
+    entries.append((module.strip(), int(self_us), int(cumulative_us)))
+  return entries
+
+
+def profile_imports(top: int) -> None:
+  start = time.perf_counter()
+  result = subprocess.run(
+    [sys.executable, "-X", "importtime", "-c", "import main"],
+    cwd=ROOT,
+    capture_output=True,
+    text=True,
+  )
+  wall_ms = (time.perf_counter() - start) * 1000
+  if result.returncode != 0:
+    print(result.stderr[-2000:])
+    raise SystemExit("Falha ao importar main.py")
+
+  entries = _parse_importtime(result.stderr)
+
+  # Custo próprio agregado por pacote de topo (langchain, pandas, ...)
+  by_package: dict[str, int] = defaultdict(int)
+  for module, self_us, _ in entries:
+    by_package[module.split(".")[0]] += self_us
+
+  # Custo cumulativo dos módulos do projeto (o que cada um puxa consigo)
+  first_party = [
+    (module, cumulative_us)
+    for module, _, cumulative_us in entries
+    if module == "main" or module.startswith("src.")
+  ]
+
+  total_us = sum(by_package.values())
+  print(f"Wall time de `import main`: {wall_ms:.0f} ms")
+  print(f"Soma do tempo de importação: {total_us / 1000:.0f} ms\n")
+
+  print(f"{'pacote':<40}{'self (ms)':>12}{'%':>8}")
+  for package, self_us in sorted(by_package.items(), key=lambda x: -x[1])[:top]:
+    print(f"{package:<40}{self_us / 1000:>12.1f}{100 * self_us / total_us:>8.1f}")
+
+  print(f"\n{'módulo do projeto':<60}{'cumulativo (ms)':>16}")
+  for module, cumulative_us in sorted(first_party, key=lambda x: -x[1])[:top]:
+    print(f"{module:<60}{cumulative_us / 1000:>16.1f}")
+
+
+def profile_serve(port: int, timeout: float) -> None:
+  start = time.perf_counter()
+  process = subprocess.Popen(
+    [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+    cwd=ROOT,
+    stdout=subprocess.DEVNULL,
+    stderr=subprocess.DEVNULL,
+  )
+  try:
+    while time.perf_counter() - start < timeout:
+      try:
+        response = httpx.get(f"http://127.0.0.1:{port}/health", timeout=0.5)
+        if response.status_code == 200:
+          elapsed = time.perf_counter() - start
+          print(f"\nTempo até /health saudável: {elapsed * 1000:.0f} ms")
+          return
+      except httpx.HTTPError:
+        pass
+      time.sleep(0.05)
+    print(f"\n/health não respondeu em {timeout:.0f} s")
+  finally:
+    process.terminate()
+    process.wait()
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--top", type=int, default=20)
+  parser.add_argument("--serve", action="store_true")
+  parser.add_argument("--port", type=int, default=8010)
+  parser.add_argument("--timeout", type=float, default=120)
+  args = parser.parse_args()
+
+  profile_imports(args.top)
+  if args.serve:
+    profile_serve(args.port, args.timeout)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,446 @@
+"""
+Teste de carga ponta a ponta do caminho do Telegram. Envia updates sintéticos
+(texto, voz, foto e foto com legenda) para /telegram/webhook em taxas
+crescentes e sobe, no lugar da Bot API, um servidor local que recebe os
+send_message/send_photo do bot e serve os arquivos de voz e foto.
+
+Para cada taxa, relata a vazão, os percentis da latência até a primeira
+resposta e as mensagens perdidas (sem resposta em --timeout segundos). Também
+conta os avisos de limite e de sobrecarga e as respostas de erro. Do /metrics
+do servidor vêm os travamentos do event loop e as tarefas do webhook que
+falharam.
+
+Cada mensagem vai para um chat novo, e a sequência de mensagens depende só de
+--seed, --rates e --duration. Assim, um replay das fixtures (ver
+benchmarks/replay_benchmark.py) encontra as mesmas requisições gravadas com os
+mesmos argumentos e FIXTURES__MODE=record. Use --media-dir com voice.ogg e
+photo.jpg reais ao gravar transcrições e descrições de imagem.
+
+Com --serve, o script sobe o uvicorn já apontado para a Bot API local, repassando
+o ambiente atual (ex.: FIXTURES__MODE=replay). Sem --serve, suba a aplicação com
+BOT__TELEGRAM_API_URL=http://127.0.0.1:8081/bot e
+BOT__TELEGRAM_FILE_URL=http://127.0.0.1:8081/file/bot.
+
+Uso:
+  FIXTURES__MODE=replay uv run python benchmarks/telegram_load_test.py --serve --rates 1 2 5 10
+  uv run python benchmarks/telegram_load_test.py --url http://127.0.0.1:8000 --mix text=1 --duration 60
+"""
+
+import argparse
+import asyncio
+import email.parser
+import email.policy
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import urllib.parse
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.services.BatchService import parse_items  # noqa: E402
+from src.services.GraphService import ERROR_REPLY  # noqa: E402
+from src.services.TelegramService import OVERLOADED_REPLY, RATE_LIMITED_REPLY  # noqa: E402
+
+DEFAULT_QUESTIONS = [
+  "Qual foi o consumo de ontem?",
+  "Quais foram os picos de demanda na semana passada?",
+  "Como está o fator de potência nos últimos 7 dias?",
+  "Me mostra um gráfico do perfil horário dos últimos 30 dias",
+  "Quais as últimas manutenções do ar-condicionado?",
+  "As fases estão desbalanceadas? O que devo fazer?",
+]
+KINDS = ("text", "voice", "photo", "caption")
+FIRST_CHAT_ID = 900_000_000
+
+
+class Pending:
+  def __init__(self, kind: str, sent_at: float):
+    self.kind = kind
+    self.sent_at = sent_at
+    self.replied_at: float | None = None
+    self.category: str | None = None
+    self.replies = 0
+
+
+class FakeBotApi:
+  """
+  Imita os métodos da Bot API usados pelo bot: sendMessage, sendPhoto,
+  getFile e o download de arquivos. Cada resposta é associada à mensagem
+  pendente do chat.
+  """
+
+  def __init__(self, media: dict[str, bytes]):
+    self.media = media
+    self.pending: dict[int, Pending] = {}
+    self.unexpected = 0
+    self.next_message_id = 1
+    self.app = FastAPI()
+    self.app.add_api_route("/bot{token}/{method}", self.call, methods=["POST"])
+    self.app.add_api_route("/file/bot{token}/{file_path:path}", self.download, methods=["GET"])
+
+  @staticmethod
+  async def _params(request: Request) -> dict[str, str]:
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/"):
+      message = email.parser.BytesParser(policy=email.policy.default).parsebytes(
+        b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body
+      )
+      return {
+        part.get_param("name", header="content-disposition"): part.get_content()
+        for part in message.iter_parts()
+        if part.get_filename() is None
+      }
+    if content_type.startswith("application/json"):
+      return {k: str(v) for k, v in json.loads(body or b"{}").items()}
+    return {k: v[0] for k, v in urllib.parse.parse_qs(body.decode()).items()}
+
+  def _reply(self, chat_id: int, text: str | None) -> None:
+    pending = self.pending.get(chat_id)
+    if pending is None:
+      self.unexpected += 1
+      return
+    pending.replies += 1
+    if pending.replied_at is None:
+      pending.replied_at = time.perf_counter()
+      pending.category = {
+        RATE_LIMITED_REPLY: "rate_limited",
+        OVERLOADED_REPLY: "overloaded",
+        ERROR_REPLY["output"]: "error",
+      }.get(text or "", "ok")
+
+  def _message(self, chat_id: int, **fields) -> dict:
+    self.next_message_id += 1
+    return {
+      "message_id": self.next_message_id,
+      "date": int(time.time()),
+      "chat": {"id": chat_id, "type": "private"},
+      **fields,
+    }
+
+  async def call(self, token: str, method: str, request: Request) -> dict:
+    params = await self._params(request)
+    if method == "sendMessage":
+      chat_id = int(params["chat_id"])
+      self._reply(chat_id, params.get("text"))
+      return {"ok": True, "result": self._message(chat_id, text=params.get("text", ""))}
+    if method == "sendPhoto":
+      chat_id = int(params["chat_id"])
+      self._reply(chat_id, None)
+      photo = [{"file_id": f"plot-{self.next_message_id}", "file_unique_id": "plot", "width": 800, "height": 600}]
+      return {"ok": True, "result": self._message(chat_id, photo=photo)}
+    if method == "getFile":
+      file_id = params["file_id"]
+      kind = file_id.split("-")[0]
+      return {
+        "ok": True,
+        "result": {
+          "file_id": file_id,
+          "file_unique_id": file_id,
+          "file_size": len(self.media[kind]),
+          "file_path": f"{kind}/{file_id}",
+        },
+      }
+    if method == "getMe":
+      return {"ok": True, "result": {"id": 1, "is_bot": True, "first_name": "Carga", "username": "carga_bot"}}
+    return {"ok": True, "result": True}
+
+  async def download(self, token: str, file_path: str) -> Response:
+    return Response(self.media[file_path.split("/")[0]], media_type="application/octet-stream")
+
+
+def _load_media(media_dir: str | None) -> dict[str, bytes]:
+  """Arquivos servidos no getFile; sem --media-dir, bytes sintéticos fixos."""
+  rng = random.Random(0)
+  media = {
+    "voice": b"OggS" + rng.randbytes(16_000),
+    "photo": b"\xff\xd8\xff\xe0" + rng.randbytes(60_000) + b"\xff\xd9",
+  }
+  for kind, name in (("voice", "voice.ogg"), ("photo", "photo.jpg")):
+    if media_dir and os.path.exists(os.path.join(media_dir, name)):
+      with open(os.path.join(media_dir, name), "rb") as f:
+        media[kind] = f.read()
+  return media
+
+
+def _parse_mix(spec: str) -> dict[str, float]:
+  mix = {}
+  for item in spec.split(","):
+    kind, _, weight = item.partition("=")
+    if kind not in KINDS:
+      raise SystemExit(f"Tipo desconhecido em --mix: {kind} (opções: {', '.join(KINDS)})")
+    mix[kind] = float(weight)
+  return mix
+
+
+def _update(index: int, chat_id: int, kind: str, question: str, media: dict[str, bytes]) -> dict:
+  """Update no formato enviado pelo Telegram ao webhook."""
+  message: dict = {
+    "message_id": index,
+    "date": int(time.time()),
+    "chat": {"id": chat_id, "type": "private", "first_name": "Carga"},
+    "from": {"id": chat_id, "is_bot": False, "first_name": "Carga", "last_name": "Sintética"},
+  }
+  if kind == "text":
+    message["text"] = question
+  elif kind == "voice":
+    message["voice"] = {
+      "file_id": f"voice-{index}",
+      "file_unique_id": f"voice{index}",
+      "duration": 4,
+      "mime_type": "audio/ogg",
+      "file_size": len(media["voice"]),
+    }
+  else:
+    message["photo"] = [
+      {
+        "file_id": f"photo-{index}",
+        "file_unique_id": f"photo{index}",
+        "width": 1280,
+        "height": 720,
+        "file_size": len(media["photo"]),
+      }
+    ]
+    if kind == "caption":
+      message["caption"] = question
+  return {"update_id": index, "message": message}
+
+
+def _parse_metrics(text: str) -> dict[str, float]:
+  values = {}
+  for line in text.splitlines():
+    if line and not line.startswith("#"):
+      name, _, value = line.rpartition(" ")
+      values[name] = float(value.replace("+Inf", "inf"))
+  return values
+
+
+async def _scrape(client: httpx.AsyncClient, url: str) -> dict[str, float]:
+  try:
+    response = await client.get(f"{url}/metrics", timeout=5)
+    return _parse_metrics(response.text)
+  except httpx.HTTPError:
+    return {}
+
+
+def _server_stats(before: dict[str, float], after: dict[str, float]) -> dict[str, float]:
+  def delta(name: str) -> float:
+    return after.get(name, 0) - before.get(name, 0)
+
+  lag = "leia_event_loop_lag_seconds"
+  samples = delta(f"{lag}_count")
+  return {
+    "loop_lag_ms_avg": delta(f"{lag}_sum") / samples * 1000 if samples else 0.0,
+    "loop_stalls_100ms": samples - delta(f'{lag}_bucket{{le="0.1"}}'),
+    "loop_stalls_1s": samples - delta(f'{lag}_bucket{{le="1"}}'),
+    "task_errors": delta('leia_webhook_tasks_total{status="error"}')
+    + delta('leia_webhook_tasks_total{status="cancelled"}'),
+    "queue_depth": after.get("leia_webhook_queue_depth", 0),
+  }
+
+
+def _percentile(values: list[float], q: float) -> float:
+  if not values:
+    return 0.0
+  ordered = sorted(values)
+  return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def _run_stage(
+  client: httpx.AsyncClient,
+  api: FakeBotApi,
+  args: argparse.Namespace,
+  rate: float,
+  messages: list[tuple[int, str, str]],
+) -> dict:
+  api.pending.clear()
+  api.unexpected = 0
+  acks: list[float] = []
+  http_errors = 0
+  rng = random.Random(args.seed)
+  headers = {"X-Api-Key": args.api_key} if args.api_key else {}
+
+  async def send(index: int, kind: str, question: str) -> None:
+    nonlocal http_errors
+    chat_id = FIRST_CHAT_ID + index
+    body = _update(index, chat_id, kind, question, api.media)
+    api.pending[chat_id] = Pending(kind, time.perf_counter())
+    started_at = time.perf_counter()
+    try:
+      response = await client.post(
+        f"{args.url}/telegram/webhook", json=body, headers=headers, timeout=30
+      )
+      if response.status_code != 200:
+        http_errors += 1
+    except httpx.HTTPError:
+      http_errors += 1
+    acks.append(time.perf_counter() - started_at)
+
+  before = await _scrape(client, args.url)
+  started_at = time.perf_counter()
+  next_at = started_at
+  senders = []
+  # Chegadas de Poisson (carga aberta): a taxa não cai quando o servidor atrasa
+  for index, kind, question in messages:
+    await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+    senders.append(asyncio.create_task(send(index, kind, question)))
+    next_at += rng.expovariate(rate)
+  await asyncio.gather(*senders)
+
+  deadline = time.perf_counter() + args.timeout
+  while time.perf_counter() < deadline and any(
+    p.replied_at is None for p in api.pending.values()
+  ):
+    await asyncio.sleep(0.1)
+  # Dá tempo de chegarem as partes seguintes das respostas em várias mensagens
+  await asyncio.sleep(1)
+  after = await _scrape(client, args.url)
+
+  replied = [p for p in api.pending.values() if p.replied_at is not None]
+  ok = [p for p in replied if p.category == "ok"]
+  latencies = [p.replied_at - p.sent_at for p in ok]
+  finished_at = max((p.replied_at for p in replied), default=time.perf_counter())
+  return {
+    "rate": rate,
+    "sent": len(messages),
+    "ok": len(ok),
+    "lost": len(messages) - len(replied),
+    "rate_limited": sum(p.category == "rate_limited" for p in replied),
+    "overloaded": sum(p.category == "overloaded" for p in replied),
+    "errors": sum(p.category == "error" for p in replied),
+    "http_errors": http_errors,
+    "replies": sum(p.replies for p in replied),
+    "unexpected_replies": api.unexpected,
+    "throughput": len(ok) / (finished_at - started_at) if ok else 0.0,
+    "latency_p50": _percentile(latencies, 0.5),
+    "latency_p95": _percentile(latencies, 0.95),
+    "latency_p99": _percentile(latencies, 0.99),
+    "latency_max": max(latencies, default=0.0),
+    "latency_by_kind": {
+      kind: round(statistics.median(values), 3)
+      for kind in KINDS
+      if (values := [p.replied_at - p.sent_at for p in ok if p.kind == kind])
+    },
+    "ack_p95": _percentile(acks, 0.95),
+    "ack_max": max(acks, default=0.0),
+    **_server_stats(before, after),
+  }
+
+
+def _messages(args: argparse.Namespace, questions: list[str]) -> list[list[tuple[int, str, str]]]:
+  """Sequência de mensagens de cada etapa, determinística para o mesmo --seed."""
+  rng = random.Random(args.seed)
+  mix = _parse_mix(args.mix)
+  stages, index = [], 0
+  for rate in args.rates:
+    stage = []
+    for _ in range(max(1, round(rate * args.duration))):
+      kind = rng.choices(list(mix), weights=list(mix.values()))[0]
+      stage.append((index, kind, questions[index % len(questions)]))
+      index += 1
+    stages.append(stage)
+  return stages
+
+
+def _start_server(args: argparse.Namespace) -> subprocess.Popen:
+  api_url = f"http://127.0.0.1:{args.api_port}"
+  env = {
+    **os.environ,
+    "BOT__TELEGRAM_API_URL": f"{api_url}/bot",
+    "BOT__TELEGRAM_FILE_URL": f"{api_url}/file/bot",
+  }
+  log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+  port = urllib.parse.urlparse(args.url).port or 8000
+  return subprocess.Popen(
+    [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+    cwd=ROOT,
+    env=env,
+    stdout=log,
+    stderr=subprocess.STDOUT,
+  )
+
+
+async def _wait_for_server(client: httpx.AsyncClient, url: str, timeout: float) -> None:
+  deadline = time.perf_counter() + timeout
+  while time.perf_counter() < deadline:
+    try:
+      # /health pode responder 503 sem o banco de leituras, mas o app já subiu
+      await client.get(f"{url}/health", timeout=1)
+      return
+    except httpx.HTTPError:
+      await asyncio.sleep(0.2)
+  raise SystemExit(f"O servidor não respondeu em {url} após {timeout:.0f} s")
+
+
+async def main(args: argparse.Namespace) -> None:
+  questions = DEFAULT_QUESTIONS
+  if args.questions:
+    with open(args.questions, encoding="utf-8") as f:
+      questions = [str(item["input"]) for item in parse_items(f)]
+
+  api = FakeBotApi(_load_media(args.media_dir))
+  api_server = uvicorn.Server(
+    uvicorn.Config(api.app, host="127.0.0.1", port=args.api_port, log_level="warning")
+  )
+  api_task = asyncio.create_task(api_server.serve())
+  process = _start_server(args) if args.serve else None
+  results = []
+  try:
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=200)) as client:
+      await _wait_for_server(client, args.url, args.startup_timeout)
+      print(
+        f"{'msg/s':>6}{'enviadas':>9}{'ok':>6}{'perdidas':>9}{'limite':>7}{'sobrec.':>8}"
+        f"{'erros':>6}{'vazão':>7}{'p50 (s)':>8}{'p95 (s)':>8}{'p99 (s)':>8}"
+        f"{'ack p95':>8}{'loop>100ms':>11}{'tarefas c/ erro':>16}"
+      )
+      for rate, messages in zip(args.rates, _messages(args, questions)):
+        r = await _run_stage(client, api, args, rate, messages)
+        results.append(r)
+        print(
+          f"{rate:>6g}{r['sent']:>9}{r['ok']:>6}{r['lost']:>9}{r['rate_limited']:>7}"
+          f"{r['overloaded']:>8}{r['errors']:>6}{r['throughput']:>7.2f}"
+          f"{r['latency_p50']:>8.2f}{r['latency_p95']:>8.2f}{r['latency_p99']:>8.2f}"
+          f"{r['ack_p95']:>8.3f}{r['loop_stalls_100ms']:>11.0f}{r['task_errors']:>16.0f}"
+        )
+  finally:
+    if process is not None:
+      process.terminate()
+      process.wait()
+    api_server.should_exit = True
+    await api_task
+
+  if args.output:
+    with open(args.output, "w", encoding="utf-8") as f:
+      json.dump(results, f, ensure_ascii=False, indent=2)
+  if any(r["lost"] or r["task_errors"] or r["http_errors"] for r in results):
+    print("\nHouve mensagens perdidas ou tarefas com erro; veja o log do servidor.")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+    description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+  )
+  parser.add_argument("--url", default="http://127.0.0.1:8000", help="URL base da aplicação")
+  parser.add_argument("--api-key", help="Valor do X-Api-Key, com SECURITY__TYPE=APIKEY")
+  parser.add_argument("--api-port", type=int, default=8081, help="Porta da Bot API local")
+  parser.add_argument("--rates", type=float, nargs="+", default=[1, 2, 5], help="Mensagens por segundo em cada etapa")
+  parser.add_argument("--duration", type=float, default=20, help="Segundos de envio por etapa")
+  parser.add_argument("--mix", default="text=0.7,voice=0.1,photo=0.1,caption=0.1")
+  parser.add_argument("--questions", help="JSONL com \"input\" por linha (formato do BatchService)")
+  parser.add_argument("--media-dir", help="Pasta com voice.ogg e photo.jpg servidos pela Bot API local")
+  parser.add_argument("--timeout", type=float, default=120, help="Espera máxima por respostas ao fim de cada etapa")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--serve", action="store_true", help="Sobe o uvicorn apontado para a Bot API local")
+  parser.add_argument("--server-log", help="Arquivo para a saída do servidor com --serve")
+  parser.add_argument("--startup-timeout", type=float, default=60)
+  parser.add_argument("-o", "--output", help="Grava os resultados de cada etapa em JSON")
+  asyncio.run(main(parser.parse_args()))
@@ -1,9 +1,15 @@
+import asyncio
 import logging
+import time
 from fastapi import FastAPI
 from fastapi.concurrency import asynccontextmanager
 
-from src.core.middleware import DBSessionMiddleware
+from src.core import metrics as core_metrics
+from src.core.config import settings
+from src.core.middleware import DBSessionMiddleware, MetricsMiddleware
+from src.graphs.llm import tokens
 from src.api.routers import health
+from src.api.routers import metrics
 from src.api.routers import bot
 from src.api.routers import telegram
 from src.graphs.builder import (
@@ -16,6 +22,7 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+  started_at = time.perf_counter()
   try:
     logger.info("Iniciando a aplicação...")
     app.state.base_checkpointer = get_base_checkpointer()
@@ -26,6 +33,18 @@ async def lifespan(app: FastAPI):
       checkpointer
     )
     logger.info("Grafo de geração de respostas compilado com sucesso")
+    # O prompt do agente conta tokens dentro do event loop; o primeiro uso do
+    # tiktoken pode baixar o encoding, então ele é carregado aqui
+    await asyncio.to_thread(tokens._encoding)
+    loop_watcher = asyncio.create_task(
+      core_metrics.watch_event_loop(
+        settings.health.EVENT_LOOP_LAG_INTERVAL_SECONDS,
+        settings.health.EVENT_LOOP_LAG_WARN_SECONDS,
+      )
+    )
+    logger.info(
+      "Aplicação iniciada em %.0f ms", (time.perf_counter() - started_at) * 1000
+    )
   except Exception:
     logger.critical(
       "Falha crítica durante a inicialização da aplicação.", exc_info=True
@@ -35,6 +54,12 @@ async def lifespan(app: FastAPI):
   yield
 
   logger.info("Aplicação sendo finalizada...")
+  loop_watcher.cancel()
+  if telegram.pending_tasks():
+    logger.warning(
+      "Encerrando com %s mensagens do Telegram ainda em processamento",
+      telegram.pending_tasks(),
+    )
   try:
     if hasattr(app.state, "base_checkpointer") and app.state.base_checkpointer:
       await app.state.base_checkpointer.close()
@@ -54,6 +79,8 @@ app = FastAPI(
 )
 
 app.add_middleware(DBSessionMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.include_router(health.router, tags=["Health"])
+app.include_router(metrics.router, tags=["Metrics"])
 app.include_router(bot.router, prefix="/bot", tags=["Bot"])
 app.include_router(telegram.router, prefix="/telegram", tags=["Telegram"])
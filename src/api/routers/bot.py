@@ -1,11 +1,14 @@
+import json
 import logging
-from fastapi import APIRouter, Request
+import math
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 
 from src.core.security import validate_security
 
 from ..schemas.Chat import ChatRequest
 from ..schemas.Reset import ResetRequest
-from ...services import GraphService
+from ...services import BatchService, GraphService, RateLimiter
 
 from fastapi import Depends
 
@@ -23,19 +26,82 @@ async def chat(request: Request, body: ChatRequest):
   """
   Recebe uma mensagem e um ID de chat, invoca o agente e retorna a resposta.
   """
-  logger.info(
-    f"Received chat request with chat ID: {body.chat_id} and input: {body.chat_input}"
-  )
-  replies = await GraphService.invoke_response_generation_graph(
-    request.app.state.response_generation_graph,
-    body.chat_id,
-    "",
-    body.chat_input,
-    "Desconhecido"
-  )
+  logger.info("Received chat request with chat ID: %s", body.chat_id)
+  logger.debug("Chat input: %s", body.chat_input)
+  try:
+    await RateLimiter.check(
+      "api_key", RateLimiter.api_key_id(request.headers.get("x-api-key"))
+    )
+    await RateLimiter.check("chat", body.chat_id)
+    replies = await GraphService.invoke_response_generation_graph(
+      request.app.state.response_generation_graph,
+      body.chat_id,
+      0,
+      "",
+      "Desconhecido",
+      body.chat_input,
+    )
+  except RateLimiter.RateLimited as e:
+    logger.warning("Rate limited chat request (%s) for chat ID: %s", e.scope, body.chat_id)
+    raise HTTPException(
+      status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+      detail=f"Rate limit exceeded ({e.scope})",
+      headers={"Retry-After": str(math.ceil(e.retry_after))},
+    )
+  except RateLimiter.Overloaded:
+    logger.warning("Rejected chat request for chat ID %s: server overloaded", body.chat_id)
+    raise HTTPException(
+      status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+      detail="Server is at capacity, try again shortly",
+      headers={"Retry-After": "1"},
+    )
   return replies
 
 
+@router.post(
+  "/chat/batch",
+  response_class=StreamingResponse,
+  summary="Executa um lote de mensagens para avaliação offline",
+  dependencies=[Depends(validate_security)],
+)
+async def chat_batch(
+  request: Request, concurrency: int | None = None, reset: bool = False
+):
+  """
+  Recebe um JSONL com "chat_id" e "input" por linha e devolve, em streaming
+  (application/x-ndjson), um resultado por item assim que fica pronto, com
+  latência, tokens e ferramentas usadas, seguido de uma linha "summary". Com
+  reset=true, a memória de cada chat é apagada antes de começar.
+  """
+  body = await request.body()
+  try:
+    items = BatchService.parse_items(body.decode("utf-8").splitlines())
+  except ValueError as e:
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+  try:
+    await RateLimiter.check(
+      "api_key", RateLimiter.api_key_id(request.headers.get("x-api-key"))
+    )
+  except RateLimiter.RateLimited as e:
+    raise HTTPException(
+      status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+      detail=f"Rate limit exceeded ({e.scope})",
+      headers={"Retry-After": str(math.ceil(e.retry_after))},
+    )
+  logger.info("Received batch request with %s items", len(items))
+
+  async def stream():
+    async for result in BatchService.run_batch(
+      request.app.state.response_generation_graph,
+      items,
+      concurrency,
+      request.app.state.base_checkpointer if reset else None,
+    ):
+      yield json.dumps(result, ensure_ascii=False, default=str) + "\n"
+
+  return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.post(
   "/reset",
   response_model=list[dict[str, str]],
@@ -46,7 +112,7 @@ async def reset(request: Request, body: ResetRequest):
   """
   Apaga o histórico de uma conversa baseado no ID de chat.
   """
-  logger.info(f"Received reset request for chat ID: {body.chat_id}")
+  logger.info("Received reset request for chat ID: %s", body.chat_id)
   await GraphService.reset_conversation_memory(
     request.app.state.base_checkpointer, body.chat_id
   )
@@ -1,5 +1,10 @@
 import logging
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+
+from src.core.readings_database import get_pool_stats
+from src.core.security import validate_security
+from src.services import HealthService
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -12,3 +17,49 @@ router = APIRouter()
 )
 async def health():
   return {"success": True}
+
+
+@router.get(
+  "/health/live",
+  response_model=dict[str, bool],
+  summary="Verifica se o processo está respondendo",
+)
+async def live():
+  """
+  Liveness: não consulta dependências, para que uma falha externa não faça o
+  orquestrador reiniciar réplicas saudáveis.
+  """
+  return {"success": True}
+
+
+@router.get(
+  "/health/ready",
+  summary="Verifica se a réplica pode receber tráfego",
+  responses={503: {"description": "Alguma dependência obrigatória falhou"}},
+)
+async def ready(request: Request):
+  """
+  Readiness: verifica checkpointer, banco de leituras, API de medições e
+  prompts. Retorna 503 se alguma dependência obrigatória falhar.
+  """
+  report = await HealthService.check_readiness(
+    request.app.state.base_checkpointer
+  )
+  return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+@router.get(
+  "/health/pools",
+  response_model=dict[str, dict[str, int | float]],
+  summary="Estatísticas dos pools de conexão",
+  dependencies=[Depends(validate_security)],
+)
+async def pools(request: Request):
+  """
+  Retorna conexões em uso, overflow e tempo de espera dos pools do banco de
+  leituras e da memória, para dimensioná-los de acordo com o número de workers.
+  """
+  return {
+    "readings_database": get_pool_stats(),
+    "memory": request.app.state.base_checkpointer.get_stats(),
+  }
@@ -0,0 +1,34 @@
+import logging
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from src.core import metrics
+from src.core.readings_database import get_pool_stats
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+def _collect_pool_stats(request: Request) -> None:
+  pools = {
+    "readings_database": get_pool_stats(),
+    "memory": request.app.state.base_checkpointer.get_stats(),
+  }
+  for pool, stats in pools.items():
+    for stat, value in stats.items():
+      if isinstance(value, (int, float)):
+        metrics.pool_stats.set(value, pool=pool, stat=stat)
+
+
+@router.get(
+  "/metrics",
+  response_class=PlainTextResponse,
+  summary="Métricas no formato do Prometheus",
+  include_in_schema=False,
+)
+async def get_metrics(request: Request):
+  _collect_pool_stats(request)
+  return PlainTextResponse(
+    metrics.registry.render(),
+    media_type="text/plain; version=0.0.4; charset=utf-8",
+  )
@@ -5,15 +5,48 @@ from telegram import Update
 from ..schemas.Telegram import TelegramRawUpdate
 # TODO converter Update para um modelo pydantic
 
+from src.core import metrics
+from src.core.config import settings
 from src.core.security import validate_security
 
-from ...services import TelegramService
+from ...services import RateLimiter, TelegramService
 
 from fastapi import Depends
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Referências às tarefas em andamento, para que não sejam coletadas pelo GC
+# antes de terminar e para medir a fila de mensagens em processamento
+_background_tasks: set[asyncio.Task] = set()
+metrics.webhook_queue.set(0)
+
+
+def _spawn(coroutine) -> None:
+  task = asyncio.create_task(coroutine)
+  _background_tasks.add(task)
+  metrics.webhook_queue.set(len(_background_tasks))
+  task.add_done_callback(_on_task_done)
+
+
+def pending_tasks() -> int:
+  """Mensagens do Telegram aceitas e ainda sem resposta enviada."""
+  return len(_background_tasks)
+
+
+def _on_task_done(task: asyncio.Task) -> None:
+  _background_tasks.discard(task)
+  metrics.webhook_queue.set(len(_background_tasks))
+  if task.cancelled():
+    metrics.webhook_tasks.inc(status="cancelled")
+  elif task.exception():
+    metrics.webhook_tasks.inc(status="error")
+    logger.error(
+      "Error generating Telegram response", exc_info=task.exception()
+    )
+  else:
+    metrics.webhook_tasks.inc(status="ok")
+
 
 @router.post(
   "/webhook",
@@ -28,13 +61,29 @@ async def webhook(request: Request, body: TelegramRawUpdate):
   update = Update.de_json(body.root, bot=None)
   if update.message and update.message.chat:
     logger.info(
-      f"Received request for chat with ID: {update.message.chat.id}"
+      "Received request for chat with ID: %s", update.message.chat.id
     )
   else:
     logger.warning("Received request without chat information.")
     raise ValueError("Chat information is required.")
   
-  asyncio.create_task(
+  # O webhook sempre responde 200, senão o Telegram reenvia a mensagem. O
+  # limite é checado aqui, antes de transcrever áudios ou ler imagens
+  chat_id = update.message.chat.id
+  try:
+    await RateLimiter.check("chat", chat_id)
+  except RateLimiter.RateLimited:
+    logger.warning("Rate limited Telegram message from chat ID: %s", chat_id)
+    _spawn(TelegramService.send_notice(chat_id, TelegramService.RATE_LIMITED_REPLY))
+    return {"status": "Rate limited"}
+  queue_limit = settings.rate_limit.MAX_CONCURRENT_RUNS + settings.rate_limit.MAX_PENDING_RUNS
+  if settings.rate_limit.ENABLED and len(_background_tasks) >= queue_limit:
+    logger.warning("Webhook queue full, rejecting message from chat ID: %s", chat_id)
+    metrics.rate_limited.inc(scope="webhook_queue")
+    _spawn(TelegramService.send_notice(chat_id, TelegramService.OVERLOADED_REPLY))
+    return {"status": "Overloaded"}
+
+  _spawn(
     TelegramService.generate_and_send_response(
       request.app.state.response_generation_graph,
       request.app.state.base_checkpointer,
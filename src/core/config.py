@@ -1,4 +1,5 @@
 import logging
+from datetime import datetime
 from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import BaseModel, SecretStr
@@ -14,6 +15,9 @@ class LLMSettings(BaseModel):
   TEMPERATURE: float = 0.7
   TIMEOUT: int = 30
   PROMPT_NAME: str
+  # Modelos tentados em ordem quando o principal falha, demora ou está com o
+  # circuito aberto. "stub:..." cria um provedor falso (ver llm/router.py)
+  FALLBACK_MODELS: list[str] = []
 
 
 class OmniModelSettings(LLMSettings):
@@ -45,19 +49,51 @@ class HuggingFaceSettings(BaseModel):
 
 
 class MemorySettings(BaseModel):
-  STRATEGY: Literal["postgres", "in_memory"] = "in_memory"
+  STRATEGY: Literal["postgres", "in_memory", "lru_in_memory", "redis"] = (
+    "in_memory"
+  )
   DISABLE_MIGRATIONS: bool = True
   URL: SecretStr
+  RETENTION_ENABLED: bool = False
+  RETENTION_KEEP_LAST: int = 10
+  RETENTION_IDLE_TTL_HOURS: int = 720
+  RETENTION_INTERVAL_SECONDS: int = 3600
+  RETENTION_BATCH_SIZE: int = 500
+  LRU_MAX_THREADS: int = 1000
+  LRU_MAX_BYTES: int = 256 * 1024 * 1024
+  REDIS_KEY_PREFIX: str = "leia"
+  REDIS_TTL_SECONDS: int = 7 * 24 * 3600
+  REDIS_KEEP_LAST: int = 2
+  DURABILITY: Literal["sync", "async", "exit"] = "async"
+  SERIALIZER: Literal["json_plus", "zstd"] = "zstd"
+  SERDE_COMPRESSION_LEVEL: int = 3
+  SERDE_MIN_SIZE: int = 512
+  POOL_MIN_SIZE: int = 2
+  POOL_MAX_SIZE: int = 20
+  POOL_TIMEOUT_SECONDS: float = 30
+  POOL_MAX_LIFETIME_SECONDS: int = 1800
+  POOL_MAX_IDLE_SECONDS: int = 600
+  POOL_PRE_PING: bool = False
+  PREPARE_THRESHOLD: int | None = None
   
 
 class ReadingsDatabaseSettings(BaseModel):
   MEASUREMENT_API_URL: str
   MQTT_CHANNEL: str
   URL: SecretStr
+  POOL_SIZE: int = 5
+  MAX_OVERFLOW: int = 5
+  POOL_TIMEOUT_SECONDS: float = 30
+  POOL_RECYCLE_SECONDS: int = 1800
+  PRE_PING: Literal["always", "never"] = "never"
+  QUERY_CACHE_SIZE: int = 500
+  PREPARE_THRESHOLD: int | None = None
 
 
 class LoggerSettings(BaseModel):
   LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = "INFO"
+  FORMAT: Literal["color", "json"] = "color"
+  USE_QUEUE: bool = True
 
 
 class SecuritySettings(BaseModel):
@@ -65,10 +101,145 @@ class SecuritySettings(BaseModel):
   SECRET: SecretStr
 
 
+class PlotterSettings(BaseModel):
+  BACKEND: Literal["seaborn", "lite"] = "seaborn"
+  CACHE_ENABLED: bool = True
+  CACHE_MAX_ENTRIES: int = 128
+
+
+class ToolOutputSettings(BaseModel):
+  MAX_TOKENS: int = 500
+  MAX_TOKENS_PER_TOOL: dict[str, int] = {
+    "WebSearch": 750,
+    "MaintenanceSheet": 400,
+    "DataAccess": 400,
+    "ToolOutput": 1000,
+  }
+  TOP_K: int = 3
+  STORE_MAX_ENTRIES: int = 256
+
+
 class BotSettings(BaseModel):
   NAME: str
   MAX_HISTORY: int = 10
+  MAX_HISTORY_TOKENS: int = 3000
+  SUMMARY_PROMPT_NAME: str = "leia_summary_prompt"
   TELEGRAM_TOKEN: SecretStr
+  # Permitem apontar o bot para um servidor local da Bot API (ex.: testes de carga)
+  TELEGRAM_API_URL: str = "https://api.telegram.org/bot"
+  TELEGRAM_FILE_URL: str = "https://api.telegram.org/file/bot"
+
+
+class HealthSettings(BaseModel):
+  PROBE_TIMEOUT_SECONDS: float = 2.0
+  CACHE_TTL_SECONDS: float = 5.0
+  MEASUREMENT_API_HEALTH_PATH: str = "/health"
+  # Probes cuja falha tira a réplica do balanceamento. As demais aparecem no
+  # relatório, mas como dependem de serviços compartilhados por todas as
+  # réplicas, não adianta rotear para outra
+  REQUIRED_PROBES: list[str] = ["checkpointer", "readings_database", "prompts"]
+  # Amostragem do atraso do event loop; atrasos acima de WARN viram log
+  EVENT_LOOP_LAG_INTERVAL_SECONDS: float = 0.5
+  EVENT_LOOP_LAG_WARN_SECONDS: float = 0.25
+
+
+class TracingSettings(BaseModel):
+  ENABLED: bool = True
+  # Sink local opcional; em produção as traces costumam ir pelo OpenTelemetry
+  JSON_SINK_PATH: str | None = None
+  JSON_SINK_MAX_BYTES: int = 50 * 1024 * 1024
+  JSON_SINK_BACKUP_COUNT: int = 3
+  OTEL_ENABLED: bool = False
+  SERVICE_NAME: str = "leia"
+
+
+class LLMRoutingSettings(BaseModel):
+  # Retries do SDK por modelo quando há fallback; sem fallback continua 3
+  MAX_RETRIES_WITH_FALLBACK: int = 0
+  CIRCUIT_FAILURE_THRESHOLD: int = 3
+  CIRCUIT_RESET_SECONDS: float = 30.0
+  HEDGE_ENABLED: bool = False
+  # Até juntar HEDGE_MIN_SAMPLES latências, usa o atraso padrão no lugar do p95
+  HEDGE_MIN_SAMPLES: int = 20
+  HEDGE_DEFAULT_DELAY_SECONDS: float = 8.0
+  HEDGE_MIN_DELAY_SECONDS: float = 1.0
+  LATENCY_WINDOW: int = 200
+
+
+class AnswerCacheSettings(BaseModel):
+  ENABLED: bool = True
+  # "chat" reaproveita respostas só no mesmo chat; "global" entre usuários
+  SCOPE: Literal["chat", "global"] = "chat"
+  MAX_ENTRIES: int = 512
+  SIMILARITY_THRESHOLD: float = 0.9
+  # Perguntas mais curtas (ex.: "e ontem?") dependem do contexto da conversa
+  MIN_WORDS: int = 3
+  # Validade de respostas sobre períodos que incluem o agora ou fontes editáveis
+  LIVE_TTL_SECONDS: float = 300
+  TTL_SECONDS: float = 86400
+
+
+class IntentRouterSettings(BaseModel):
+  ENABLED: bool = True
+  # Perguntas mais longas costumam ter nuances que só o agente resolve
+  MAX_WORDS: int = 12
+
+
+class TokenBudgetSettings(BaseModel):
+  ENCODING: str = "o200k_base"
+  # Orçamento de entrada de cada chamada do main_bot (prompt, tools e mensagens)
+  MAX_INPUT_TOKENS: int = 8000
+  # Saídas de ferramentas do turno atual nunca são truncadas abaixo disso
+  MIN_TOOL_RESULT_TOKENS: int = 200
+
+
+class RateLimitSettings(BaseModel):
+  ENABLED: bool = True
+  # "memory" mantém os buckets no processo; "redis" compartilha entre réplicas
+  BACKEND: Literal["memory", "redis"] = "memory"
+  REDIS_URL: SecretStr | None = None  # Padrão: MEMORY__URL
+  KEY_PREFIX: str = "leia:ratelimit"
+  MAX_TRACKED_KEYS: int = 10000
+  # Token buckets: CAPACITY é a rajada, REFILL_PER_MINUTE o ritmo sustentado
+  CHAT_CAPACITY: int = 5
+  CHAT_REFILL_PER_MINUTE: float = 10
+  API_KEY_CAPACITY: int = 30
+  API_KEY_REFILL_PER_MINUTE: float = 120
+  NOTICES_PER_MINUTE: float = 1
+  # Execuções simultâneas do grafo e quantas podem aguardar vaga
+  MAX_CONCURRENT_RUNS: int = 8
+  MAX_PENDING_RUNS: int = 32
+  ADMISSION_TIMEOUT_SECONDS: float = 2.0
+  # Mensagens do Telegram já foram aceitas pelo webhook e podem esperar mais
+  TELEGRAM_ADMISSION_TIMEOUT_SECONDS: float = 30.0
+
+
+class BatchSettings(BaseModel):
+  CONCURRENCY: int = 4
+  MAX_CONCURRENCY: int = 16
+  MAX_ITEMS: int = 2000
+  # Itens do lote esperam vaga no grafo em vez de serem recusados
+  ADMISSION_TIMEOUT_SECONDS: float = 600.0
+
+
+class FixturesSettings(BaseModel):
+  # off: chamadas reais; record: reais e gravadas; replay: só respostas gravadas
+  MODE: Literal["off", "record", "replay"] = "off"
+  DIR: str = "data/fixtures"
+  # Latência simulada no replay, em segundos, por tipo de chamada
+  LATENCY_SECONDS: dict[str, float] = {
+    "llm": 0.8,
+    "web_search": 1.0,
+    "measurement_api": 0.1,
+    "sheets": 0.3,
+    "transcription": 0.5,
+    "vision": 1.5,
+  }
+  # Variação relativa da latência (0.2 = ±20%), sorteada com SEED
+  LATENCY_JITTER: float = 0.2
+  SEED: int = 0
+  # Horário fixo usado no prompt e nos períodos das consultas
+  FROZEN_NOW: datetime | None = None
 
 
 class Settings(BaseSettings):
@@ -86,6 +257,17 @@ class Settings(BaseSettings):
   logger: LoggerSettings
   readings_database: ReadingsDatabaseSettings
   security: SecuritySettings
+  plotter: PlotterSettings = PlotterSettings()
+  tool_output: ToolOutputSettings = ToolOutputSettings()
+  tracing: TracingSettings = TracingSettings()
+  health: HealthSettings = HealthSettings()
+  llm_routing: LLMRoutingSettings = LLMRoutingSettings()
+  answer_cache: AnswerCacheSettings = AnswerCacheSettings()
+  intent_router: IntentRouterSettings = IntentRouterSettings()
+  token_budget: TokenBudgetSettings = TokenBudgetSettings()
+  rate_limit: RateLimitSettings = RateLimitSettings()
+  batch: BatchSettings = BatchSettings()
+  fixtures: FixturesSettings = FixturesSettings()
 
   model_config = SettingsConfigDict(
     env_file=".env",
@@ -98,8 +280,11 @@ class Settings(BaseSettings):
 
 settings = Settings.model_validate({})
 
-init_logging(settings.logger.LEVEL)
+init_logging(
+  settings.logger.LEVEL, settings.logger.FORMAT, settings.logger.USE_QUEUE
+)
 logger.info("Loading configuration from env...")
 update_level(settings.logger.LEVEL)
-logger.debug(f"Settings model: {settings.model_dump()}")
+if logger.isEnabledFor(logging.DEBUG):
+  logger.debug("Settings model: %s", settings.model_dump())
 
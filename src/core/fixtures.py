@@ -0,0 +1,144 @@
+"""
+Gravação e reprodução das chamadas externas (LLM, Tavily, API de medições e
+Google Sheets), para rodar o grafo inteiro sem rede em benchmarks e no CI.
+
+Com FIXTURES__MODE=record as chamadas reais são feitas e cada par
+requisição/resposta é gravado em FIXTURES__DIR/<tipo>.jsonl. Com
+FIXTURES__MODE=replay as respostas saem só desses arquivos, após a latência
+configurada em FIXTURES__LATENCY_SECONDS, e uma requisição não gravada levanta
+FixtureNotFound. Grave e reproduza com o mesmo FIXTURES__FROZEN_NOW, para que
+o horário no prompt e os períodos das consultas gerem as mesmas requisições.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FixtureNotFound(Exception):
+  """Não há resposta gravada para a requisição no modo replay."""
+
+
+# tipo -> chave da requisição -> resposta gravada
+_fixtures: dict[str, dict[str, Any]] = {}
+_lock = threading.Lock()
+_rng: random.Random | None = None
+
+
+def mode() -> str:
+  return settings.fixtures.MODE
+
+
+def now() -> datetime:
+  """Horário atual, ou FIXTURES__FROZEN_NOW quando definido."""
+  return settings.fixtures.FROZEN_NOW or datetime.now()
+
+
+def request_key(request: Any) -> str:
+  payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+  return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _path(kind: str) -> Path:
+  return Path(settings.fixtures.DIR) / f"{kind}.jsonl"
+
+
+def _load(kind: str) -> dict[str, Any]:
+  with _lock:
+    if kind not in _fixtures:
+      entries: dict[str, Any] = {}
+      path = _path(kind)
+      if path.exists():
+        with path.open(encoding="utf-8") as f:
+          for line in f:
+            if line.strip():
+              entry = json.loads(line)
+              # A gravação mais recente de uma mesma requisição prevalece
+              entries[entry["key"]] = entry["response"]
+      logger.info("Loaded %s %s fixtures from %s", len(entries), kind, path)
+      _fixtures[kind] = entries
+    return _fixtures[kind]
+
+
+def _record(kind: str, request: Any, response: Any) -> None:
+  key = request_key(request)
+  entries = _load(kind)
+  line = json.dumps(
+    {"key": key, "request": request, "response": response},
+    ensure_ascii=False,
+    default=str,
+  )
+  with _lock:
+    entries[key] = response
+    path = _path(kind)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+      f.write(line + "\n")
+  logger.debug("Recorded %s fixture %s", kind, key)
+
+
+def _replay(kind: str, request: Any) -> Any:
+  key = request_key(request)
+  entries = _load(kind)
+  if key not in entries:
+    logger.warning("No recorded %s response for key %s", kind, key)
+    raise FixtureNotFound(f"No recorded {kind} response for key {key}")
+  # Cópia, para que quem chamou possa alterar a resposta sem afetar as próximas
+  return copy.deepcopy(entries[key])
+
+
+def _latency(kind: str) -> float:
+  """Latência simulada: valor do tipo com variação de ±LATENCY_JITTER, com semente fixa."""
+  global _rng
+  base = settings.fixtures.LATENCY_SECONDS.get(kind, 0.0)
+  if base <= 0:
+    return 0.0
+  with _lock:
+    if _rng is None:
+      _rng = random.Random(settings.fixtures.SEED)
+    jitter = _rng.uniform(-settings.fixtures.LATENCY_JITTER, settings.fixtures.LATENCY_JITTER)
+  return base * (1 + jitter)
+
+
+def through(kind: str, request: Any, call: Callable[[], Any]) -> Any:
+  """
+  Executa call() conforme FIXTURES__MODE. request identifica a chamada e deve
+  ser serializável em JSON, assim como o retorno de call() no modo record.
+  """
+  current = mode()
+  if current == "replay":
+    delay = _latency(kind)
+    if delay:
+      time.sleep(delay)
+    return _replay(kind, request)
+  response = call()
+  if current == "record":
+    _record(kind, request, response)
+  return response
+
+
+async def athrough(kind: str, request: Any, call: Callable[[], Awaitable[Any]]) -> Any:
+  """Versão assíncrona de through: a latência simulada não bloqueia o event loop."""
+  current = mode()
+  if current == "replay":
+    delay = _latency(kind)
+    if delay:
+      await asyncio.sleep(delay)
+    return _replay(kind, request)
+  response = await call()
+  if current == "record":
+    _record(kind, request, response)
+  return response
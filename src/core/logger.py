@@ -1,10 +1,22 @@
+import atexit
+import contextlib
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Literal
 
 from colorama import Fore, Style, init
 
 init(autoreset=True)
 
+# Campos de contexto (chat_id, message_id, node...) anexados a cada log
+_log_context: ContextVar[dict] = ContextVar("log_context", default={})
+_listener: logging.handlers.QueueListener | None = None
+
 
 class ColorFormatter(logging.Formatter):
   COLORS = {
@@ -19,6 +31,9 @@ class ColorFormatter(logging.Formatter):
     log_color = self.COLORS.get(record.levelno, "")
 
     message = super().format(record)
+    context = getattr(record, "context", None)
+    if context:
+      message = " ".join(f"{k}={v}" for k, v in context.items()) + " | " + message
 
     return (
       f"[{Fore.CYAN}{self.formatTime(record, self.datefmt)}{Style.RESET_ALL}] "
@@ -28,6 +43,32 @@ class ColorFormatter(logging.Formatter):
     )
 
 
+class JsonFormatter(logging.Formatter):
+  """Um objeto JSON por linha, com os campos de contexto no nível raiz."""
+
+  def format(self, record: logging.LogRecord) -> str:
+    payload = {
+      "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+      "level": record.levelname,
+      "logger": record.name,
+      "message": record.getMessage(),
+      **getattr(record, "context", {}),
+    }
+    if record.exc_info:
+      payload["exc_info"] = self.formatException(record.exc_info)
+    elif record.exc_text:
+      payload["exc_info"] = record.exc_text
+    return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class ContextFilter(logging.Filter):
+  """Copia o contexto da requisição para o record na thread de origem."""
+
+  def filter(self, record: logging.LogRecord) -> bool:
+    record.context = _log_context.get()
+    return True
+
+
 class SuppressDetachFilter(logging.Filter):
   def filter(self, record: logging.LogRecord) -> bool:
     if "Failed to detach context" in record.getMessage():
@@ -35,18 +76,80 @@ class SuppressDetachFilter(logging.Filter):
     return True
 
 
+class _QueueHandler(logging.handlers.QueueHandler):
+  """
+  Resolve apenas a mensagem (args podem mudar depois) na thread de origem e
+  deixa a formatação e a escrita no stdout para a thread do QueueListener.
+  """
+
+  def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+    record.msg = record.getMessage()
+    record.args = None
+    if record.exc_info:
+      record.exc_text = logging.Formatter().formatException(record.exc_info)
+      record.exc_info = None
+    record.stack_info = None
+    return record
+
+
+@contextlib.contextmanager
+def log_context(**fields):
+  """Adiciona campos ao contexto dos logs emitidos dentro do bloco."""
+  token = _log_context.set({**_log_context.get(), **fields})
+  try:
+    yield
+  finally:
+    _log_context.reset(token)
+
+
+def _stop_listener() -> None:
+  global _listener
+  if _listener is not None:
+    _listener.stop()
+    _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+def get_log_context() -> dict:
+  return _log_context.get()
+
+
+def update_log_context(**fields) -> None:
+  """Adiciona campos ao contexto atual até o fim da tarefa corrente."""
+  _log_context.set({**_log_context.get(), **fields})
+
+
 def init_logging(
-  level: str = "INFO"
+  level: str = "INFO",
+  fmt: Literal["color", "json"] = "color",
+  use_queue: bool = True,
 ):
   """Inicializa a configuração raiz do logging com o handler e formatter customizados."""
+  global _listener
+  _stop_listener()
+
   handler = logging.StreamHandler(sys.stdout)
 
-  formatter = ColorFormatter(datefmt="%Y-%m-%d %H:%M:%S UTC%z")
+  if fmt == "json":
+    formatter = JsonFormatter()
+  else:
+    formatter = ColorFormatter(datefmt="%Y-%m-%d %H:%M:%S UTC%z")
   handler.setFormatter(formatter)
 
+  if use_queue:
+    # A escrita no stdout sai do caminho da requisição
+    root_handler = _QueueHandler(queue.SimpleQueue())
+    _listener = logging.handlers.QueueListener(root_handler.queue, handler)
+    _listener.start()
+  else:
+    root_handler = handler
+  root_handler.addFilter(ContextFilter())
+
   logging.basicConfig(
     level=level,
-    handlers=[handler],
+    handlers=[root_handler],
     force=True,
   )
 
@@ -54,4 +157,4 @@ def init_logging(
 def update_level(level: str = "INFO"):
   root_logger = logging.getLogger()
   root_logger.setLevel(level)
-  logging.getLogger(__name__).info(f"Nível de log atualizado para {level}")
+  logging.getLogger(__name__).info("Nível de log atualizado para %s", level)
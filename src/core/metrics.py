@@ -0,0 +1,275 @@
+import asyncio
+import bisect
+import logging
+import threading
+from collections.abc import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+  return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+  pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+  if extra:
+    pairs.append(extra)
+  return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+  if value == float("inf"):
+    return "+Inf"
+  return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+  type_ = ""
+
+  def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+    self.name = name
+    self.documentation = documentation
+    self.label_names = tuple(labels)
+    self.lock = threading.Lock()
+
+  def _key(self, labels: dict[str, str]) -> LabelValues:
+    return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+  def header(self) -> list[str]:
+    return [
+      f"# HELP {self.name} {self.documentation}",
+      f"# TYPE {self.name} {self.type_}",
+    ]
+
+
+class Counter(_Metric):
+  type_ = "counter"
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.values: dict[LabelValues, float] = {}
+
+  def inc(self, amount: float = 1, **labels: str) -> None:
+    key = self._key(labels)
+    with self.lock:
+      self.values[key] = self.values.get(key, 0) + amount
+
+  def render(self) -> list[str]:
+    with self.lock:
+      items = list(self.values.items())
+    return self.header() + [
+      f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+      for key, value in items
+    ]
+
+
+class Gauge(_Metric):
+  type_ = "gauge"
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.values: dict[LabelValues, float] = {}
+
+  def set(self, value: float, **labels: str) -> None:
+    with self.lock:
+      self.values[self._key(labels)] = value
+
+  def inc(self, amount: float = 1, **labels: str) -> None:
+    key = self._key(labels)
+    with self.lock:
+      self.values[key] = self.values.get(key, 0) + amount
+
+  def dec(self, amount: float = 1, **labels: str) -> None:
+    self.inc(-amount, **labels)
+
+  def render(self) -> list[str]:
+    with self.lock:
+      items = list(self.values.items())
+    return self.header() + [
+      f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+      for key, value in items
+    ]
+
+
+class Histogram(_Metric):
+  type_ = "histogram"
+
+  def __init__(self, *args, buckets: tuple[float, ...] = LATENCY_BUCKETS, **kwargs):
+    super().__init__(*args, **kwargs)
+    self.buckets = tuple(sorted(buckets))
+    # Por label: contagem por bucket (não cumulativa), soma e total
+    self.values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+  def observe(self, value: float, **labels: str) -> None:
+    key = self._key(labels)
+    index = bisect.bisect_left(self.buckets, value)
+    with self.lock:
+      counts, totals = self.values.setdefault(
+        key, ([0] * (len(self.buckets) + 1), [0.0])
+      )
+      counts[index] += 1
+      totals[0] += value
+
+  def render(self) -> list[str]:
+    with self.lock:
+      items = [(k, list(c), t[0]) for k, (c, t) in self.values.items()]
+    lines = self.header()
+    for key, counts, total in items:
+      cumulative = 0
+      for bound, count in zip((*self.buckets, float("inf")), counts):
+        cumulative += count
+        labels = _format_labels(
+          self.label_names, key, f'le="{_format_value(bound)}"'
+        )
+        lines.append(f"{self.name}_bucket{labels} {cumulative}")
+      labels = _format_labels(self.label_names, key)
+      lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+      lines.append(f"{self.name}_count{labels} {cumulative}")
+    return lines
+
+
+class Registry:
+  """Registro em memória das métricas, renderizado no formato do Prometheus."""
+
+  def __init__(self):
+    self.metrics: list[_Metric] = []
+    # Funções chamadas a cada scrape para atualizar gauges (ex.: pools)
+    self.collectors: list[Callable[[], None]] = []
+
+  def register(self, metric: _Metric) -> _Metric:
+    self.metrics.append(metric)
+    return metric
+
+  def add_collector(self, collector: Callable[[], None]) -> None:
+    self.collectors.append(collector)
+
+  def render(self) -> str:
+    for collector in self.collectors:
+      try:
+        collector()
+      except Exception as e:
+        logger.error("Error collecting metrics: %s", e)
+    lines = []
+    for metric in self.metrics:
+      lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.register(
+  Counter(
+    "leia_http_requests_total",
+    "Requisições HTTP por rota e status",
+    ("method", "route", "status"),
+  )
+)
+http_latency = registry.register(
+  Histogram(
+    "leia_http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ("method", "route"),
+  )
+)
+graph_runs = registry.register(
+  Counter("leia_graph_runs_total", "Execuções do grafo de resposta", ("status",))
+)
+graph_latency = registry.register(
+  Histogram("leia_graph_run_duration_seconds", "Latência das execuções do grafo")
+)
+graph_runs_in_flight = registry.register(
+  Gauge("leia_graph_runs_in_flight", "Execuções do grafo em andamento")
+)
+rate_limited = registry.register(
+  Counter("leia_rate_limited_total", "Requisições recusadas por limite", ("scope",))
+)
+llm_calls = registry.register(
+  Counter("leia_llm_calls_total", "Chamadas de LLM por modelo", ("model", "status"))
+)
+llm_tokens = registry.register(
+  Counter("leia_llm_tokens_total", "Tokens consumidos por modelo", ("model", "type"))
+)
+llm_latency = registry.register(
+  Histogram("leia_llm_call_duration_seconds", "Latência das chamadas de LLM", ("model",))
+)
+llm_circuit_open = registry.register(
+  Gauge("leia_llm_circuit_open", "1 se o circuito do modelo está aberto", ("model",))
+)
+llm_hedges = registry.register(
+  Counter("leia_llm_hedged_calls_total", "Chamadas de LLM duplicadas por hedging", ("model",))
+)
+prompt_tokens = registry.register(
+  Histogram(
+    "leia_prompt_tokens",
+    "Tokens enviados ao agente por segmento do prompt",
+    ("segment",),
+    buckets=(50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+  )
+)
+tool_calls = registry.register(
+  Counter("leia_tool_calls_total", "Chamadas de ferramentas", ("tool", "status"))
+)
+tool_latency = registry.register(
+  Histogram("leia_tool_call_duration_seconds", "Latência das ferramentas", ("tool",))
+)
+webhook_queue = registry.register(
+  Gauge("leia_webhook_queue_depth", "Mensagens do Telegram em processamento")
+)
+webhook_tasks = registry.register(
+  Counter(
+    "leia_webhook_tasks_total", "Tarefas do webhook do Telegram finalizadas", ("status",)
+  )
+)
+event_loop_lag = registry.register(
+  Histogram(
+    "leia_event_loop_lag_seconds",
+    "Atraso do event loop em acordar de um sleep",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+  )
+)
+cache_requests = registry.register(
+  Counter("leia_cache_requests_total", "Consultas aos caches", ("cache", "result"))
+)
+pool_stats = registry.register(
+  Gauge("leia_pool_stat", "Estatísticas dos pools de conexão", ("pool", "stat"))
+)
+
+
+def record_trace(trace) -> None:
+  """Extrai métricas de LLM e ferramentas dos spans de uma trace finalizada."""
+  for span in trace.llm_leaves():
+    seconds = (span.duration_ms or 0) / 1000
+    model = span.attributes.get("model", "unknown")
+    llm_calls.inc(model=model, status="error" if span.error else "ok")
+    llm_latency.observe(seconds, model=model)
+    for key in ("input_tokens", "output_tokens", "cached_tokens"):
+      if span.attributes.get(key):
+        llm_tokens.inc(span.attributes[key], model=model, type=key.removesuffix("_tokens"))
+  for span in trace.spans:
+    seconds = (span.duration_ms or 0) / 1000
+    status = "error" if span.error else "ok"
+    if span.kind == "tool":
+      tool = span.attributes.get("tool", "unknown")
+      tool_calls.inc(tool=tool, status=status)
+      tool_latency.observe(seconds, tool=tool)
+
+
+async def watch_event_loop(interval: float, warn_after: float) -> None:
+  """
+  Mede quanto um sleep de interval segundos demora a mais para acordar. Atraso
+  alto indica código bloqueando o event loop (ex.: I/O síncrono em um nó).
+  """
+  loop = asyncio.get_running_loop()
+  while True:
+    started_at = loop.time()
+    await asyncio.sleep(interval)
+    lag = max(0.0, loop.time() - started_at - interval)
+    event_loop_lag.observe(lag)
+    if lag >= warn_after:
+      logger.warning("Event loop blocked for %.0f ms", lag * 1000)
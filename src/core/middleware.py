@@ -1,28 +1,66 @@
-from fastapi import Request
-from starlette.middleware.base import (
-  BaseHTTPMiddleware,
-  RequestResponseEndpoint,
-)
-from starlette.responses import Response
-
-from .readings_database import AsyncSessionMaker, db_session_context
-
-
-class DBSessionMiddleware(BaseHTTPMiddleware):
-  async def dispatch(
-    self, request: Request, call_next: RequestResponseEndpoint
-  ) -> Response:
-    # Cria uma nova sessão para esta requisição específica
-    async with AsyncSessionMaker() as session:
-      # Define o valor da context var para esta sessão
-      token = db_session_context.set(session)
-
-      try:
-        # Processa a requisição
-        response = await call_next(request)
-      finally:
-        # Garante que a sessão seja fechada e o contexto resetado
-        await session.close()
-        db_session_context.reset(token)
-
-    return response
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from . import metrics
+from .readings_database import LazySession, db_session_context
+
+
+class DBSessionMiddleware:
+  """
+  Middleware ASGI puro que disponibiliza uma sessão de banco por requisição.
+  A sessão só é aberta se get_db_session() for chamado durante a requisição.
+  """
+
+  def __init__(self, app: ASGIApp):
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    # Define o valor da context var para esta requisição
+    holder = LazySession()
+    token = db_session_context.set(holder)
+    try:
+      await self.app(scope, receive, send)
+    finally:
+      # Garante que a sessão (se criada) seja fechada e o contexto resetado
+      await holder.close()
+      db_session_context.reset(token)
+
+
+class MetricsMiddleware:
+  """
+  Middleware ASGI puro que conta requisições e mede a latência por rota. A rota
+  é o template do FastAPI (ex.: /bot/chat), para não explodir a cardinalidade.
+  """
+
+  def __init__(self, app: ASGIApp):
+    self.app = app
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] != "http":
+      await self.app(scope, receive, send)
+      return
+
+    start = time.perf_counter()
+    status = 500
+
+    async def send_wrapper(message: Message) -> None:
+      nonlocal status
+      if message["type"] == "http.response.start":
+        status = message["status"]
+      await send(message)
+
+    try:
+      await self.app(scope, receive, send_wrapper)
+    finally:
+      route = scope.get("route")
+      path = getattr(route, "path", None) or "unmatched"
+      method = scope["method"]
+      metrics.http_requests.inc(method=method, route=path, status=str(status))
+      metrics.http_latency.observe(
+        time.perf_counter() - start, method=method, route=path
+      )
@@ -1,7 +1,10 @@
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+PROMPTS_DIR = "./src/graphs/prompts"
+
 
 class PromptHandler:
   def __init__(self) -> None:
@@ -9,16 +12,20 @@ class PromptHandler:
 
   def get_prompt(self, prompt_name: str) -> str:
     logger.warning(
-      f"Trying to fetch prompt: [{prompt_name}] locally."
+      "Trying to fetch prompt: [%s] locally.", prompt_name
     )
     try:
       with open(
-        f"./src/graphs/prompts/{prompt_name}.md", "r", encoding="utf-8"
+        f"{PROMPTS_DIR}/{prompt_name}.md", "r", encoding="utf-8"
       ) as f:
         content = f.read()
         return content
     except Exception as e:
-      logger.error(f"Error fetching prompt locally: {e}")
+      logger.error("Error fetching prompt locally: %s", e)
       raise ValueError(
         f"Prompt [{prompt_name}] not found locally."
       )
+
+  def has_prompt(self, prompt_name: str) -> bool:
+    """Verifica se o prompt existe, sem lê-lo."""
+    return os.path.isfile(f"{PROMPTS_DIR}/{prompt_name}.md")
@@ -1,18 +1,72 @@
 import logging
+import threading
+import time
 from contextvars import ContextVar
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
   AsyncSession,
   async_sessionmaker,
   create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from src.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 DB_OPERATIONS_URL = settings.readings_database.URL.get_secret_value()
 
-async_engine = create_async_engine(DB_OPERATIONS_URL, pool_pre_ping=True)
+
+class _CheckoutStats:
+  """Tempo de espera por conexão acumulado entre recriações do pool."""
+
+  def __init__(self):
+    self.lock = threading.Lock()
+    self.checkouts = 0
+    self.wait_ms_total = 0.0
+    self.wait_ms_max = 0.0
+
+  def record(self, wait_ms: float) -> None:
+    with self.lock:
+      self.checkouts += 1
+      self.wait_ms_total += wait_ms
+      self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+
+_checkout_stats = _CheckoutStats()
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+  """AsyncAdaptedQueuePool que mede quanto cada checkout espera por conexão."""
+
+  def _do_get(self):
+    start = time.perf_counter()
+    try:
+      return super()._do_get()
+    finally:
+      _checkout_stats.record((time.perf_counter() - start) * 1000)
+
+
+def _create_engine():
+  config = settings.readings_database
+  connect_args = {}
+  if config.PREPARE_THRESHOLD is not None:
+    connect_args["prepare_threshold"] = config.PREPARE_THRESHOLD
+  return create_async_engine(
+    DB_OPERATIONS_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=config.POOL_SIZE,
+    max_overflow=config.MAX_OVERFLOW,
+    pool_timeout=config.POOL_TIMEOUT_SECONDS,
+    # Conexões recicladas periodicamente dispensam o ping a cada checkout
+    pool_recycle=config.POOL_RECYCLE_SECONDS,
+    pool_pre_ping=config.PRE_PING == "always",
+    query_cache_size=config.QUERY_CACHE_SIZE,
+    connect_args=connect_args,
+  )
+
+
+async_engine = _create_engine()
 
 AsyncSessionMaker = async_sessionmaker(
   bind=async_engine,
@@ -21,12 +75,54 @@ AsyncSessionMaker = async_sessionmaker(
   class_=AsyncSession,
 )
 
-db_session_context: ContextVar[AsyncSession] = ContextVar("db_session_context")
+
+class LazySession:
+  """Guarda a sessão de uma requisição, criada apenas no primeiro uso."""
+
+  def __init__(self):
+    self.session: AsyncSession | None = None
+
+  def get(self) -> AsyncSession:
+    if self.session is None:
+      self.session = AsyncSessionMaker()
+    return self.session
+
+  async def close(self) -> None:
+    if self.session is not None:
+      await self.session.close()
+      self.session = None
+
+
+db_session_context: ContextVar[LazySession] = ContextVar("db_session_context")
 
 
 def get_db_session() -> AsyncSession:
   """Retorna a sessão de banco de dados do contexto da requisição atual."""
-  session = db_session_context.get(None)
-  if session is None:
+  holder = db_session_context.get(None)
+  if holder is None:
     raise Exception("Nenhuma sessão de banco de dados encontrada no contexto.")
-  return session
\ No newline at end of file
+  return holder.get()
+
+async def ping() -> None:
+  """Executa um SELECT 1 para verificar se o banco de leituras responde."""
+  async with async_engine.connect() as conn:
+    await conn.execute(text("SELECT 1"))
+
+
+def get_pool_stats() -> dict[str, int | float]:
+  """Estatísticas do pool de conexões do banco de leituras."""
+  pool = async_engine.sync_engine.pool
+  with _checkout_stats.lock:
+    checkouts = _checkout_stats.checkouts
+    wait_ms_total = _checkout_stats.wait_ms_total
+    wait_ms_max = _checkout_stats.wait_ms_max
+  return {
+    "pool_size": pool.size(),
+    "checked_out": pool.checkedout(),
+    "checked_in": pool.checkedin(),
+    "overflow": max(pool.overflow(), 0),
+    "max_overflow": settings.readings_database.MAX_OVERFLOW,
+    "checkouts": checkouts,
+    "wait_ms_avg": round(wait_ms_total / checkouts, 3) if checkouts else 0.0,
+    "wait_ms_max": round(wait_ms_max, 3),
+  }
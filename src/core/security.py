@@ -45,7 +45,7 @@ async def validate_security(
     _verify_api_key(x_api_key)
 
   else:
-    logger.error(f"Invalid security type configured: {settings.security.TYPE}")
+    logger.error("Invalid security type configured: %s", settings.security.TYPE)
     # Este é um erro de configuração do servidor, não do cliente
     raise HTTPException(
       status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
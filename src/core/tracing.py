@@ -0,0 +1,412 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import ChatGeneration, LLMResult
+from src.core import metrics
+from src.core.config import settings
+from src.core.logger import get_log_context, log_context, update_log_context
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+  """Trecho medido de uma requisição (nó do grafo, chamada de LLM, tool...)."""
+
+  def __init__(
+    self,
+    name: str,
+    kind: str,
+    parent_id: str | None,
+    attributes: dict[str, Any] | None = None,
+  ):
+    self.id = uuid.uuid4().hex[:16]
+    self.name = name
+    self.kind = kind
+    self.parent_id = parent_id
+    self.attributes = attributes or {}
+    self.start = time.time()
+    self.start_perf = time.perf_counter()
+    self.duration_ms: float | None = None
+    self.error: str | None = None
+
+  def finish(self, error: BaseException | None = None) -> None:
+    self.duration_ms = (time.perf_counter() - self.start_perf) * 1000
+    if error is not None:
+      self.error = f"{type(error).__name__}: {error}"
+
+  def to_dict(self, trace_start_perf: float) -> dict[str, Any]:
+    return {
+      "id": self.id,
+      "parent_id": self.parent_id,
+      "name": self.name,
+      "kind": self.kind,
+      "offset_ms": round((self.start_perf - trace_start_perf) * 1000, 2),
+      "duration_ms": round(self.duration_ms, 2)
+      if self.duration_ms is not None
+      else None,
+      "attributes": self.attributes,
+      "error": self.error,
+    }
+
+
+class Trace:
+  """Conjunto de spans de uma mensagem, identificado por chat_id/message_id."""
+
+  def __init__(self, chat_id: Any, message_id: Any, name: str):
+    self.id = uuid.uuid4().hex
+    self.chat_id = chat_id
+    self.message_id = message_id
+    self.root = Span(name, "request", None)
+    self.spans: list[Span] = [self.root]
+    # run_id do LangChain -> span registrado mais próximo (ele próprio ou pai)
+    self.run_spans: dict[UUID, str | None] = {}
+
+  def add(
+    self,
+    name: str,
+    kind: str,
+    parent_id: str | None,
+    attributes: dict[str, Any] | None = None,
+  ) -> Span:
+    span = Span(name, kind, parent_id or self.root.id, attributes)
+    self.spans.append(span)
+    return span
+
+  def llm_leaves(self) -> list[Span]:
+    """
+    Spans de LLM que não contêm outras chamadas de LLM. Um FallbackChatModel
+    repassa a resposta do modelo que atendeu, então contar os dois duplicaria
+    tokens e chamadas.
+    """
+    parents = {span.parent_id for span in self.spans if span.kind == "llm"}
+    return [s for s in self.spans if s.kind == "llm" and s.id not in parents]
+
+  def tokens(self) -> dict[str, int]:
+    totals: dict[str, int] = {}
+    for span in self.llm_leaves():
+      for key, value in span.attributes.items():
+        if key.endswith("_tokens") and isinstance(value, int):
+          totals[key] = totals.get(key, 0) + value
+    return totals
+
+  def to_dict(self) -> dict[str, Any]:
+    return {
+      "trace_id": self.id,
+      "chat_id": self.chat_id,
+      "message_id": self.message_id,
+      "start": datetime.fromtimestamp(self.root.start, timezone.utc).isoformat(),
+      "duration_ms": round(self.root.duration_ms or 0, 2),
+      "tokens": self.tokens(),
+      "spans": [span.to_dict(self.root.start_perf) for span in self.spans],
+    }
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[str | None] = ContextVar("current_span", default=None)
+
+
+def get_current_trace() -> Trace | None:
+  return _current_trace.get()
+
+
+@contextlib.contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+  """
+  Mede um trecho de código dentro da trace atual. Sem trace ativa (ou com o
+  tracing desabilitado), não faz nada.
+  """
+  trace = _current_trace.get()
+  if trace is None:
+    yield None
+    return
+  current = trace.add(name, kind, _current_span.get(), attributes)
+  token = _current_span.set(current.id)
+  try:
+    yield current
+  except BaseException as e:
+    current.finish(e)
+    raise
+  else:
+    current.finish()
+  finally:
+    _current_span.reset(token)
+
+
+def event(name: str, kind: str = "event", **attributes) -> None:
+  """
+  Registra na trace atual um fato pontual, sem duração (ex.: a contagem de
+  tokens do prompt). Sem trace ativa, não faz nada.
+  """
+  trace = _current_trace.get()
+  if trace is None:
+    return
+  current = trace.add(name, kind, _current_span.get(), attributes)
+  current.duration_ms = 0.0
+
+
+_sink: logging.Logger | None = None
+
+
+def _write_json(record: dict[str, Any]) -> None:
+  """Grava a trace no sink local, rotacionado ao passar de JSON_SINK_MAX_BYTES."""
+  global _sink
+  if _sink is None:
+    path = settings.tracing.JSON_SINK_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    handler = RotatingFileHandler(
+      path,
+      maxBytes=settings.tracing.JSON_SINK_MAX_BYTES,
+      backupCount=settings.tracing.JSON_SINK_BACKUP_COUNT,
+      encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    sink = logging.getLogger(f"{__name__}.sink")
+    sink.propagate = False
+    sink.setLevel(logging.INFO)
+    sink.addHandler(handler)
+    _sink = sink
+  _sink.info(json.dumps(record, ensure_ascii=False, default=str))
+
+
+def _export_otel(trace: Trace) -> None:
+  """Reenvia os spans já medidos para o tracer global do OpenTelemetry."""
+  try:
+    from opentelemetry import trace as otel_trace
+  except ImportError:
+    logger.warning("TRACING__OTEL_ENABLED is set but opentelemetry is not installed")
+    return
+
+  tracer = otel_trace.get_tracer(settings.tracing.SERVICE_NAME)
+  contexts = {}
+  for item in trace.spans:
+    start_ns = int(item.start * 1e9)
+    end_ns = start_ns + int((item.duration_ms or 0) * 1e6)
+    attributes = {
+      "leia.kind": item.kind,
+      "leia.chat_id": str(trace.chat_id),
+      "leia.message_id": str(trace.message_id),
+      **{
+        f"leia.{k}": v
+        for k, v in item.attributes.items()
+        if isinstance(v, (str, bool, int, float))
+      },
+    }
+    otel_span = tracer.start_span(
+      item.name,
+      context=contexts.get(item.parent_id),
+      start_time=start_ns,
+      attributes=attributes,
+    )
+    if item.error:
+      otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, item.error))
+    otel_span.end(end_time=end_ns)
+    contexts[item.id] = otel_trace.set_span_in_context(otel_span)
+
+
+async def _export(trace: Trace) -> None:
+  record = trace.to_dict()
+  logger.info(
+    "Trace %s for chat %s: %.0f ms, %s spans, tokens=%s",
+    trace.id,
+    trace.chat_id,
+    record['duration_ms'],
+    len(trace.spans),
+    record['tokens']
+  )
+  try:
+    metrics.record_trace(trace)
+    if settings.tracing.JSON_SINK_PATH:
+      await asyncio.to_thread(_write_json, record)
+    if settings.tracing.OTEL_ENABLED:
+      _export_otel(trace)
+  except Exception as e:
+    logger.error("Error exporting trace %s: %s", trace.id, e)
+
+
+@contextlib.asynccontextmanager
+async def trace(chat_id: Any, message_id: Any, name: str = "message"):
+  """
+  Abre a trace de uma mensagem. Chamadas aninhadas reaproveitam a trace já
+  aberta, que é exportada apenas quando a mais externa termina.
+  """
+  existing = _current_trace.get()
+  if existing is not None:
+    yield existing
+    return
+  if not settings.tracing.ENABLED:
+    with log_context(chat_id=chat_id, message_id=message_id):
+      yield None
+    return
+
+  current = Trace(chat_id, message_id, name)
+  trace_token = _current_trace.set(current)
+  span_token = _current_span.set(current.root.id)
+  try:
+    with log_context(chat_id=chat_id, message_id=message_id, trace_id=current.id):
+      yield current
+  except BaseException as e:
+    current.root.finish(e)
+    raise
+  else:
+    current.root.finish()
+  finally:
+    _current_span.reset(span_token)
+    _current_trace.reset(trace_token)
+    await _export(current)
+
+
+class TracingCallbackHandler(AsyncCallbackHandler):
+  """
+  Converte os callbacks do LangChain/LangGraph em spans: nós do grafo,
+  chamadas de LLM (com tokens) e ferramentas.
+  """
+
+  # Executa no mesmo contexto da chamada, mantendo a hierarquia de spans
+  run_inline = True
+
+  def __init__(self, trace: Trace):
+    self.trace = trace
+    self.open_spans: dict[UUID, Span] = {}
+    self.previous_nodes: dict[UUID, str | None] = {}
+
+  def _parent(self, parent_run_id: UUID | None) -> str | None:
+    if parent_run_id is None:
+      return _current_span.get()
+    return self.trace.run_spans.get(parent_run_id, _current_span.get())
+
+  def _start(
+    self,
+    run_id: UUID,
+    parent_run_id: UUID | None,
+    name: str,
+    kind: str,
+    attributes: dict[str, Any] | None = None,
+  ) -> None:
+    current = self.trace.add(name, kind, self._parent(parent_run_id), attributes)
+    self.open_spans[run_id] = current
+    self.trace.run_spans[run_id] = current.id
+    _current_span.set(current.id)
+
+  def _skip(self, run_id: UUID, parent_run_id: UUID | None) -> None:
+    """Runs internos (sequências, parsers) herdam o span do pai."""
+    self.trace.run_spans[run_id] = self._parent(parent_run_id)
+
+  def _end(self, run_id: UUID, error: BaseException | None = None) -> Span | None:
+    current = self.open_spans.pop(run_id, None)
+    if current is None:
+      return None
+    current.finish(error)
+    _current_span.set(current.parent_id)
+    return current
+
+  async def on_chain_start(
+    self,
+    serialized: dict[str, Any] | None,
+    inputs: dict[str, Any],
+    *,
+    run_id: UUID,
+    parent_run_id: UUID | None = None,
+    metadata: dict[str, Any] | None = None,
+    **kwargs: Any,
+  ) -> None:
+    node = (metadata or {}).get("langgraph_node")
+    if node and kwargs.get("name") == node:
+      self._start(run_id, parent_run_id, node, "node")
+      self.previous_nodes[run_id] = get_log_context().get("node")
+      update_log_context(node=node)
+    else:
+      self._skip(run_id, parent_run_id)
+
+  async def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+    self._end(run_id)
+    self._restore_node(run_id)
+
+  async def on_chain_error(
+    self, error: BaseException, *, run_id: UUID, **kwargs: Any
+  ) -> None:
+    self._end(run_id, error)
+    self._restore_node(run_id)
+
+  def _restore_node(self, run_id: UUID) -> None:
+    """Volta o campo node dos logs para o nó que continha o nó encerrado."""
+    if run_id in self.previous_nodes:
+      update_log_context(node=self.previous_nodes.pop(run_id))
+
+  async def on_chat_model_start(
+    self,
+    serialized: dict[str, Any] | None,
+    messages: list[list[Any]],
+    *,
+    run_id: UUID,
+    parent_run_id: UUID | None = None,
+    metadata: dict[str, Any] | None = None,
+    **kwargs: Any,
+  ) -> None:
+    model = (metadata or {}).get("ls_model_name") or kwargs.get("name") or "llm"
+    self._start(
+      run_id,
+      parent_run_id,
+      f"llm.{model}",
+      "llm",
+      {"model": model, "messages": sum(len(m) for m in messages)},
+    )
+
+  async def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+    current = self._end(run_id)
+    if current is None:
+      return
+    for generations in response.generations:
+      for generation in generations:
+        if not isinstance(generation, ChatGeneration):
+          continue
+        usage = getattr(generation.message, "usage_metadata", None) or {}
+        for key in ("input_tokens", "output_tokens", "total_tokens"):
+          if key in usage:
+            current.attributes[key] = current.attributes.get(key, 0) + usage[key]
+        cached = (usage.get("input_token_details") or {}).get("cache_read")
+        if not cached:
+          # Integrações que não mapeiam o cache expõem o campo cru da API
+          token_usage = generation.message.response_metadata.get("token_usage") or {}
+          cached = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+        if cached:
+          current.attributes["cached_tokens"] = (
+            current.attributes.get("cached_tokens", 0) + cached
+          )
+
+  async def on_llm_error(
+    self, error: BaseException, *, run_id: UUID, **kwargs: Any
+  ) -> None:
+    self._end(run_id, error)
+
+  async def on_tool_start(
+    self,
+    serialized: dict[str, Any] | None,
+    input_str: str,
+    *,
+    run_id: UUID,
+    parent_run_id: UUID | None = None,
+    **kwargs: Any,
+  ) -> None:
+    name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+    self._start(run_id, parent_run_id, f"tool.{name}", "tool", {"tool": name})
+
+  async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+    current = self._end(run_id)
+    if current is not None:
+      current.attributes["output_chars"] = len(str(getattr(output, "content", output)))
+
+  async def on_tool_error(
+    self, error: BaseException, *, run_id: UUID, **kwargs: Any
+  ) -> None:
+    self._end(run_id, error)
@@ -15,6 +15,13 @@ from src.graphs.response_generation.nodes.formatter import (
 from src.graphs.response_generation.nodes.input_digest import (
   input_digest as ResponseGenerationInputDigestNode,
 )
+from src.graphs.response_generation.nodes.memory_compaction import (
+  memory_compaction as ResponseGenerationMemoryCompactionNode,
+)
+from src.graphs.response_generation.nodes.intent_router import (
+  intent_router as ResponseGenerationIntentRouterNode,
+  route_after_intent,
+)
 from langgraph.types import Checkpointer
 from langgraph.graph.state import CompiledStateGraph
 
@@ -32,10 +39,18 @@ def get_response_generation_workflow(
       output_schema=OutputState,
     )
     .add_node("input_digest", ResponseGenerationInputDigestNode)
+    .add_node("memory_compaction", ResponseGenerationMemoryCompactionNode)
+    .add_node("intent_router", ResponseGenerationIntentRouterNode)
     .add_node("main_bot", ResponseGenerationMainBotNode)
     .add_node("formatter", ResponseGenerationFormatterNode)
     .add_edge(START, "input_digest")
-    .add_edge("input_digest", "main_bot")
+    .add_edge("input_digest", "memory_compaction")
+    .add_edge("memory_compaction", "intent_router")
+    .add_conditional_edges(
+      "intent_router",
+      route_after_intent,
+      {"answered": END, "agent": "main_bot"},
+    )
     .add_edge("main_bot", "formatter")
     .add_edge("formatter", END)
     .compile(name="Response Generation Workflow", checkpointer=checkpointer)
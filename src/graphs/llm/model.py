@@ -1,28 +1,98 @@
 import logging
-from langchain_groq import ChatGroq
+from typing import TYPE_CHECKING
 from pydantic import SecretStr
-from groq import Groq
+from src.core.config import settings
+
+# Os SDKs dos provedores são importados apenas quando um cliente é criado
+if TYPE_CHECKING:
+  from groq import Groq
+  from langchain_core.language_models import BaseChatModel
 
 logger = logging.getLogger(__name__)
 
 
-def create_llm(
+def _create_chat_model(
   model_name: str,
   api_key: SecretStr,
   temperature: float,
   timeout: float,
-):
-  logger.info(
-    f"Creating LLM with  model: {model_name}, temperature: {temperature}, timeout: {timeout}, api_key set: {'Yes' if api_key else 'No'}"
+  max_retries: int,
+) -> "BaseChatModel":
+  """
+  Com FIXTURES__MODE record ou replay, envolve o modelo em um FixtureChatModel;
+  no replay o provedor nem é criado, então não precisa de rede nem de API key.
+  """
+  if settings.fixtures.MODE == "off":
+    return _create_provider_model(model_name, api_key, temperature, timeout, max_retries)
+
+  from src.graphs.llm.replay import FixtureChatModel
+
+  inner = (
+    None
+    if settings.fixtures.MODE == "replay"
+    else _create_provider_model(model_name, api_key, temperature, timeout, max_retries)
   )
+  return FixtureChatModel(model_name=model_name, inner=inner)
+
+
+def _create_provider_model(
+  model_name: str,
+  api_key: SecretStr,
+  temperature: float,
+  timeout: float,
+  max_retries: int,
+) -> "BaseChatModel":
+  if model_name.startswith("stub:"):
+    from src.graphs.llm.router import StubChatModel
+
+    return StubChatModel.from_spec(model_name.removeprefix("stub:"))
+
+  from langchain_groq import ChatGroq
+
   return ChatGroq(
     model=model_name,
     api_key=api_key,
-    max_retries=3,
+    max_retries=max_retries,
     timeout=timeout,
     temperature=temperature,
   )
+
+
+def create_llm(
+  model_name: str,
+  api_key: SecretStr,
+  temperature: float,
+  timeout: float,
+  fallback_models: list[str] | None = None,
+) -> "BaseChatModel":
+  """
+  Cria o modelo de chat. Com fallback_models, retorna um FallbackChatModel que
+  tenta os modelos em ordem, com circuit breaker e hedging por modelo. Nesse
+  caso os retries do SDK caem para LLM_ROUTING__MAX_RETRIES_WITH_FALLBACK,
+  para que um provedor lento não segure o usuário antes do fallback.
+  """
+  logger.info(
+    "Creating LLM with  model: %s, fallbacks: %s, temperature: %s, timeout: %s, api_key set: %s",
+    model_name,
+    fallback_models or [],
+    temperature,
+    timeout,
+    "Yes" if api_key else "No",
+  )
+  if not fallback_models:
+    return _create_chat_model(model_name, api_key, temperature, timeout, 3)
+
+  from src.graphs.llm.router import create_routed_llm
+
+  max_retries = settings.llm_routing.MAX_RETRIES_WITH_FALLBACK
+  return create_routed_llm(
+    [model_name, *fallback_models],
+    lambda name: _create_chat_model(name, api_key, temperature, timeout, max_retries),
+  )
+
   
-def create_groq_client(api_key: SecretStr):
-  logger.info(f"Creating Groq client with api_key set: {'Yes' if api_key else 'No'}")
+def create_groq_client(api_key: SecretStr) -> "Groq":
+  from groq import Groq
+
+  logger.info("Creating Groq client with api_key set: %s", 'Yes' if api_key else 'No')
   return Groq(api_key=api_key.get_secret_value())
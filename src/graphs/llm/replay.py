@@ -0,0 +1,94 @@
+import logging
+from collections.abc import Sequence
+from typing import Any
+
+from langchain_core.callbacks import (
+  AsyncCallbackManager,
+  AsyncCallbackManagerForLLMRun,
+  CallbackManager,
+  CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from src.core import fixtures
+from src.graphs.llm.router import _child_callbacks
+
+logger = logging.getLogger(__name__)
+
+
+def _describe_message(message: BaseMessage) -> dict[str, Any]:
+  """
+  Parte da mensagem que identifica a requisição. IDs de mensagem e de tool
+  call ficam de fora, pois mudam a cada execução sem mudar o pedido.
+  """
+  described: dict[str, Any] = {"type": message.type, "content": message.content}
+  tool_calls = getattr(message, "tool_calls", None)
+  if tool_calls:
+    described["tool_calls"] = [[c["name"], c["args"]] for c in tool_calls]
+  if getattr(message, "name", None):
+    described["name"] = message.name
+  return described
+
+
+class FixtureChatModel(BaseChatModel):
+  """
+  Grava (com inner) ou reproduz (sem inner) as respostas de um modelo de chat,
+  segundo FIXTURES__MODE. A chave é o modelo, as tools e as mensagens enviadas.
+  """
+
+  model_name: str
+  inner: Any = None
+  tools: list[str] = []
+
+  @property
+  def _llm_type(self) -> str:
+    return "fixture"
+
+  def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "FixtureChatModel":
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+
+    names = [convert_to_openai_tool(t)["function"]["name"] for t in tools]
+    inner = self.inner.bind_tools(tools, **kwargs) if self.inner is not None else None
+    return self.model_copy(update={"inner": inner, "tools": names})
+
+  def _request(self, messages: list[BaseMessage]) -> dict[str, Any]:
+    return {
+      "model": self.model_name,
+      "tools": self.tools,
+      "messages": [_describe_message(m) for m in messages],
+    }
+
+  @staticmethod
+  def _result(data: dict[str, Any]) -> ChatResult:
+    return ChatResult(generations=[ChatGeneration(message=messages_from_dict([data])[0])])
+
+  def _generate(
+    self,
+    messages: list[BaseMessage],
+    stop: list[str] | None = None,
+    run_manager: CallbackManagerForLLMRun | None = None,
+    **kwargs: Any,
+  ) -> ChatResult:
+    def call() -> dict[str, Any]:
+      callbacks = _child_callbacks(run_manager, CallbackManager)
+      return message_to_dict(
+        self.inner.invoke(messages, {"callbacks": callbacks}, stop=stop, **kwargs)
+      )
+
+    return self._result(fixtures.through("llm", self._request(messages), call))
+
+  async def _agenerate(
+    self,
+    messages: list[BaseMessage],
+    stop: list[str] | None = None,
+    run_manager: AsyncCallbackManagerForLLMRun | None = None,
+    **kwargs: Any,
+  ) -> ChatResult:
+    async def call() -> dict[str, Any]:
+      callbacks = _child_callbacks(run_manager, AsyncCallbackManager)
+      return message_to_dict(
+        await self.inner.ainvoke(messages, {"callbacks": callbacks}, stop=stop, **kwargs)
+      )
+
+    return self._result(await fixtures.athrough("llm", self._request(messages), call))
@@ -0,0 +1,345 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from langchain_core.callbacks import (
+  AsyncCallbackManager,
+  AsyncCallbackManagerForLLMRun,
+  BaseCallbackManager,
+  CallbackManager,
+  CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+from src.core import metrics
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+  """
+  Abre após N falhas consecutivas e recusa chamadas por reset_seconds. Depois
+  disso, deixa uma chamada de teste passar por janela (half-open): sucesso
+  fecha o circuito, falha o abre de novo.
+  """
+
+  def __init__(self, failure_threshold: int, reset_seconds: float):
+    self.failure_threshold = failure_threshold
+    self.reset_seconds = reset_seconds
+    self.failures = 0
+    self.opened_at: float | None = None
+    # Instante da última chamada de teste liberada no half-open. Expira junto
+    # com a janela, caso o modelo liberado nem chegue a ser chamado
+    self.trial_at: float | None = None
+    self.lock = threading.Lock()
+
+  def allow(self) -> bool:
+    with self.lock:
+      if self.opened_at is None:
+        return True
+      now = time.monotonic()
+      if now - self.opened_at < self.reset_seconds:
+        return False
+      if self.trial_at is not None and now - self.trial_at < self.reset_seconds:
+        return False
+      self.trial_at = now
+      return True
+
+  def record_success(self) -> None:
+    with self.lock:
+      self.failures = 0
+      self.opened_at = None
+      self.trial_at = None
+
+  def record_failure(self) -> None:
+    with self.lock:
+      self.failures += 1
+      self.trial_at = None
+      if self.failures >= self.failure_threshold:
+        self.opened_at = time.monotonic()
+
+  @property
+  def state(self) -> str:
+    if self.opened_at is None:
+      return "closed"
+    if time.monotonic() - self.opened_at < self.reset_seconds:
+      return "open"
+    return "half_open"
+
+
+class LatencyTracker:
+  """Janela das latências mais recentes de um modelo, para estimar o p95."""
+
+  def __init__(self, window: int):
+    self.samples: deque[float] = deque(maxlen=window)
+    self.lock = threading.Lock()
+
+  def record(self, seconds: float) -> None:
+    with self.lock:
+      self.samples.append(seconds)
+
+  def p95(self) -> float | None:
+    with self.lock:
+      if len(self.samples) < settings.llm_routing.HEDGE_MIN_SAMPLES:
+        return None
+      ordered = sorted(self.samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+# Estado compartilhado entre requisições, por nome de modelo
+_breakers: dict[str, CircuitBreaker] = {}
+_latencies: dict[str, LatencyTracker] = {}
+_state_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+  with _state_lock:
+    if name not in _breakers:
+      _breakers[name] = CircuitBreaker(
+        settings.llm_routing.CIRCUIT_FAILURE_THRESHOLD,
+        settings.llm_routing.CIRCUIT_RESET_SECONDS,
+      )
+    return _breakers[name]
+
+
+def get_latency(name: str) -> LatencyTracker:
+  with _state_lock:
+    if name not in _latencies:
+      _latencies[name] = LatencyTracker(settings.llm_routing.LATENCY_WINDOW)
+    return _latencies[name]
+
+
+def get_routing_stats() -> dict[str, dict[str, Any]]:
+  with _state_lock:
+    names = set(_breakers) | set(_latencies)
+  return {
+    name: {"circuit": get_breaker(name).state, "p95_seconds": get_latency(name).p95()}
+    for name in sorted(names)
+  }
+
+
+def _collect_circuits() -> None:
+  for name, stats in get_routing_stats().items():
+    metrics.llm_circuit_open.set(int(stats["circuit"] == "open"), model=name)
+
+
+metrics.registry.add_collector(_collect_circuits)
+
+
+class StubChatModel(BaseChatModel):
+  """
+  Provedor falso para testes e benchmarks, criado com "stub:<opções>", ex.:
+  "stub:latency=0.5", "stub:fail" ou "stub:latency=0.2,slow_rate=0.05,
+  slow_latency=5,reply=olá". fail_rate e slow_rate sorteiam por chamada.
+  """
+
+  model_name: str = "stub"
+  latency: float = 0.0
+  slow_rate: float = 0.0
+  slow_latency: float = 0.0
+  fail_rate: float = 0.0
+  reply: str = "ok"
+
+  @classmethod
+  def from_spec(cls, spec: str) -> "StubChatModel":
+    options: dict[str, Any] = {"model_name": f"stub:{spec}"}
+    for item in filter(None, spec.split(",")):
+      key, _, value = item.partition("=")
+      if key == "fail":
+        options["fail_rate"] = 1.0
+      elif key == "reply":
+        options["reply"] = value
+      else:
+        options[key] = float(value)
+    return cls(**options)
+
+  @property
+  def _llm_type(self) -> str:
+    return "stub"
+
+  def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "StubChatModel":
+    return self
+
+  def _latency(self) -> float:
+    if random.random() < self.slow_rate:
+      return self.slow_latency
+    return self.latency
+
+  def _result(self) -> ChatResult:
+    if random.random() < self.fail_rate:
+      raise RuntimeError(f"{self.model_name} failed")
+    return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+  def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+    time.sleep(self._latency())
+    return self._result()
+
+  async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+    await asyncio.sleep(self._latency())
+    return self._result()
+
+
+def _child_callbacks(
+  run_manager: CallbackManagerForLLMRun | AsyncCallbackManagerForLLMRun | None,
+  manager_cls: type[BaseCallbackManager],
+) -> BaseCallbackManager | None:
+  """
+  Callbacks para as chamadas internas, como filhas do run do FallbackChatModel
+  (o run manager de LLM não tem get_child, como o de chains).
+  """
+  if run_manager is None:
+    return None
+  manager = manager_cls(handlers=[], parent_run_id=run_manager.run_id)
+  manager.set_handlers(run_manager.inheritable_handlers)
+  manager.add_tags(run_manager.inheritable_tags)
+  manager.add_metadata(run_manager.inheritable_metadata)
+  return manager
+
+
+class FallbackChatModel(BaseChatModel):
+  """
+  Encaminha cada chamada para o primeiro modelo disponível da lista, pulando
+  os que estão com o circuito aberto e tentando o próximo em caso de erro.
+  Com hedging, se o modelo não responder dentro do seu p95, dispara o próximo
+  em paralelo e usa a primeira resposta bem-sucedida.
+  """
+
+  models: list[Any]
+  names: list[str]
+  hedge: bool = False
+  model_name: str = "fallback"
+
+  @property
+  def _llm_type(self) -> str:
+    return "fallback"
+
+  def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "FallbackChatModel":
+    return self.model_copy(
+      update={"models": [m.bind_tools(tools, **kwargs) for m in self.models]}
+    )
+
+  def _candidates(self) -> list[tuple[str, Runnable]]:
+    candidates = [
+      (name, model)
+      for name, model in zip(self.names, self.models)
+      if get_breaker(name).allow()
+    ]
+    if not candidates:
+      # Com todos os circuitos abertos, tenta o principal mesmo assim
+      logger.warning("All LLM circuits are open, trying %s anyway", self.names[0])
+      candidates = [(self.names[0], self.models[0])]
+    return candidates
+
+  @staticmethod
+  def _record(name: str, started_at: float, error: BaseException | None) -> None:
+    if error is None:
+      get_latency(name).record(time.perf_counter() - started_at)
+      get_breaker(name).record_success()
+    elif not isinstance(error, asyncio.CancelledError):
+      logger.warning("LLM %s failed: %s", name, error)
+      get_breaker(name).record_failure()
+
+  def _generate(
+    self,
+    messages: list[BaseMessage],
+    stop: list[str] | None = None,
+    run_manager: CallbackManagerForLLMRun | None = None,
+    **kwargs: Any,
+  ) -> ChatResult:
+    callbacks = _child_callbacks(run_manager, CallbackManager)
+    error: BaseException | None = None
+    for name, model in self._candidates():
+      started_at = time.perf_counter()
+      try:
+        message = model.invoke(messages, {"callbacks": callbacks}, stop=stop, **kwargs)
+      except Exception as e:
+        self._record(name, started_at, e)
+        error = e
+        continue
+      self._record(name, started_at, None)
+      return ChatResult(generations=[ChatGeneration(message=message)])
+    raise error or RuntimeError("No LLM available")
+
+  async def _agenerate(
+    self,
+    messages: list[BaseMessage],
+    stop: list[str] | None = None,
+    run_manager: AsyncCallbackManagerForLLMRun | None = None,
+    **kwargs: Any,
+  ) -> ChatResult:
+    callbacks = _child_callbacks(run_manager, AsyncCallbackManager)
+
+    def start(name: str, model: Runnable) -> asyncio.Task:
+      started_at = time.perf_counter()
+
+      async def call():
+        try:
+          result = await model.ainvoke(
+            messages, {"callbacks": callbacks}, stop=stop, **kwargs
+          )
+        except BaseException as e:
+          self._record(name, started_at, e)
+          raise
+        self._record(name, started_at, None)
+        return result
+
+      return asyncio.create_task(call(), name=f"llm:{name}")
+
+    candidates = self._candidates()
+    error: BaseException | None = None
+    while candidates:
+      name, model = candidates.pop(0)
+      pending = {start(name, model)}
+      hedge_delay = self._hedge_delay(name) if candidates else None
+      try:
+        while pending:
+          done, pending = await asyncio.wait(
+            pending,
+            timeout=hedge_delay,
+            return_when=asyncio.FIRST_COMPLETED,
+          )
+          if not done:
+            # O principal passou do p95: dispara o próximo sem cancelar o primeiro
+            hedge_name, hedge_model = candidates.pop(0)
+            logger.info("Hedging LLM call from %s to %s", name, hedge_name)
+            metrics.llm_hedges.inc(model=name)
+            pending.add(start(hedge_name, hedge_model))
+            hedge_delay = None
+            continue
+          for task in done:
+            if task.exception() is None:
+              return ChatResult(generations=[ChatGeneration(message=task.result())])
+            error = task.exception()
+          hedge_delay = None
+      finally:
+        for task in pending:
+          task.cancel()
+    raise error or RuntimeError("No LLM available")
+
+  def _hedge_delay(self, name: str) -> float | None:
+    if not self.hedge:
+      return None
+    p95 = get_latency(name).p95()
+    if p95 is None:
+      return settings.llm_routing.HEDGE_DEFAULT_DELAY_SECONDS
+    return max(p95, settings.llm_routing.HEDGE_MIN_DELAY_SECONDS)
+
+
+def create_routed_llm(
+  model_names: list[str],
+  create_model: Callable[[str], Runnable],
+) -> BaseChatModel:
+  """Monta o FallbackChatModel com um modelo por nome, na ordem de preferência."""
+  return FallbackChatModel(
+    models=[create_model(name) for name in model_names],
+    names=model_names,
+    hedge=settings.llm_routing.HEDGE_ENABLED,
+  )
@@ -0,0 +1,167 @@
+import functools
+import json
+import logging
+from collections.abc import Sequence
+from typing import Any
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from src.core import metrics, tracing
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tokens de formatação que a API acrescenta por mensagem (papel, separadores)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Usado quando o tokenizer local não está disponível
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = "\n[... saída truncada para caber no contexto ...]"
+
+
+@functools.cache
+def _encoding():
+  """
+  Carrega o tokenizer do tiktoken uma vez (no startup, pelo lifespan). O
+  tiktoken procura o encoding em TIKTOKEN_CACHE_DIR e, se não achar, baixa.
+  Sem o pacote ou sem os arquivos do encoding, usa a heurística.
+  """
+  try:
+    import tiktoken
+
+    return tiktoken.get_encoding(settings.token_budget.ENCODING)
+  except Exception as e:
+    logger.warning("Tokenizer unavailable, estimating tokens by length: %s", e)
+    return None
+
+
+def count_text(text: str) -> int:
+  encoding = _encoding()
+  if encoding is None:
+    return len(text) // CHARS_PER_TOKEN
+  return len(encoding.encode(text, disallowed_special=()))
+
+
+def _content(message: BaseMessage) -> str:
+  return message.content if isinstance(message.content, str) else str(message.content)
+
+
+def count_message(message: BaseMessage) -> int:
+  tokens = count_text(_content(message)) + MESSAGE_OVERHEAD_TOKENS
+  if isinstance(message, AIMessage) and message.tool_calls:
+    tokens += count_text(json.dumps(message.tool_calls, default=str))
+  return tokens
+
+
+def count_messages(messages: Sequence[BaseMessage]) -> int:
+  return sum(count_message(m) for m in messages)
+
+
+def count_tools(tools: Sequence[Any]) -> int:
+  """Tokens dos schemas das tools, enviados junto de toda chamada."""
+  from langchain_core.utils.function_calling import convert_to_openai_tool
+
+  return count_text(json.dumps([convert_to_openai_tool(t) for t in tools]))
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+  if count_text(text) <= max_tokens:
+    return text
+  # O marcador também conta no orçamento
+  keep = max(0, max_tokens - count_text(TRUNCATION_MARKER))
+  encoding = _encoding()
+  if encoding is None:
+    return text[: keep * CHARS_PER_TOKEN] + TRUNCATION_MARKER
+  tokens = encoding.encode(text, disallowed_special=())
+  return encoding.decode(tokens[:keep]) + TRUNCATION_MARKER
+
+
+def _current_turn_start(messages: list[BaseMessage]) -> int:
+  return next(
+    (i for i in range(len(messages) - 1, -1, -1) if isinstance(messages[i], HumanMessage)),
+    0,
+  )
+
+
+def enforce_budget(
+  fixed: dict[str, int],
+  messages: list[BaseMessage],
+) -> list[BaseMessage]:
+  """
+  Garante que fixed (prompt, tools, ...) + messages caibam em
+  TOKEN_BUDGET__MAX_INPUT_TOKENS, nesta ordem:
+
+  1. descarta os turnos mais antigos do histórico, sempre cortando em uma
+     mensagem do usuário para não separar tool calls dos seus resultados;
+  2. trunca as maiores saídas de ferramentas do turno atual, até
+     MIN_TOOL_RESULT_TOKENS cada.
+
+  Registra a divisão de tokens por segmento na trace e nas métricas.
+  """
+  budget = settings.token_budget.MAX_INPUT_TOKENS
+  turn_start = _current_turn_start(messages)
+  history, turn = list(messages[:turn_start]), list(messages[turn_start:])
+  history_tokens = [count_message(m) for m in history]
+  turn_tokens = [count_message(m) for m in turn]
+  fixed_total = sum(fixed.values())
+  available = budget - fixed_total - sum(turn_tokens)
+
+  dropped = 0
+  while history and sum(history_tokens) > available:
+    # Remove o turno mais antigo inteiro (até a próxima mensagem do usuário)
+    end = next(
+      (i for i in range(1, len(history)) if isinstance(history[i], HumanMessage)),
+      len(history),
+    )
+    dropped += end
+    del history[:end], history_tokens[:end]
+
+  truncated = 0
+  excess = fixed_total + sum(history_tokens) + sum(turn_tokens) - budget
+  if excess > 0:
+    floor = settings.token_budget.MIN_TOOL_RESULT_TOKENS
+    by_size = sorted(
+      (i for i, m in enumerate(turn) if isinstance(m, ToolMessage)),
+      key=lambda i: turn_tokens[i],
+      reverse=True,
+    )
+    for i in by_size:
+      if excess <= 0 or turn_tokens[i] <= floor:
+        break
+      target = max(floor, turn_tokens[i] - excess)
+      message = turn[i]
+      turn[i] = message.model_copy(
+        update={
+          "content": truncate_text(_content(message), target - MESSAGE_OVERHEAD_TOKENS)
+        }
+      )
+      new_tokens = count_message(turn[i])
+      excess -= turn_tokens[i] - new_tokens
+      turn_tokens[i] = new_tokens
+      truncated += 1
+
+  breakdown = {
+    **fixed,
+    "history": sum(history_tokens),
+    "current_turn": sum(turn_tokens),
+  }
+  total = sum(breakdown.values())
+  for segment, tokens in breakdown.items():
+    metrics.prompt_tokens.observe(tokens, segment=segment)
+  tracing.event(
+    "prompt.tokens",
+    budget=budget,
+    total=total,
+    dropped_messages=dropped,
+    truncated_tool_results=truncated,
+    **{f"segment_{k}": v for k, v in breakdown.items()},
+  )
+  if dropped or truncated:
+    logger.info(
+      "Prompt over budget (%s tokens): dropped %s messages, truncated %s tool results, now %s tokens",
+      budget,
+      dropped,
+      truncated,
+      total,
+    )
+  if total > budget:
+    logger.warning("Prompt still exceeds token budget: %s > %s", total, budget)
+  return history + turn
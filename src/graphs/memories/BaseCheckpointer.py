@@ -22,3 +22,11 @@ class BaseCheckpointer(ABC):
   @abstractmethod
   async def open(self):
     pass
+
+  def get_stats(self) -> dict[str, int]:
+    """Estatísticas de uso da memória (tamanho, conexões, etc.), se houver."""
+    return {}
+
+  async def ping(self) -> None:
+    """Verifica se o armazenamento está acessível, lançando erro caso não."""
+    return None
@@ -8,19 +8,25 @@ from src.graphs.memories.strategies.PostgresCheckpointer import (
 from src.graphs.memories.strategies.InMemoryCheckpointer import (
   InMemoryCheckpointer,
 )
+from src.graphs.memories.strategies.LRUInMemoryCheckpointer import (
+  LRUInMemoryCheckpointer,
+)
+from src.graphs.memories.strategies.RedisCheckpointer import RedisCheckpointer
 
 logger = logging.getLogger(__name__)
 
 STRATEGIES: dict[str, Type[BaseCheckpointer]] = {
   "postgres": PostgresCheckpointer,
   "in_memory": InMemoryCheckpointer,
+  "lru_in_memory": LRUInMemoryCheckpointer,
+  "redis": RedisCheckpointer,
 }
 
 
 def get_base_checkpointer() -> BaseCheckpointer:
-  logger.info(f"Using memory strategy: {settings.memory.STRATEGY}")
+  logger.info("Using memory strategy: %s", settings.memory.STRATEGY)
   strategy_class = STRATEGIES.get(settings.memory.STRATEGY)
   if not strategy_class:
-    logger.error(f"Unknown memory strategy: {settings.memory.STRATEGY}")
+    logger.error("Unknown memory strategy: %s", settings.memory.STRATEGY)
     raise ValueError(f"Unknown memory strategy: {settings.memory.STRATEGY}")
   return strategy_class()
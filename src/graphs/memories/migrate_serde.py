@@ -0,0 +1,118 @@
+"""
+Recomprime as linhas existentes de checkpoint_blobs e checkpoint_writes com o
+serializer zstd.
+
+A migração é opcional: o CompressedSerializer lê normalmente linhas antigas
+(sem o sufixo "+zstd"), e elas deixam de existir conforme as conversas avançam
+ou a retenção as remove. O script apenas antecipa a economia de espaço.
+
+Uso:
+  uv run python -m src.graphs.memories.migrate_serde --dry-run
+  uv run python -m src.graphs.memories.migrate_serde --batch-size 500
+"""
+
+import argparse
+import logging
+import time
+
+import psycopg
+from src.core.config import settings
+from src.graphs.memories.serde import (
+  COMPRESSED_SUFFIX,
+  COMPRESSIBLE_TYPES,
+  CompressedSerializer,
+)
+
+logger = logging.getLogger(__name__)
+
+# (tabela, colunas da chave primária)
+TABLES = {
+  "checkpoint_blobs": ("thread_id", "checkpoint_ns", "channel", "version"),
+  "checkpoint_writes": (
+    "thread_id", "checkpoint_ns", "checkpoint_id", "task_id", "idx"
+  ),
+}
+
+
+def _select_sql(table: str, keys: tuple[str, ...]) -> str:
+  return f"""
+    SELECT {", ".join(keys)}, type, blob FROM {table}
+    WHERE type = ANY(%(types)s) AND octet_length(blob) >= %(min_size)s
+    ORDER BY {", ".join(keys)}
+    LIMIT %(batch_size)s
+    FOR UPDATE SKIP LOCKED
+  """
+
+
+def _update_sql(table: str, keys: tuple[str, ...]) -> str:
+  where = " AND ".join(f"{key} = %({key})s" for key in keys)
+  return f"UPDATE {table} SET type = %(type)s, blob = %(blob)s WHERE {where}"
+
+
+def migrate_table(
+  conn: psycopg.Connection,
+  serde: CompressedSerializer,
+  table: str,
+  batch_size: int,
+  dry_run: bool,
+) -> tuple[int, int, int]:
+  """Retorna (linhas, bytes antes, bytes depois) da tabela migrada."""
+  keys = TABLES[table]
+  rows = before = after = 0
+  params = {
+    "types": list(COMPRESSIBLE_TYPES),
+    "min_size": serde.min_size,
+    "batch_size": batch_size,
+  }
+  while True:
+    with conn.transaction():
+      batch = conn.execute(_select_sql(table, keys), params).fetchall()
+      if not batch:
+        return rows, before, after
+      for row in batch:
+        *key_values, type_, blob = row
+        compressed = serde._compressor().compress(blob)
+        rows += 1
+        before += len(blob)
+        after += len(compressed)
+        if not dry_run:
+          conn.execute(
+            _update_sql(table, keys),
+            {
+              **dict(zip(keys, key_values)),
+              "type": type_ + COMPRESSED_SUFFIX,
+              "blob": compressed,
+            },
+          )
+      if dry_run:
+        # Sem UPDATE as mesmas linhas voltariam no próximo lote
+        return rows, before, after
+    logger.info("%s: %s rows recompressed so far", table, rows)
+    # Libera o banco entre lotes para não competir com as conversas
+    time.sleep(0.1)
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument("--batch-size", type=int, default=500)
+  parser.add_argument("--dry-run", action="store_true")
+  args = parser.parse_args()
+
+  serde = CompressedSerializer(
+    level=settings.memory.SERDE_COMPRESSION_LEVEL,
+    min_size=settings.memory.SERDE_MIN_SIZE,
+  )
+  with psycopg.connect(settings.memory.URL.get_secret_value()) as conn:
+    for table in TABLES:
+      rows, before, after = migrate_table(
+        conn, serde, table, args.batch_size, args.dry_run
+      )
+      ratio = after / before if before else 1
+      print(
+        f"{table}: {rows} linhas, {before} -> {after} bytes ({ratio:.0%})"
+        + (" [dry-run, apenas o primeiro lote]" if args.dry_run else "")
+      )
+
+
+if __name__ == "__main__":
+  main()
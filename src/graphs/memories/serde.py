@@ -0,0 +1,73 @@
+import functools
+import logging
+import threading
+from typing import Any
+
+import zstandard
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sufixo adicionado ao tipo dos payloads comprimidos ("msgpack" -> "msgpack+zstd").
+# Payloads sem o sufixo (linhas antigas ou pequenas) são lidos sem alteração.
+COMPRESSED_SUFFIX = "+zstd"
+# Tipos do JsonPlusSerializer que carregam o estado serializado
+COMPRESSIBLE_TYPES = ("msgpack", "json", "pickle")
+
+
+class CompressedSerializer(SerializerProtocol):
+  """
+  Serializa com o JsonPlusSerializer (msgpack) e comprime com zstd os payloads
+  acima de min_size. O histórico de mensagens repete prompts, saídas de
+  ferramentas e cópias em messages_history, que o zstd reduz a referências.
+  """
+
+  def __init__(self, level: int = 3, min_size: int = 512):
+    self.inner = JsonPlusSerializer()
+    self.level = level
+    self.min_size = min_size
+    # Compressores do zstandard não podem ser usados por threads concorrentes
+    self._local = threading.local()
+
+  def _compressor(self) -> zstandard.ZstdCompressor:
+    if not hasattr(self._local, "compressor"):
+      self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+      self._local.decompressor = zstandard.ZstdDecompressor()
+    return self._local.compressor
+
+  def _decompressor(self) -> zstandard.ZstdDecompressor:
+    self._compressor()
+    return self._local.decompressor
+
+  def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+    type_, data = self.inner.dumps_typed(obj)
+    if type_ not in COMPRESSIBLE_TYPES or len(data) < self.min_size:
+      return type_, data
+    return type_ + COMPRESSED_SUFFIX, self._compressor().compress(data)
+
+  def loads_typed(self, data: tuple[str, bytes]) -> Any:
+    type_, payload = data
+    if type_.endswith(COMPRESSED_SUFFIX):
+      return self.inner.loads_typed(
+        (
+          type_.removesuffix(COMPRESSED_SUFFIX),
+          self._decompressor().decompress(payload),
+        )
+      )
+    return self.inner.loads_typed(data)
+
+
+@functools.cache
+def get_serde() -> SerializerProtocol:
+  """Serializer configurado em MEMORY__SERIALIZER, compartilhado pelas estratégias."""
+  if settings.memory.SERIALIZER == "zstd":
+    logger.info(
+      "Using zstd checkpoint serializer (level=%s)", settings.memory.SERDE_COMPRESSION_LEVEL
+    )
+    return CompressedSerializer(
+      level=settings.memory.SERDE_COMPRESSION_LEVEL,
+      min_size=settings.memory.SERDE_MIN_SIZE,
+    )
+  return JsonPlusSerializer()
@@ -2,6 +2,7 @@ import logging
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.checkpoint.base import BaseCheckpointSaver
 from src.graphs.memories.BaseCheckpointer import BaseCheckpointer
+from src.graphs.memories.serde import get_serde
 
 logger = logging.getLogger(__name__)
 
@@ -9,7 +10,7 @@ logger = logging.getLogger(__name__)
 class InMemoryCheckpointer(BaseCheckpointer):
   def __init__(self):
     logger.info("Initializing InMemoryCheckpointer")
-    self.checkpointer = InMemorySaver()
+    self.checkpointer = InMemorySaver(serde=get_serde())
 
   async def get_checkpointer(self) -> BaseCheckpointSaver:
     return self.checkpointer
@@ -23,6 +24,7 @@ class InMemoryCheckpointer(BaseCheckpointer):
     # Nothing to open for in-memory saver
 
   async def reset_thread(self, thread_id):
-    logger.info(f"Resetting thread [{thread_id}] in InMemoryCheckpointer")
-    await self.checkpointer.adelete_thread(thread_id)
-    logger.info(f"Thread [{thread_id}] reset in InMemoryCheckpointer")
+    logger.info("Resetting thread [%s] in InMemoryCheckpointer", thread_id)
+    # O LangGraph grava o thread_id como string, mesmo quando o chat_id é int
+    await self.checkpointer.adelete_thread(str(thread_id))
+    logger.info("Thread [%s] reset in InMemoryCheckpointer", thread_id)
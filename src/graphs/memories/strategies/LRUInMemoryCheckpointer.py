@@ -0,0 +1,231 @@
+import logging
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+  BaseCheckpointSaver,
+  ChannelVersions,
+  Checkpoint,
+  CheckpointMetadata,
+  CheckpointTuple,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+from src.core.config import settings
+from src.graphs.memories.BaseCheckpointer import BaseCheckpointer
+from src.graphs.memories.serde import get_serde
+
+logger = logging.getLogger(__name__)
+
+
+def _str_thread_id(config: RunnableConfig) -> RunnableConfig:
+  """
+  O chat_id chega como int na config, mas o LangGraph grava e apaga threads
+  pelo thread_id em string. Sem normalizar, a mesma thread teria duas chaves.
+  """
+  configurable = config["configurable"]
+  if isinstance(configurable["thread_id"], str):
+    return config
+  return {**config, "configurable": {**configurable, "thread_id": str(configurable["thread_id"])}}
+
+
+class LRUInMemorySaver(InMemorySaver):
+  """
+  InMemorySaver que guarda apenas o último checkpoint de cada thread e
+  descarta threads inteiras, da menos usada para a mais usada, ao exceder os
+  limites de quantidade de threads ou de bytes.
+  """
+
+  def __init__(self, max_threads: int, max_bytes: int, **kwargs):
+    super().__init__(**kwargs)
+    self.max_threads = max_threads
+    self.max_bytes = max_bytes
+    self.total_bytes = 0
+    self.thread_sizes: OrderedDict[Any, int] = OrderedDict()
+    # Índices por thread para evitar varrer todos os writes e blobs
+    self.blob_keys: defaultdict[Any, set[tuple]] = defaultdict(set)
+    self.write_keys: defaultdict[Any, set[tuple]] = defaultdict(set)
+    self.lock = threading.RLock()
+
+  def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+    config = _str_thread_id(config)
+    with self.lock:
+      thread_id = config["configurable"]["thread_id"]
+      if thread_id in self.thread_sizes:
+        self.thread_sizes.move_to_end(thread_id)
+      checkpoint_tuple = super().get_tuple(config)
+      self._forget_read(config, checkpoint_tuple)
+      return checkpoint_tuple
+
+  def _forget_read(
+    self, config: RunnableConfig, checkpoint_tuple: CheckpointTuple | None
+  ) -> None:
+    """
+    storage e writes são defaultdicts, e a leitura do InMemorySaver cria
+    entradas vazias que não entram nos índices e nunca seriam descartadas.
+    """
+    thread_id = config["configurable"]["thread_id"]
+    checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+    if checkpoint_tuple is not None:
+      key = (thread_id, checkpoint_ns, checkpoint_tuple.config["configurable"]["checkpoint_id"])
+      if not self.writes.get(key):
+        self.writes.pop(key, None)
+    namespaces = self.storage.get(thread_id)
+    if namespaces is not None:
+      if not namespaces.get(checkpoint_ns):
+        namespaces.pop(checkpoint_ns, None)
+      if not namespaces:
+        del self.storage[thread_id]
+
+  def put(
+    self,
+    config: RunnableConfig,
+    checkpoint: Checkpoint,
+    metadata: CheckpointMetadata,
+    new_versions: ChannelVersions,
+  ) -> RunnableConfig:
+    config = _str_thread_id(config)
+    with self.lock:
+      next_config = super().put(config, checkpoint, metadata, new_versions)
+      thread_id = config["configurable"]["thread_id"]
+      checkpoint_ns = config["configurable"]["checkpoint_ns"]
+      self.blob_keys[thread_id].update(
+        (thread_id, checkpoint_ns, channel, version)
+        for channel, version in new_versions.items()
+      )
+      self._keep_latest(thread_id, checkpoint_ns, checkpoint)
+      self._account(thread_id)
+      return next_config
+
+  def put_writes(
+    self,
+    config: RunnableConfig,
+    writes,
+    task_id: str,
+    task_path: str = "",
+  ) -> None:
+    config = _str_thread_id(config)
+    with self.lock:
+      super().put_writes(config, writes, task_id, task_path)
+      thread_id = config["configurable"]["thread_id"]
+      self.write_keys[thread_id].add(
+        (
+          thread_id,
+          config["configurable"].get("checkpoint_ns", ""),
+          config["configurable"]["checkpoint_id"],
+        )
+      )
+      self._account(thread_id)
+
+  def delete_thread(self, thread_id: str) -> None:
+    thread_id = str(thread_id)
+    with self.lock:
+      self.storage.pop(thread_id, None)
+      for key in self.write_keys.pop(thread_id, set()):
+        self.writes.pop(key, None)
+      for key in self.blob_keys.pop(thread_id, set()):
+        self.blobs.pop(key, None)
+      self.total_bytes -= self.thread_sizes.pop(thread_id, 0)
+
+  def _keep_latest(
+    self, thread_id: Any, checkpoint_ns: str, checkpoint: Checkpoint
+  ) -> None:
+    """Remove checkpoints, writes e blobs que não pertencem ao último estado."""
+    namespaces = self.storage[thread_id]
+    # Um checkpoint na raiz encerra as execuções de subgrafos anteriores
+    if checkpoint_ns == "":
+      for ns in [ns for ns in namespaces if ns != ""]:
+        del namespaces[ns]
+
+    checkpoints = namespaces[checkpoint_ns]
+    for checkpoint_id in [c for c in checkpoints if c != checkpoint["id"]]:
+      del checkpoints[checkpoint_id]
+
+    live = {
+      (thread_id, ns, checkpoint_id)
+      for ns, ns_checkpoints in namespaces.items()
+      for checkpoint_id in ns_checkpoints
+    }
+    write_keys = self.write_keys[thread_id]
+    for key in [k for k in write_keys if k not in live]:
+      self.writes.pop(key, None)
+      write_keys.discard(key)
+
+    versions = checkpoint["channel_versions"]
+    blob_keys = self.blob_keys[thread_id]
+    for key in list(blob_keys):
+      _, ns, channel, version = key
+      stale_version = ns == checkpoint_ns and versions.get(channel) != version
+      if stale_version or ns not in namespaces:
+        self.blobs.pop(key, None)
+        blob_keys.discard(key)
+
+  def _thread_bytes(self, thread_id: Any) -> int:
+    size = 0
+    for ns_checkpoints in self.storage.get(thread_id, {}).values():
+      for checkpoint, metadata, _ in ns_checkpoints.values():
+        size += len(checkpoint[1]) + len(metadata[1])
+    for key in self.blob_keys.get(thread_id, ()):
+      blob = self.blobs.get(key)
+      if blob:
+        size += len(blob[1])
+    for key in self.write_keys.get(thread_id, ()):
+      for _, _, value, _ in self.writes.get(key, {}).values():
+        size += len(value[1])
+    return size
+
+  def _account(self, thread_id: Any) -> None:
+    """Atualiza o tamanho da thread, marca como mais recente e aplica os limites."""
+    size = self._thread_bytes(thread_id)
+    self.total_bytes += size - self.thread_sizes.get(thread_id, 0)
+    self.thread_sizes[thread_id] = size
+    self.thread_sizes.move_to_end(thread_id)
+
+    while len(self.thread_sizes) > 1 and (
+      len(self.thread_sizes) > self.max_threads
+      or self.total_bytes > self.max_bytes
+    ):
+      evicted = next(iter(self.thread_sizes))
+      logger.info(
+        "Evicting thread [%s] from memory (%s bytes)", evicted, self.thread_sizes[evicted]
+      )
+      self.delete_thread(evicted)
+
+  def usage(self) -> dict[str, int]:
+    with self.lock:
+      return {
+        "threads": len(self.thread_sizes),
+        "bytes": self.total_bytes,
+        "max_threads": self.max_threads,
+        "max_bytes": self.max_bytes,
+      }
+
+
+class LRUInMemoryCheckpointer(BaseCheckpointer):
+  def __init__(self):
+    logger.info("Initializing LRUInMemoryCheckpointer")
+    self.checkpointer = LRUInMemorySaver(
+      max_threads=settings.memory.LRU_MAX_THREADS,
+      max_bytes=settings.memory.LRU_MAX_BYTES,
+      serde=get_serde(),
+    )
+
+  async def get_checkpointer(self) -> BaseCheckpointSaver:
+    return self.checkpointer
+
+  async def close(self):
+    logger.info("Closing LRUInMemoryCheckpointer")
+    # Nothing to close for in-memory saver
+
+  async def open(self):
+    logger.info("Opening LRUInMemoryCheckpointer")
+    # Nothing to open for in-memory saver
+
+  async def reset_thread(self, thread_id):
+    logger.info("Resetting thread [%s] in LRUInMemoryCheckpointer", thread_id)
+    await self.checkpointer.adelete_thread(thread_id)
+    logger.info("Thread [%s] reset in LRUInMemoryCheckpointer", thread_id)
+
+  def get_stats(self) -> dict[str, int]:
+    return self.checkpointer.usage()
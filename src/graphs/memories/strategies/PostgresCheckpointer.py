@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from datetime import datetime, timedelta, timezone
 from langgraph.checkpoint.postgres import PostgresSaver
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 from langgraph.checkpoint.base import BaseCheckpointSaver
@@ -9,32 +10,131 @@ from psycopg import AsyncConnection
 from psycopg.rows import dict_row, DictRow
 from src.core.config import settings
 from src.graphs.memories.BaseCheckpointer import BaseCheckpointer
+from src.graphs.memories.serde import get_serde
 
 logger = logging.getLogger(__name__)
 
+# Chave do advisory lock que garante um único sweeper entre réplicas
+RETENTION_LOCK_KEY = 7_340_001
+
+RESET_THREAD_SQL = """
+WITH deleted_blobs AS (
+  DELETE FROM checkpoint_blobs WHERE thread_id = %(thread_id)s
+), deleted_writes AS (
+  DELETE FROM checkpoint_writes WHERE thread_id = %(thread_id)s
+)
+DELETE FROM checkpoints WHERE thread_id = %(thread_id)s
+"""
+
+DELETE_IDLE_THREADS_SQL = """
+WITH idle AS (
+  SELECT thread_id FROM checkpoints
+  GROUP BY thread_id
+  HAVING max(checkpoint->>'ts') < %(idle_cutoff)s
+  LIMIT %(batch_size)s
+), deleted_blobs AS (
+  DELETE FROM checkpoint_blobs WHERE thread_id IN (SELECT thread_id FROM idle)
+), deleted_writes AS (
+  DELETE FROM checkpoint_writes WHERE thread_id IN (SELECT thread_id FROM idle)
+)
+DELETE FROM checkpoints WHERE thread_id IN (SELECT thread_id FROM idle)
+"""
+
+PRUNE_OLD_CHECKPOINTS_SQL = """
+WITH ranked AS (
+  SELECT thread_id, checkpoint_ns, checkpoint_id,
+    row_number() OVER (
+      PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+    ) AS position
+  FROM checkpoints
+), stale AS (
+  SELECT thread_id, checkpoint_ns, checkpoint_id FROM ranked
+  WHERE position > %(keep_last)s
+  LIMIT %(batch_size)s
+), deleted_writes AS (
+  DELETE FROM checkpoint_writes w USING stale s
+  WHERE w.thread_id = s.thread_id
+    AND w.checkpoint_ns = s.checkpoint_ns
+    AND w.checkpoint_id = s.checkpoint_id
+)
+DELETE FROM checkpoints c USING stale s
+WHERE c.thread_id = s.thread_id
+  AND c.checkpoint_ns = s.checkpoint_ns
+  AND c.checkpoint_id = s.checkpoint_id
+"""
+
+# Blobs que nenhum checkpoint restante referencia. Threads com atividade
+# recente são ignoradas para não competir com escritas em andamento.
+PRUNE_ORPHAN_BLOBS_SQL = """
+WITH orphans AS (
+  SELECT b.thread_id, b.checkpoint_ns, b.channel, b.version
+  FROM checkpoint_blobs b
+  WHERE NOT EXISTS (
+    SELECT 1 FROM checkpoints c
+    WHERE c.thread_id = b.thread_id
+      AND c.checkpoint_ns = b.checkpoint_ns
+      AND c.checkpoint->'channel_versions'->>b.channel = b.version
+  )
+  AND NOT EXISTS (
+    SELECT 1 FROM checkpoints c
+    WHERE c.thread_id = b.thread_id AND c.checkpoint->>'ts' > %(active_cutoff)s
+  )
+  LIMIT %(batch_size)s
+)
+DELETE FROM checkpoint_blobs b USING orphans o
+WHERE b.thread_id = o.thread_id
+  AND b.checkpoint_ns = o.checkpoint_ns
+  AND b.channel = o.channel
+  AND b.version = o.version
+"""
+
+# Índice de apoio para localizar threads inativas sem varrer o JSONB inteiro
+CREATE_INDEXES_SQL = [
+  "CREATE INDEX IF NOT EXISTS checkpoints_thread_ts_idx "
+  "ON checkpoints (thread_id, (checkpoint->>'ts'))",
+]
+
 
 class PostgresCheckpointer(BaseCheckpointer):
   def __init__(self):
     logger.info("Initializing PostgresCheckpointer")
+    memory = settings.memory
+    connection_kwargs = {"row_factory": dict_row}
+    if memory.PREPARE_THRESHOLD is not None:
+      connection_kwargs["prepare_threshold"] = memory.PREPARE_THRESHOLD
     self.pool: AsyncConnectionPool[AsyncConnection[DictRow]] = (
       AsyncConnectionPool(
-        conninfo=settings.memory.URL.get_secret_value(),
-        max_size=20,
+        conninfo=memory.URL.get_secret_value(),
+        min_size=memory.POOL_MIN_SIZE,
+        max_size=memory.POOL_MAX_SIZE,
+        timeout=memory.POOL_TIMEOUT_SECONDS,
+        max_lifetime=memory.POOL_MAX_LIFETIME_SECONDS,
+        max_idle=memory.POOL_MAX_IDLE_SECONDS,
+        # check_connection faz um round-trip a cada checkout
+        check=AsyncConnectionPool.check_connection if memory.POOL_PRE_PING else None,
         open=False,
-        kwargs={"row_factory": dict_row},
+        kwargs=connection_kwargs,
       )
     )
-    self.checkpointer = AsyncPostgresSaver(self.pool)
+    self.checkpointer = AsyncPostgresSaver(self.pool, serde=get_serde())
+    self.retention_task: asyncio.Task | None = None
 
   async def get_checkpointer(self) -> BaseCheckpointSaver:
     return self.checkpointer
 
   async def close(self):
+    if self.retention_task:
+      self.retention_task.cancel()
+      try:
+        await self.retention_task
+      except asyncio.CancelledError:
+        pass
+      self.retention_task = None
     try:
       logger.info("Closing PostgresCheckpointer")
       await self.pool.close()
     except Exception as e:
-      logger.error(f"Error closing PostgresCheckpointer: {e}")
+      logger.error("Error closing PostgresCheckpointer: %s", e)
 
   def _run_sync_setup(self):
     """Executa o setup do DB de forma síncrona em um thread separado."""
@@ -55,12 +155,16 @@ class PostgresCheckpointer(BaseCheckpointer):
         logger.info("[Sync Setup] Executing LangGraph .setup()...")
         setup_checkpointer.setup()
 
+        logger.info("[Sync Setup] Creating retention support indexes...")
+        for statement in CREATE_INDEXES_SQL:
+          conn.execute(statement)
+
         logger.info(
           "\033[92m[Sync Setup] Database setup completed successfully!\033[0m"
         )
     except Exception as e:
       logger.error(
-        f"FATAL: [Sync Setup] Database setup failed: {e}", exc_info=True
+        "FATAL: [Sync Setup] Database setup failed: %s", e, exc_info=True
       )
       raise
 
@@ -68,19 +172,86 @@ class PostgresCheckpointer(BaseCheckpointer):
     await asyncio.to_thread(self._run_sync_setup)
     logger.info("Opening PostgresCheckpointer")
     await self.pool.open()
+    if settings.memory.RETENTION_ENABLED:
+      logger.info("Starting checkpoint retention sweeper")
+      self.retention_task = asyncio.create_task(self._retention_loop())
 
   async def reset_thread(self, thread_id):
     thread_id_str = str(thread_id)
-    logger.info(f"Resetting thread [{thread_id_str}] in PostgresCheckpointer")
+    logger.info("Resetting thread [%s] in PostgresCheckpointer", thread_id_str)
     async with self.pool.connection() as conn:
-      await conn.execute(
-        "DELETE FROM checkpoint_blobs WHERE thread_id = %s", (thread_id_str,)
-      )
-      await conn.execute(
-        "DELETE FROM checkpoint_writes WHERE thread_id = %s", (thread_id_str,)
-      )
-      await conn.execute(
-        "DELETE FROM checkpoints WHERE thread_id = %s", (thread_id_str,)
+      await conn.execute(RESET_THREAD_SQL, {"thread_id": thread_id_str})
+      await conn.commit()
+    logger.info("Thread [%s] reset in PostgresCheckpointer", thread_id_str)
+
+  async def ping(self) -> None:
+    async with self.pool.connection(timeout=settings.health.PROBE_TIMEOUT_SECONDS) as conn:
+      await conn.execute("SELECT 1")
+
+  def get_stats(self) -> dict[str, int]:
+    # Inclui requests_waiting, requests_wait_ms, pool_size, pool_available...
+    return self.pool.get_stats()
+
+  async def _delete_in_batches(self, conn, statement: str, params: dict) -> int:
+    """Executa um DELETE limitado repetidamente até não restar nada."""
+    total = 0
+    while True:
+      cursor = await conn.execute(statement, params)
+      deleted = cursor.rowcount
+      await conn.commit()
+      total += max(deleted, 0)
+      if deleted <= 0:
+        return total
+      # Libera o banco entre lotes para não competir com as conversas
+      await asyncio.sleep(0.1)
+
+  async def sweep_retention(self) -> dict[str, int]:
+    """
+    Remove threads inativas há mais que o TTL, mantém apenas os últimos N
+    checkpoints de cada thread e apaga blobs órfãos, sempre em lotes.
+    """
+    memory = settings.memory
+    now = datetime.now(timezone.utc)
+    params = {
+      "idle_cutoff": (now - timedelta(hours=memory.RETENTION_IDLE_TTL_HOURS)).isoformat(),
+      "active_cutoff": (now - timedelta(minutes=5)).isoformat(),
+      "keep_last": memory.RETENTION_KEEP_LAST,
+      "batch_size": memory.RETENTION_BATCH_SIZE,
+    }
+    result = {"idle_checkpoints": 0, "old_checkpoints": 0, "orphan_blobs": 0}
+
+    async with self.pool.connection() as conn:
+      cursor = await conn.execute(
+        "SELECT pg_try_advisory_lock(%s) AS locked", (RETENTION_LOCK_KEY,)
       )
+      row = await cursor.fetchone()
       await conn.commit()
-    logger.info(f"Thread [{thread_id_str}] reset in PostgresCheckpointer")
+      if not row or not row["locked"]:
+        logger.info("Checkpoint retention sweep already running elsewhere")
+        return result
+      try:
+        result["idle_checkpoints"] = await self._delete_in_batches(
+          conn, DELETE_IDLE_THREADS_SQL, params
+        )
+        result["old_checkpoints"] = await self._delete_in_batches(
+          conn, PRUNE_OLD_CHECKPOINTS_SQL, params
+        )
+        result["orphan_blobs"] = await self._delete_in_batches(
+          conn, PRUNE_ORPHAN_BLOBS_SQL, params
+        )
+      finally:
+        await conn.execute("SELECT pg_advisory_unlock(%s)", (RETENTION_LOCK_KEY,))
+        await conn.commit()
+
+    logger.info("Checkpoint retention sweep finished: %s", result)
+    return result
+
+  async def _retention_loop(self):
+    while True:
+      try:
+        await self.sweep_retention()
+      except asyncio.CancelledError:
+        raise
+      except Exception as e:
+        logger.error("Checkpoint retention sweep failed: %s", e, exc_info=True)
+      await asyncio.sleep(settings.memory.RETENTION_INTERVAL_SECONDS)
@@ -0,0 +1,321 @@
+import logging
+import time
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+  WRITES_IDX_MAP,
+  BaseCheckpointSaver,
+  ChannelVersions,
+  Checkpoint,
+  CheckpointMetadata,
+  CheckpointTuple,
+  get_checkpoint_id,
+)
+from src.core.config import settings
+from src.graphs.memories.BaseCheckpointer import BaseCheckpointer
+from src.graphs.memories.serde import get_serde
+
+logger = logging.getLogger(__name__)
+
+# Subgrafos (ex.: o agente ReAct do main_bot) criam um namespace novo a cada
+# execução, que não é mais lido depois que ela termina
+SUBGRAPH_TTL_SECONDS = 3600
+
+
+def _pack(typed: tuple[str, bytes]) -> bytes:
+  type_, data = typed
+  return type_.encode() + b"\n" + data
+
+
+def _unpack(packed: bytes) -> tuple[str, bytes]:
+  type_, data = packed.split(b"\n", 1)
+  return type_.decode(), data
+
+
+class RedisSaver(BaseCheckpointSaver):
+  """
+  Checkpoint saver assíncrono para servidores compatíveis com o protocolo Redis.
+
+  Layout das chaves (todas com a thread como hash tag, ficando no mesmo slot):
+  - {prefix}:{thread}:idx:{ns}: sorted set com os ids dos checkpoints
+  - {prefix}:{thread}:cp:{ns}:{id}: hash com checkpoint, metadata e pai
+  - {prefix}:{thread}:w:{ns}:{id}: hash com os writes pendentes
+  - {prefix}:{thread}:ns: sorted set com os namespaces da thread, pela última
+    gravação (a raiz fica com +inf)
+  """
+
+  def __init__(
+    self,
+    client: Any,
+    *,
+    key_prefix: str = "leia",
+    ttl_seconds: int = 7 * 24 * 3600,
+    keep_last: int = 2,
+    **kwargs,
+  ):
+    super().__init__(**kwargs)
+    self.client = client
+    self.key_prefix = key_prefix
+    self.ttl_seconds = ttl_seconds
+    self.keep_last = max(1, keep_last)
+
+  def _key(self, thread_id: Any, *parts: str) -> str:
+    return ":".join([self.key_prefix, f"{{{thread_id}}}", *parts])
+
+  def _ttl(self, checkpoint_ns: str) -> int:
+    if checkpoint_ns:
+      return min(self.ttl_seconds, SUBGRAPH_TTL_SECONDS)
+    return self.ttl_seconds
+
+  def _to_tuple(
+    self,
+    thread_id: Any,
+    checkpoint_ns: str,
+    checkpoint_id: str,
+    record: dict[bytes, bytes],
+    writes: dict[bytes, bytes],
+  ) -> CheckpointTuple:
+    parent_id = record.get(b"parent_id", b"").decode()
+    pending_writes = []
+    for field in sorted(
+      writes, key=lambda f: (f.rsplit(b":", 1)[0], int(f.rsplit(b":", 1)[1]))
+    ):
+      task_id, channel, type_, value, _ = self.serde.loads_typed(
+        _unpack(writes[field])
+      )
+      pending_writes.append(
+        (task_id, channel, self.serde.loads_typed((type_, value)))
+      )
+
+    return CheckpointTuple(
+      config={
+        "configurable": {
+          "thread_id": thread_id,
+          "checkpoint_ns": checkpoint_ns,
+          "checkpoint_id": checkpoint_id,
+        }
+      },
+      checkpoint=self.serde.loads_typed(_unpack(record[b"checkpoint"])),
+      metadata=self.serde.loads_typed(_unpack(record[b"metadata"])),
+      parent_config=(
+        {
+          "configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": parent_id,
+          }
+        }
+        if parent_id
+        else None
+      ),
+      pending_writes=pending_writes,
+    )
+
+  async def _load(
+    self, thread_id: Any, checkpoint_ns: str, checkpoint_id: str
+  ) -> CheckpointTuple | None:
+    async with self.client.pipeline(transaction=False) as pipe:
+      pipe.hgetall(self._key(thread_id, "cp", checkpoint_ns, checkpoint_id))
+      pipe.hgetall(self._key(thread_id, "w", checkpoint_ns, checkpoint_id))
+      record, writes = await pipe.execute()
+    if not record:
+      return None
+    return self._to_tuple(thread_id, checkpoint_ns, checkpoint_id, record, writes)
+
+  async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+    thread_id = config["configurable"]["thread_id"]
+    checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+    checkpoint_id = get_checkpoint_id(config)
+    if not checkpoint_id:
+      latest = await self.client.zrevrangebylex(
+        self._key(thread_id, "idx", checkpoint_ns), "+", "-", start=0, num=1
+      )
+      if not latest:
+        return None
+      checkpoint_id = latest[0].decode()
+    return await self._load(thread_id, checkpoint_ns, checkpoint_id)
+
+  async def alist(
+    self,
+    config: RunnableConfig | None,
+    *,
+    filter: dict[str, Any] | None = None,
+    before: RunnableConfig | None = None,
+    limit: int | None = None,
+  ) -> AsyncIterator[CheckpointTuple]:
+    if not config:
+      raise ValueError("RedisSaver.alist requires a thread_id in the config")
+    thread_id = config["configurable"]["thread_id"]
+    checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+    upper = "+"
+    if before and (before_id := get_checkpoint_id(before)):
+      upper = f"({before_id}"
+    ids = await self.client.zrevrangebylex(
+      self._key(thread_id, "idx", checkpoint_ns), upper, "-"
+    )
+    yielded = 0
+    for raw_id in ids:
+      checkpoint_tuple = await self._load(thread_id, checkpoint_ns, raw_id.decode())
+      if checkpoint_tuple is None:
+        continue
+      if filter and not all(
+        checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()
+      ):
+        continue
+      yield checkpoint_tuple
+      yielded += 1
+      if limit is not None and yielded >= limit:
+        return
+
+  async def aput(
+    self,
+    config: RunnableConfig,
+    checkpoint: Checkpoint,
+    metadata: CheckpointMetadata,
+    new_versions: ChannelVersions,
+  ) -> RunnableConfig:
+    thread_id = config["configurable"]["thread_id"]
+    checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+    checkpoint_id = checkpoint["id"]
+    ttl = self._ttl(checkpoint_ns)
+    index_key = self._key(thread_id, "idx", checkpoint_ns)
+    namespaces_key = self._key(thread_id, "ns")
+    record_key = self._key(thread_id, "cp", checkpoint_ns, checkpoint_id)
+
+    # Um único round-trip grava o checkpoint, renova os TTLs e retorna os ids
+    # que saíram da janela de retenção
+    async with self.client.pipeline(transaction=True) as pipe:
+      pipe.hset(
+        record_key,
+        mapping={
+          "checkpoint": _pack(self.serde.dumps_typed(checkpoint)),
+          "metadata": _pack(self.serde.dumps_typed(metadata)),
+          "parent_id": config["configurable"].get("checkpoint_id") or "",
+        },
+      )
+      pipe.expire(record_key, ttl)
+      pipe.zadd(index_key, {checkpoint_id: 0})
+      pipe.expire(index_key, ttl)
+      # Namespaces de subgrafos sem gravação há mais de SUBGRAPH_TTL_SECONDS
+      # já expiraram e saem do índice, que senão cresceria a cada execução
+      now = time.time()
+      pipe.zadd(namespaces_key, {checkpoint_ns: now if checkpoint_ns else float("inf")})
+      pipe.zremrangebyscore(namespaces_key, "-inf", now - SUBGRAPH_TTL_SECONDS)
+      pipe.expire(namespaces_key, self.ttl_seconds)
+      pipe.zrange(index_key, 0, -(self.keep_last + 1))
+      results = await pipe.execute()
+
+    stale = [raw_id.decode() for raw_id in results[-1]]
+    if stale:
+      async with self.client.pipeline(transaction=True) as pipe:
+        for stale_id in stale:
+          pipe.delete(
+            self._key(thread_id, "cp", checkpoint_ns, stale_id),
+            self._key(thread_id, "w", checkpoint_ns, stale_id),
+          )
+        pipe.zrem(index_key, *stale)
+        await pipe.execute()
+
+    return {
+      "configurable": {
+        "thread_id": thread_id,
+        "checkpoint_ns": checkpoint_ns,
+        "checkpoint_id": checkpoint_id,
+      }
+    }
+
+  async def aput_writes(
+    self,
+    config: RunnableConfig,
+    writes: Sequence[tuple[str, Any]],
+    task_id: str,
+    task_path: str = "",
+  ) -> None:
+    thread_id = config["configurable"]["thread_id"]
+    checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+    checkpoint_id = config["configurable"]["checkpoint_id"]
+    writes_key = self._key(thread_id, "w", checkpoint_ns, checkpoint_id)
+
+    async with self.client.pipeline(transaction=True) as pipe:
+      for idx, (channel, value) in enumerate(writes):
+        write_idx = WRITES_IDX_MAP.get(channel, idx)
+        field = f"{task_id}:{write_idx}"
+        type_, data = self.serde.dumps_typed(value)
+        packed = _pack(
+          self.serde.dumps_typed((task_id, channel, type_, data, task_path))
+        )
+        # Writes especiais (erros, interrupções) sobrescrevem os anteriores
+        if write_idx >= 0:
+          pipe.hsetnx(writes_key, field, packed)
+        else:
+          pipe.hset(writes_key, field, packed)
+      pipe.expire(writes_key, self._ttl(checkpoint_ns))
+      await pipe.execute()
+
+  async def adelete_thread(self, thread_id: str) -> None:
+    namespaces_key = self._key(thread_id, "ns")
+    namespaces = [ns.decode() for ns in await self.client.zrange(namespaces_key, 0, -1)]
+    if not namespaces:
+      return
+
+    async with self.client.pipeline(transaction=False) as pipe:
+      for ns in namespaces:
+        pipe.zrange(self._key(thread_id, "idx", ns), 0, -1)
+      ids_by_ns = await pipe.execute()
+
+    keys = [namespaces_key]
+    for ns, ids in zip(namespaces, ids_by_ns):
+      keys.append(self._key(thread_id, "idx", ns))
+      for raw_id in ids:
+        keys.append(self._key(thread_id, "cp", ns, raw_id.decode()))
+        keys.append(self._key(thread_id, "w", ns, raw_id.decode()))
+    await self.client.delete(*keys)
+
+
+class RedisCheckpointer(BaseCheckpointer):
+  def __init__(self, client: Any = None):
+    logger.info("Initializing RedisCheckpointer")
+    if client is None:
+      try:
+        from redis.asyncio import Redis
+      except ImportError as e:
+        raise ImportError(
+          "The redis memory strategy requires the 'redis' extra: uv pip install '.[redis]'"
+        ) from e
+      client = Redis.from_url(
+        settings.memory.URL.get_secret_value(),
+        decode_responses=False,
+        health_check_interval=30,
+      )
+    self.client = client
+    self.checkpointer = RedisSaver(
+      client,
+      key_prefix=settings.memory.REDIS_KEY_PREFIX,
+      ttl_seconds=settings.memory.REDIS_TTL_SECONDS,
+      keep_last=settings.memory.REDIS_KEEP_LAST,
+      serde=get_serde(),
+    )
+
+  async def get_checkpointer(self) -> BaseCheckpointSaver:
+    return self.checkpointer
+
+  async def close(self):
+    try:
+      logger.info("Closing RedisCheckpointer")
+      await self.client.aclose()
+    except Exception as e:
+      logger.error("Error closing RedisCheckpointer: %s", e)
+
+  async def open(self):
+    logger.info("Opening RedisCheckpointer")
+    await self.client.ping()
+
+  async def ping(self) -> None:
+    await self.client.ping()
+
+  async def reset_thread(self, thread_id):
+    logger.info("Resetting thread [%s] in RedisCheckpointer", thread_id)
+    await self.checkpointer.adelete_thread(thread_id)
+    logger.info("Thread [%s] reset in RedisCheckpointer", thread_id)
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import re
+from collections.abc import Callable
+
+from langchain_core.messages import AIMessage
+from src.core.config import settings
+from src.graphs.response_generation.schemas.MainState import MainState
+from src.graphs.response_generation.tools.DataAccess import monitor
+from src.services import AnswerCache
+from src.services.AnswerCache import normalize
+
+logger = logging.getLogger(__name__)
+
+# Padrões aplicados à pergunta normalizada (minúsculas, sem acentos)
+ACTION_PATTERNS = {
+  "consumo_total": r"\bconsum\w*|\bgast\w*|\bkwh\b",
+  "picos_demanda": r"\bpicos?\b|\bdemanda\b",
+  "saude_eletrica": r"fator de potencia|\bsaude\b|\beficiencia\b",
+  "perfil_horario": r"\bperfil\b|\bpor hora\b",
+  "desbalanceamento": r"\bdesbalancea\w*|\bdesequilibr\w*",
+  "anomalias_voltagem": r"\banomalias?\b|\bsobretens\w*|\bsubtens\w*",
+}
+PERIOD_PATTERNS = {
+  "hoje": r"\bhoje\b",
+  "ontem": r"\bontem\b",
+  "semana_passada": r"\bsemana passada\b",
+  "mes_passado": r"\bmes passado\b",
+  "ultimos_3_dias": r"\bultimos (3|tres) dias\b",
+  "ultimos_7_dias": r"\bultimos (7|sete) dias\b|\bultima semana\b",
+  "ultimos_30_dias": r"\bultimos (30|trinta) dias\b|\bultimo mes\b",
+  "tudo": r"\bdesde o inicio\b|\btodo o periodo\b",
+}
+# Pedidos que precisam do agente: gráficos, comparações, explicações, ações
+FALLTHROUGH_PATTERN = re.compile(
+  r"\bgrafic\w*|\bplot\w*|\bvisualiz\w*|\bcompar\w*|\bpor ?que\b|\bexpli\w*"
+  r"|\bmanutenc\w*|\bagend\w*|\bsugest\w*|\bcomo\b|\bdevo\b"
+)
+
+PERIOD_LABELS = {
+  "hoje": "hoje",
+  "ontem": "ontem",
+  "semana_passada": "na semana passada",
+  "mes_passado": "no mês passado",
+  "ultimos_3_dias": "nos últimos 3 dias",
+  "ultimos_7_dias": "nos últimos 7 dias",
+  "ultimos_30_dias": "nos últimos 30 dias",
+  "tudo": "desde o início das medições",
+}
+
+
+def _consumo_total(data: list[dict], when: str) -> str:
+  lines = "\n".join(f"• {d['fase']}: {d['total_kwh']} kWh" for d in data)
+  total = round(sum(d["total_kwh"] for d in data), 2)
+  return f"O consumo {when} foi de {total} kWh no total:\n{lines}"
+
+
+def _picos_demanda(data: list[dict], when: str) -> str:
+  lines = "\n".join(f"• {d['fase']}: {d['pico_kw']} kW em {d['momento']}" for d in data)
+  return f"Os picos de demanda {when} foram:\n{lines}"
+
+
+def _saude_eletrica(data: list[dict], when: str) -> str:
+  lines = "\n".join(
+    f"• {d['fase']}: FP médio {d['fator_potencia_medio']} "
+    f"(tensão média {d['voltagem_media']} V)"
+    for d in data
+  )
+  return f"Fator de potência {when}:\n{lines}\nO ideal é acima de 0,92."
+
+
+def _perfil_horario(data: list[dict], when: str) -> str:
+  maior = max(data, key=lambda x: x["media_geral_kw"])
+  menor = min(data, key=lambda x: x["media_geral_kw"])
+  return (
+    f"Perfil de consumo por hora {when}:\n"
+    f"• Maior consumo: {maior['hora']} ({maior['media_geral_kw']} kW em média)\n"
+    f"• Menor consumo: {menor['hora']} ({menor['media_geral_kw']} kW em média)"
+  )
+
+
+def _desbalanceamento(data: list[dict], when: str) -> str:
+  d = data[0]
+  return (
+    f"Correntes médias {when}: F1 {d['avg_amp_f1']} A, F2 {d['avg_amp_f2']} A, "
+    f"F3 {d['avg_amp_f3']} A.\nA maior diferença entre fases foi de "
+    f"{d['diferenca_max_amperes']} A."
+  )
+
+
+def _anomalias_voltagem(data: list[dict], when: str) -> str:
+  if not data:
+    return f"Nenhuma anomalia de tensão detectada {when}. O sistema está estável."
+  lines = "\n".join(
+    f"• [{x['timestamp']}] {x['sensor']}: {x['voltage']} V ({x['tipo']} {x['desvio_pct']}%)"
+    for x in data[:3]
+  )
+  return f"Foram detectadas {len(data)} anomalias de tensão {when}. Últimas ocorrências:\n{lines}"
+
+
+# Ação -> (consulta no repositório, template da resposta)
+ROUTES: dict[str, tuple[Callable[[str], list[dict]], Callable[[list[dict], str], str]]] = {
+  "consumo_total": (monitor.get_consumo_total_kwh, _consumo_total),
+  "picos_demanda": (monitor.get_picos_demanda, _picos_demanda),
+  "saude_eletrica": (monitor.get_saude_eletrica, _saude_eletrica),
+  "perfil_horario": (monitor.get_perfil_horario, _perfil_horario),
+  "desbalanceamento": (monitor.get_desbalanceamento, _desbalanceamento),
+  "anomalias_voltagem": (monitor.get_anomalias_voltagem, _anomalias_voltagem),
+}
+
+
+def classify(question: str) -> tuple[str, str] | None:
+  """
+  Retorna (ação, período) quando a pergunta casa com exatamente uma ação e um
+  período do DataAccess e nada indica que ela precisa do agente.
+  """
+  text = normalize(question)
+  if len(text.split()) > settings.intent_router.MAX_WORDS:
+    return None
+  if FALLTHROUGH_PATTERN.search(text):
+    return None
+  actions = [a for a, p in ACTION_PATTERNS.items() if re.search(p, text)]
+  periods = [p for p, pattern in PERIOD_PATTERNS.items() if re.search(pattern, text)]
+  if len(actions) != 1 or len(periods) != 1:
+    return None
+  return actions[0], periods[0]
+
+
+async def intent_router(state: MainState) -> MainState:
+  """
+  Responde direto perguntas que mapeiam para uma única consulta do DataAccess
+  (ex.: "consumo ontem"). As demais seguem para o main_bot.
+  """
+  intent = classify(state["chat_input"]) if settings.intent_router.ENABLED else None
+  if intent is None:
+    return {**state, "intent": None}
+
+  action, period = intent
+  fetch, template = ROUTES[action]
+  try:
+    data = await asyncio.to_thread(fetch, period)
+    answer = template(data, PERIOD_LABELS[period])
+  except Exception as e:
+    logger.warning("Intent router failed for %s/%s, falling back to agent: %s", action, period, e)
+    return {**state, "intent": None}
+
+  logger.info("Intent router answered %s for period %s", action, period)
+  AnswerCache.depends_on("DataAccess", action=action, period=period)
+  return {
+    **state,
+    "intent": f"{action}:{period}",
+    "messages": [AIMessage(content=answer)],
+    "formatted_output": [{"output": answer}],
+  }
+
+
+def route_after_intent(state: MainState) -> str:
+  return "answered" if state.get("intent") else "agent"
@@ -1,41 +1,92 @@
+import functools
+from langchain_core.messages import BaseMessage, SystemMessage
 from langgraph.prebuilt import create_react_agent
 from src.graphs.response_generation.schemas.MainState import MainState
+from src.graphs.llm import tokens
 from src.graphs.llm.model import create_llm
 from src.core.prompt import PromptHandler
 from src.core.config import settings
-from datetime import datetime
+from src.core import fixtures
 from src.graphs.response_generation.tools.DataAccess import DataAccess
 from src.graphs.response_generation.tools.WebSearch import WebSearch
 from src.graphs.response_generation.tools.MaintenanceSheet import MaintenanceSheet
+from src.graphs.response_generation.tools.ToolOutput import ToolOutput
 
 
-async def main_bot(state: MainState) -> MainState:
-  now = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-  
-  complete_prompt = PromptHandler().get_prompt(
-    settings.main_llm.PROMPT_NAME
+TOOLS = [
+  DataAccess,
+  WebSearch,
+  MaintenanceSheet,
+  ToolOutput,
+]
+
+
+@functools.cache
+def _static_prompt() -> SystemMessage:
+  return SystemMessage(content=PromptHandler().get_prompt(settings.main_llm.PROMPT_NAME))
+
+
+@functools.cache
+def _static_tokens() -> dict[str, int]:
+  return {
+    "system": tokens.count_message(_static_prompt()),
+    "tools": tokens.count_tools(TOOLS),
+  }
+
+
+def _build_messages(state: MainState) -> list[BaseMessage]:
+  """
+  Monta as mensagens enviadas ao LLM com o que muda menos no início: prompt
+  fixo (idêntico byte a byte entre requisições), resumo da conversa (muda só
+  na compactação) e histórico. Nome do usuário e horário ficam em uma mensagem
+  no final, para não quebrar o prefixo reaproveitado pelo cache do provedor.
+  """
+  now = fixtures.now().strftime("%d/%m/%Y %H:%M:%S")
+  summary = (
+    [SystemMessage(content="Resumo da conversa até aqui:\n" + state["summary"])]
+    if state.get("summary")
+    else []
+  )
+  volatile = SystemMessage(
+    content="O nome do usuário é: " + state["user_name"]
+    + "\nA data e hora atual é: " + now
   )
-  complete_prompt += "\n\nO nome do usuário é: " + state["user_name"]
-  complete_prompt += "\nA data e hora atual é: " + now + "\n"
-  
-  bot = create_react_agent(
+  # Chamada antes de cada passo do ReAct, então também limita as saídas de
+  # ferramentas acumuladas no turno
+  conversation = tokens.enforce_budget(
+    {
+      **_static_tokens(),
+      "summary": tokens.count_messages(summary),
+      "volatile": tokens.count_message(volatile),
+    },
+    state["messages"],
+  )
+  return [_static_prompt(), *summary, *conversation, volatile]
+
+
+@functools.cache
+def _get_agent():
+  """
+  Monta o agente uma única vez: o prompt é uma função do estado, então o LLM,
+  as tools vinculadas e seus schemas são os mesmos em todas as mensagens.
+  """
+  return create_react_agent(
     model=create_llm(
       settings.main_llm.MODEL,
       settings.main_llm.API_KEY,
       settings.main_llm.TEMPERATURE,
       settings.main_llm.TIMEOUT,
+      settings.main_llm.FALLBACK_MODELS,
     ),
-    tools=[
-      DataAccess,
-      WebSearch,
-      MaintenanceSheet,
-    ],
+    tools=TOOLS,
     name=settings.bot.NAME,
-    prompt=complete_prompt,
+    prompt=_build_messages,
     state_schema=MainState,
   )
-  
-  response = await bot.ainvoke(state)
+
+
+async def main_bot(state: MainState) -> MainState:
+  response = await _get_agent().ainvoke(state)
   return {
     **state,
     "messages": response["messages"],
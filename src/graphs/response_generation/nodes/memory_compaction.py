@@ -0,0 +1,119 @@
+import functools
+import logging
+from langchain_core.messages import (
+  AIMessage,
+  BaseMessage,
+  HumanMessage,
+  RemoveMessage,
+  ToolMessage,
+)
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from src.graphs.llm.model import create_llm
+from src.graphs.llm.tokens import count_message
+from src.graphs.response_generation.schemas.MainState import MainState
+from src.core.config import settings
+from src.core.prompt import PromptHandler
+
+logger = logging.getLogger(__name__)
+
+# Limite de caracteres de cada mensagem enviada ao sumarizador
+SUMMARY_INPUT_CHARS = 600
+
+
+def _render_for_summary(messages: list[BaseMessage]) -> str:
+  """Converte o trecho removido em texto compacto para o sumarizador."""
+  lines = []
+  for message in messages:
+    content = str(message.content)[:SUMMARY_INPUT_CHARS]
+    if isinstance(message, HumanMessage):
+      lines.append(f"Usuário: {content}")
+    elif isinstance(message, ToolMessage):
+      lines.append(f"Ferramenta {message.name or ''}: {content}")
+    elif isinstance(message, AIMessage):
+      for call in message.tool_calls:
+        lines.append(f"Leia chamou {call['name']} com {call['args']}")
+      if content:
+        lines.append(f"Leia: {content}")
+  return "\n".join(lines)
+
+
+@functools.cache
+def _get_summary_chain():
+  prompt = ChatPromptTemplate.from_messages(
+    [
+      ("system", PromptHandler().get_prompt(settings.bot.SUMMARY_PROMPT_NAME)),
+      (
+        "user",
+        "Resumo atual:\n{summary}\n\nTrecho a incorporar:\n{conversation}",
+      ),
+    ]
+  )
+  llm = create_llm(
+    settings.formatter_llm.MODEL,
+    settings.formatter_llm.API_KEY,
+    settings.formatter_llm.TEMPERATURE,
+    settings.formatter_llm.TIMEOUT,
+    settings.formatter_llm.FALLBACK_MODELS,
+  )
+  return prompt | llm | StrOutputParser()
+
+
+def _find_cut(messages: list[BaseMessage]) -> int:
+  """
+  Retorna o índice a partir do qual as mensagens são mantidas. O corte é
+  sempre feito em uma mensagem do usuário, para que nenhuma ToolMessage fique
+  sem a chamada de ferramenta correspondente.
+  """
+  last_human = next(
+    (
+      i
+      for i in range(len(messages) - 1, -1, -1)
+      if isinstance(messages[i], HumanMessage)
+    ),
+    len(messages) - 1,
+  )
+  cut = last_human
+  count = 0
+  tokens = 0
+  for i in range(len(messages) - 1, -1, -1):
+    count += 1
+    tokens += count_message(messages[i])
+    if count > settings.bot.MAX_HISTORY or tokens > settings.bot.MAX_HISTORY_TOKENS:
+      break
+    if isinstance(messages[i], HumanMessage):
+      cut = min(cut, i)
+  return cut
+
+
+async def memory_compaction(state: MainState) -> MainState:
+  """
+  Mantém o histórico dentro do orçamento de mensagens e tokens, incorporando
+  os turnos mais antigos (incluindo resultados de ferramentas) em um resumo.
+  """
+  messages = state.get("messages", [])
+  cut = _find_cut(messages)
+  removed = messages[:cut]
+  if not removed:
+    return state
+
+  logger.info(
+    "Compacting %s of %s messages into the summary", len(removed), len(messages)
+  )
+  summary = state.get("summary", "")
+  try:
+    summary = await _get_summary_chain().ainvoke(
+      {
+        "summary": summary or "(vazio)",
+        "conversation": _render_for_summary(removed),
+      }
+    )
+  except Exception as e:
+    # Sem resumo novo, o histórico ainda é limitado para não crescer sem fim
+    logger.error("Error summarizing conversation, keeping previous summary: %s", e)
+
+  return {
+    **state,
+    "messages": [RemoveMessage(id=m.id) for m in removed if m.id],
+    "summary": summary,
+  }
@@ -12,6 +12,9 @@ class MainState(AgentState):
   user_name: str
   formatted_output: NotRequired[list[dict[str, str]]]
   messages_history: list[BaseMessage]
+  summary: NotRequired[str]
+  # "acao:periodo" quando o intent_router respondeu sem o agente
+  intent: NotRequired[str | None]
 
 
 class InputState(TypedDict):
@@ -1,5 +1,6 @@
 import logging
 from langchain_core.tools import tool
+from src.graphs.response_generation.tools.ToolOutput import compact_output
 from typing import Annotated, Literal, cast
 
 from langgraph.prebuilt import InjectedState
@@ -7,6 +8,7 @@ from langgraph.prebuilt import InjectedState
 # Importando suas classes e funções criadas anteriormente
 from src.graphs.response_generation.schemas.MainState import MainState
 from src.repositories.DataAccessRepository import DataAccessRepository
+from src.services import AnswerCache
 from src.services.Plotter import (
   plot_consumo_total_kwh,
   plot_picos_demanda,
@@ -41,6 +43,7 @@ monitor = DataAccessRepository()
   'ontem', 'semana_passada', 'mes_passado', 'hoje', 'tudo'.
   """,
 )
+@compact_output("DataAccess")
 def DataAccess(
   action: Annotated[
     Literal[
@@ -67,7 +70,9 @@ def DataAccess(
   ] = False,
 ) -> str:
     
-  logger.info(f"DataAccess tool called: action={action}, period={period}, plot={should_plot}")
+  logger.info("DataAccess tool called: action=%s, period=%s, plot=%s", action, period, should_plot)
+  # Gráficos são arquivos por mensagem, então respostas com eles não são reaproveitadas
+  AnswerCache.depends_on("DataAccess", cacheable=not should_plot, action=action, period=period)
   img_name = f"{state.get("chat_id")}_{state.get("message_id")}"
 
   try:
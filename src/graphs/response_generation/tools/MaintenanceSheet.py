@@ -1,8 +1,12 @@
+import hashlib
+import json
 import logging
 from typing import Annotated, Literal, List, Dict, Any
 
 from src.core.config import settings
 from langchain_core.tools import tool
+from src.graphs.response_generation.tools.ToolOutput import compact_output
+from src.services import AnswerCache
 from src.services.GoogleService import get_sheets_service
 
 logger = logging.getLogger(__name__)
@@ -24,6 +28,10 @@ def _fetch_all_records(service) -> List[Dict[str, str]]:
       spreadsheetId=SPREADSHEET_ID, range=DATA_RANGE
     ).execute()
     rows = result.get('values', [])
+    # Detecta edições feitas direto na planilha para invalidar respostas em cache
+    AnswerCache.observe_source(
+      "MaintenanceSheet", hashlib.sha256(json.dumps(rows).encode()).hexdigest()
+    )
 
     structured_data = []
     for row in rows:
@@ -32,7 +40,7 @@ def _fetch_all_records(service) -> List[Dict[str, str]]:
       structured_data.append(record)
     return structured_data
   except Exception as e:
-    logger.error(f"Erro ao buscar registros: {e}")
+    logger.error("Erro ao buscar registros: %s", e)
     return []
 
 def _format_as_markdown_table(records: List[Dict[str, Any]]) -> str:
@@ -71,6 +79,7 @@ def _filter_by_device(records: List[Dict], device_query: str) -> List[Dict]:
   - Forneça 'price' para o valor final pago.
   """
 )
+@compact_output("MaintenanceSheet")
 async def MaintenanceSheet(
   action: Annotated[
     Literal[
@@ -92,7 +101,9 @@ async def MaintenanceSheet(
   limit: Annotated[int, "Qtd de registros (apenas para get_last_maintenances)."] = 5,
 ) -> str:
   
-  logger.info(f"MaintenanceSheet called: action={action}, device={device}, date={date}")
+  logger.info("MaintenanceSheet called: action=%s, device=%s, date=%s", action, device, date)
+  is_write = action in ("insert_maintenance_record", "update_maintenance_status")
+  AnswerCache.depends_on("MaintenanceSheet", cacheable=not is_write, action=action, device=device)
   
   sheets_service = get_sheets_service()
   if not sheets_service:
@@ -116,6 +127,7 @@ async def MaintenanceSheet(
         insertDataOption="INSERT_ROWS",
         body={'values': [new_row]}
       ).execute()
+      AnswerCache.invalidate_source("MaintenanceSheet")
 
       return f"✅ Sucesso: Manutenção para '{device}' registrada."
 
@@ -164,6 +176,7 @@ async def MaintenanceSheet(
         valueInputOption="USER_ENTERED",
         body={'values': [["Não"]]}
       ).execute()
+      AnswerCache.invalidate_source("MaintenanceSheet")
 
       return f"✅ Atualizado: Manutenção de '{device}' ({date}) foi concluída. Valor atualizado para {formatted_price}."
 
@@ -195,5 +208,5 @@ async def MaintenanceSheet(
       return f"Ação '{action}' desconhecida."
 
   except Exception as e:
-    logger.error(f"Erro na MaintenanceSheet: {e}", exc_info=True)
+    logger.error("Erro na MaintenanceSheet: %s", e, exc_info=True)
     return f"Ocorreu um erro: {str(e)}"
\ No newline at end of file
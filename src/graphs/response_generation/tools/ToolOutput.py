@@ -0,0 +1,168 @@
+import functools
+import hashlib
+import inspect
+import logging
+import threading
+from collections import OrderedDict
+from typing import Annotated, Any
+
+from langchain_core.tools import tool
+from src.core.config import settings
+from src.services import AnswerCache
+
+logger = logging.getLogger(__name__)
+
+# Aproximação usada para converter o orçamento de tokens em caracteres
+CHARS_PER_TOKEN = 4
+# Linhas que nunca podem ser cortadas, pois o formatter depende delas
+PRESERVED_MARKERS = ("[GRÁFICO GERADO]",)
+
+# Saídas completas guardadas fora do prompt, recuperáveis pela tool ToolOutput
+_store: OrderedDict[str, str] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _budget_chars(tool_name: str) -> int:
+  tokens = settings.tool_output.MAX_TOKENS_PER_TOOL.get(
+    tool_name, settings.tool_output.MAX_TOKENS
+  )
+  return tokens * CHARS_PER_TOKEN
+
+
+def _store_full_output(tool_name: str, full_output: str) -> str:
+  """Guarda a saída completa e retorna uma referência determinística a ela."""
+  ref = hashlib.sha1(f"{tool_name}:{full_output}".encode("utf-8")).hexdigest()[:12]
+  with _lock:
+    _store[ref] = full_output
+    _store.move_to_end(ref)
+    while len(_store) > settings.tool_output.STORE_MAX_ENTRIES:
+      _store.popitem(last=False)
+  return ref
+
+
+def get_full_output(ref: str) -> str | None:
+  with _lock:
+    return _store.get(ref)
+
+
+def _truncate_lines(lines: list[str], budget: int) -> tuple[list[str], int]:
+  """Mantém as primeiras linhas que cabem no orçamento, além das preservadas."""
+  kept = []
+  used = 0
+  omitted = 0
+  for line in lines:
+    if any(marker in line for marker in PRESERVED_MARKERS):
+      kept.append(line)
+    elif used + len(line) + 1 <= budget:
+      kept.append(line)
+      used += len(line) + 1
+    else:
+      omitted += 1
+  return kept, omitted
+
+
+def _summarize_search_results(results: list[dict], budget: int) -> str:
+  """Seleciona os top-k resultados da busca e resume cada um."""
+  top_k = settings.tool_output.TOP_K
+  if all("score" in r for r in results):
+    results = sorted(results, key=lambda r: r["score"], reverse=True)
+  selected = results[:top_k]
+  per_item = max(budget // max(len(selected), 1) - 120, 200)
+
+  lines = [f"{len(selected)} de {len(results)} resultados mais relevantes:"]
+  for r in selected:
+    content = " ".join(str(r.get("content", "")).split())
+    if len(content) > per_item:
+      content = content[:per_item].rsplit(" ", 1)[0] + "..."
+    lines.append(f"- Fonte: {r.get('title') or r.get('url', '')}")
+    if r.get("title") and r.get("url"):
+      lines.append(f"  URL: {r['url']}")
+    lines.append(f"  {content}")
+  return "\n".join(lines)
+
+
+def _summarize_text(text: str, budget: int) -> str:
+  """Corta textos e tabelas markdown por linha, mantendo o cabeçalho."""
+  lines = text.splitlines()
+  kept, omitted = _truncate_lines(lines, budget)
+  if omitted:
+    kept.append(f"... ({omitted} linhas omitidas)")
+  return "\n".join(kept)
+
+
+def compact(tool_name: str, output: Any) -> str:
+  """
+  Reduz a saída de uma ferramenta ao orçamento configurado. Quando há corte, a
+  saída completa fica guardada fora do prompt e pode ser obtida pela tool
+  ToolOutput com a referência informada.
+  """
+  budget = _budget_chars(tool_name)
+  is_search_results = isinstance(output, list) and all(
+    isinstance(r, dict) for r in output
+  )
+  full_output = output if isinstance(output, str) else str(output)
+  if len(full_output) <= budget and not is_search_results:
+    return full_output
+
+  if is_search_results:
+    compacted = _summarize_search_results(output, budget)
+  else:
+    compacted = _summarize_text(full_output, budget)
+
+  if len(compacted) >= len(full_output):
+    return full_output
+
+  ref = _store_full_output(tool_name, full_output)
+  logger.info(
+    "Compacted %s output from %s to %s chars (ref=%s)", tool_name, len(full_output), len(compacted), ref
+  )
+  return (
+    f"{compacted}\n\n[Saída resumida: {len(compacted)} de {len(full_output)} "
+    f"caracteres. Para ver tudo, use a ferramenta ToolOutput com ref='{ref}'.]"
+  )
+
+
+def compact_output(tool_name: str):
+  """Decorator que aplica compact() ao retorno de uma ferramenta."""
+  def decorator(func):
+    if inspect.iscoroutinefunction(func):
+      @functools.wraps(func)
+      async def async_wrapper(*args, **kwargs):
+        return compact(tool_name, await func(*args, **kwargs))
+      return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+      return compact(tool_name, func(*args, **kwargs))
+    return wrapper
+  return decorator
+
+
+@tool(
+  name_or_callable="ToolOutput",
+  description="""Recupera a saída completa de uma ferramenta que foi resumida.
+  Use apenas quando o resumo não tiver a informação necessária para responder
+  ao usuário, informando a referência 'ref' indicada no resumo. Conteúdos longos
+  são retornados em partes, use 'offset' para continuar de onde parou.""",
+)
+def ToolOutput(
+  ref: Annotated[str, "Referência informada no resumo da saída da ferramenta."],
+  offset: Annotated[int, "Posição (em caracteres) a partir da qual ler."] = 0,
+) -> str:
+  logger.info("ToolOutput called: ref=%s, offset=%s", ref, offset)
+  # A saída pode ser de uma mensagem anterior, cujas dependências não conhecemos
+  AnswerCache.depends_on("ToolOutput", cacheable=False)
+  full_output = get_full_output(ref)
+  if full_output is None:
+    return f"A saída '{ref}' não está mais disponível. Chame a ferramenta original novamente."
+
+  page_size = _budget_chars("ToolOutput")
+  offset = max(0, offset)
+  page = full_output[offset : offset + page_size]
+  next_offset = offset + len(page)
+  if next_offset < len(full_output):
+    page += (
+      f"\n\n[Parte {offset}-{next_offset} de {len(full_output)} caracteres. "
+      f"Use offset={next_offset} para continuar.]"
+    )
+  return page
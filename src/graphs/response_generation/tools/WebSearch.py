@@ -1,9 +1,11 @@
 import logging
 
 from langchain_core.tools import tool
+from src.graphs.response_generation.tools.ToolOutput import compact_output
 from typing import Annotated
-from langchain_community.tools.tavily_search import TavilySearchResults
+from src.core import fixtures
 from src.core.config import settings
+from src.services import AnswerCache
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +20,23 @@ logger = logging.getLogger(__name__)
   Índices de chamada não devem ser adicionados ao texto, visto que não são bem
   renderizados no chat."""
 )
+@compact_output("WebSearch")
 async def WebSearch(
   query: Annotated[
     str, 
     "Uma query curta e objetiva, descrevendo o que o usuário quer saber. Exemplo: 'Quais são as notícias mais recentes sobre IA?'"
   ],
 ) -> str:
-  web_search_tool = TavilySearchResults(tavily_api_key=settings.tavily.API_KEY.get_secret_value())
-  response = web_search_tool.invoke({"query": query, "max_results": settings.tavily.MAX_RESULTS})
+  AnswerCache.depends_on("WebSearch", cacheable=False)
+  request = {"query": query, "max_results": settings.tavily.MAX_RESULTS}
+
+  async def search():
+    # langchain_community é pesado, então só é importado na primeira busca
+    from langchain_community.tools.tavily_search import TavilySearchResults
+
+    web_search_tool = TavilySearchResults(tavily_api_key=settings.tavily.API_KEY.get_secret_value())
+    return await web_search_tool.ainvoke(request)
+
+  response = await fixtures.athrough("web_search", request, search)
   
   return response
@@ -1,7 +1,8 @@
 import os
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional
+from src.core import fixtures
 from src.core.config import settings
 
 import httpx
@@ -31,7 +32,7 @@ class DataAccessRepository:
     Returns:
       Tupla (from_time, to_time) em formato ISO
     """
-    now = datetime.now()
+    now = fixtures.now()
 
     period_map = {
       "ultimos_30_dias": timedelta(days=30),
@@ -76,7 +77,7 @@ class DataAccessRepository:
       from_dt = now - delta
       to_dt = now
       
-    logger.debug(f"Parsed period '{periodo}' to range: {from_dt.isoformat()} to {to_dt.isoformat()}")
+    logger.debug("Parsed period '%s' to range: %s to %s", periodo, from_dt.isoformat(), to_dt.isoformat())
 
     return from_dt.isoformat(timespec="seconds"), to_dt.isoformat(timespec="seconds")
 
@@ -95,14 +96,21 @@ class DataAccessRepository:
       Exception: Se a requisição falhar
     """
     url = f"{self.api_url}{endpoint}"
-    try:
-      response = httpx.get(url, params=params or {}, timeout=30.0)
-      response.raise_for_status()
-      logger.debug(f"Request to {url} successful with status code {response.status_code}")
-      return response.json()
-    except httpx.HTTPError as e:
-      logger.error(f"Erro ao fazer requisição para {url}: {e}")
-      raise
+
+    def request() -> dict:
+      try:
+        response = httpx.get(url, params=params or {}, timeout=30.0)
+        response.raise_for_status()
+        logger.debug("Request to %s successful with status code %s", url, response.status_code)
+        return response.json()
+      except httpx.HTTPError as e:
+        logger.error("Erro ao fazer requisição para %s: %s", url, e)
+        raise
+
+    # A URL base fica fora da chave, para gravações servirem em qualquer ambiente
+    return fixtures.through(
+      "measurement_api", {"endpoint": endpoint, "params": params or {}}, request
+    )
 
   # =================================================================
   # Consumo Acumulado (Energia Ativa)
@@ -120,7 +128,7 @@ class DataAccessRepository:
     Returns:
       Lista de dicionários com fase, total_kwh, min_demand_kw, max_demand_kw
     """
-    logger.info(f"Calculating consumo total kWh for period: {periodo}")
+    logger.info("Calculating consumo total kWh for period: %s", periodo)
     from_time, to_time = self._parse_period_to_time_range(periodo)
     endpoint = f"/analytics/{self.channel}/consumption"
     response = self._make_request(endpoint, params={"from_time": from_time, "to_time": to_time})
@@ -149,7 +157,7 @@ class DataAccessRepository:
     Returns:
       Lista de dicionários com fase, pico_kw, momento
     """
-    logger.info(f"Calculating picos de demanda for period: {periodo}")
+    logger.info("Calculating picos de demanda for period: %s", periodo)
     from_time, to_time = self._parse_period_to_time_range(periodo)
     endpoint = f"/analytics/{self.channel}/demand_peaks"
     response = self._make_request(endpoint, params={"from_time": from_time, "to_time": to_time})
@@ -179,7 +187,7 @@ class DataAccessRepository:
     Returns:
       Lista de dicionários com fase, voltagem_media, fator_potencia_medio
     """
-    logger.info(f"Calculating saúde elétrica for period: {periodo}")
+    logger.info("Calculating saúde elétrica for period: %s", periodo)
     from_time, to_time = self._parse_period_to_time_range(periodo)
     endpoint = f"/analytics/{self.channel}/electrical_health"
     response = self._make_request(endpoint, params={"from_time": from_time, "to_time": to_time})
@@ -209,7 +217,7 @@ class DataAccessRepository:
     Returns:
       Lista de dicionários com hora, media_kw_f1, media_kw_f2, media_kw_f3, media_geral_kw
     """
-    logger.info(f"Calculating perfil horário for period: {periodo}")
+    logger.info("Calculating perfil horário for period: %s", periodo)
     from_time, to_time = self._parse_period_to_time_range(periodo)
     endpoint = f"/analytics/{self.channel}/hourly_profile"
     response = self._make_request(endpoint, params={"from_time": from_time, "to_time": to_time})
@@ -271,7 +279,7 @@ class DataAccessRepository:
     Returns:
       Lista de dicionários com avg_amp_f1, avg_amp_f2, avg_amp_f3, diferenca_max_amperes
     """
-    logger.info(f"Calculating desbalanceamento for period: {periodo}")
+    logger.info("Calculating desbalanceamento for period: %s", periodo)
     from_time, to_time = self._parse_period_to_time_range(periodo)
     endpoint = f"/analytics/{self.channel}/current_by_sensor"
     response = self._make_request(endpoint, params={"from_time": from_time, "to_time": to_time})
@@ -334,7 +342,7 @@ class DataAccessRepository:
     Returns:
       Lista de dicionários com timestamp, sensor, voltage, tipo, desvio_pct
     """
-    logger.info(f"Calculating anomalias de voltagem for period: {periodo}")
+    logger.info("Calculating anomalias de voltagem for period: %s", periodo)
     from_time, to_time = self._parse_period_to_time_range(periodo)
     endpoint = f"/analytics/{self.channel}/voltage_anomalies"
     params = {
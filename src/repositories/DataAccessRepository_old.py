@@ -44,7 +44,7 @@ class DataAccessRepository:
     Retorna o consumo total em kWh por fase.
     Cálculo: Soma(Power kW) * (5min / 60min)
     """
-    logger.info(f"Calculating consumo total kWh for period: {periodo}")
+    logger.info("Calculating consumo total kWh for period: %s", periodo)
     where_clause = self._get_time_filter(periodo)
     query = f"""
       SELECT 
@@ -68,7 +68,7 @@ class DataAccessRepository:
     """
     Identifica o momento exato da maior potência registrada em cada fase.
     """
-    logger.info(f"Calculating picos de demanda for period: {periodo}")
+    logger.info("Calculating picos de demanda for period: %s", periodo)
     where_clause = self._get_time_filter(periodo)
     query = f"""
       SELECT 
@@ -99,7 +99,7 @@ class DataAccessRepository:
     Calcula Fator de Potência Médio e Voltagem Média.
     FP = P / Sqrt(P² + Q²)
     """
-    logger.info(f"Calculating saúde elétrica for period: {periodo}")
+    logger.info("Calculating saúde elétrica for period: %s", periodo)
     where_clause = self._get_time_filter(periodo)
     query = f"""
       SELECT 
@@ -127,7 +127,7 @@ class DataAccessRepository:
     Agrega o consumo médio por hora do dia (00:00 a 23:00).
     Útil para identificar desperdício noturno ou picos de almoço.
     """
-    logger.info(f"Calculating perfil horário for period: {periodo}")
+    logger.info("Calculating perfil horário for period: %s", periodo)
     where_clause = self._get_time_filter(periodo)
     query = f"""
       SELECT 
@@ -153,7 +153,7 @@ class DataAccessRepository:
     """
     Verifica se as fases estão carregadas de forma desigual (Ampere).
     """
-    logger.info(f"Calculating desbalanceamento for period: {periodo}")
+    logger.info("Calculating desbalanceamento for period: %s", periodo)
     where_clause = self._get_time_filter(periodo)
     query = f"""
       SELECT 
@@ -185,7 +185,7 @@ class DataAccessRepository:
     Retorna lista de eventos onde a voltagem saiu da zona segura.
     Também calcula a % de desvio.
     """
-    logger.info(f"Calculating anomalias de voltagem for period: {periodo}")
+    logger.info("Calculating anomalias de voltagem for period: %s", periodo)
     where_clause = self._get_time_filter(periodo)
     query = f"""
       SELECT 
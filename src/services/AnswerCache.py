@@ -0,0 +1,280 @@
+import contextlib
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any
+
+from src.core import fixtures, metrics
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Períodos que terminam no passado: a resposta só muda quando a janela vira
+CLOSED_PERIODS = {"ontem", "semana_passada", "mes_passado"}
+
+
+class Dependency:
+  """Dado do qual uma resposta dependeu, declarado pela ferramenta que o leu."""
+
+  def __init__(self, source: str, cacheable: bool = True, **params: Any):
+    self.source = source
+    self.cacheable = cacheable
+    self.params = params
+    self.window: str | None = None
+    self.version = 0
+
+
+class _Entry:
+  def __init__(
+    self,
+    question: str,
+    vector: Counter,
+    answer: list[dict[str, str]],
+    dependencies: list[Dependency],
+  ):
+    self.question = question
+    self.vector = vector
+    self.answer = answer
+    self.dependencies = dependencies
+    self.created_at = time.time()
+
+
+# Escopo (chat_id ou "global") -> pergunta normalizada -> entrada
+_entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+# Versão de cada fonte não temporal (ex.: planilha de manutenção)
+_source_versions: dict[str, int] = {}
+_source_fingerprints: dict[str, str] = {}
+_lock = threading.Lock()
+
+_dependencies: ContextVar[list[Dependency] | None] = ContextVar(
+  "answer_dependencies", default=None
+)
+
+
+def normalize(question: str) -> str:
+  """Minúsculas, sem acentos, pontuação ou espaços repetidos."""
+  text = unicodedata.normalize("NFKD", question.lower())
+  text = "".join(c for c in text if not unicodedata.combining(c))
+  return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+def _vectorize(normalized: str) -> Counter:
+  """Trigramas de caracteres, comparados por cosseno."""
+  padded = f" {normalized} "
+  return Counter(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+  dot = sum(count * b[gram] for gram, count in a.items() if gram in b)
+  if not dot:
+    return 0.0
+  norm_a = math.sqrt(sum(v * v for v in a.values()))
+  norm_b = math.sqrt(sum(v * v for v in b.values()))
+  return dot / (norm_a * norm_b)
+
+
+def _window(period: str, now: datetime) -> str:
+  """Identificador da janela de dados de um período no instante atual."""
+  if period == "semana_passada":
+    year, week, _ = now.isocalendar()
+    return f"{year}-W{week}"
+  if period == "mes_passado":
+    return now.strftime("%Y-%m")
+  return now.date().isoformat()
+
+
+def _scope(chat_id: int) -> str:
+  return "global" if settings.answer_cache.SCOPE == "global" else str(chat_id)
+
+
+def depends_on(source: str, cacheable: bool = True, **params: Any) -> None:
+  """
+  Registra que a resposta em construção depende de uma fonte de dados. Deve
+  ser chamada pelas ferramentas; cacheable=False impede o cache da resposta
+  (ex.: buscas na web, escritas na planilha).
+  """
+  dependencies = _dependencies.get()
+  if dependencies is None:
+    return
+  dependency = Dependency(source, cacheable, **params)
+  if "period" in params:
+    dependency.window = _window(params["period"], fixtures.now())
+  with _lock:
+    dependency.version = _source_versions.get(source, 0)
+  dependencies.append(dependency)
+
+
+def invalidate_source(source: str) -> None:
+  """Invalida as respostas que dependem de uma fonte (ex.: após uma escrita)."""
+  with _lock:
+    _source_versions[source] = _source_versions.get(source, 0) + 1
+  logger.debug("Answer cache source %s invalidated", source)
+
+
+def observe_source(source: str, fingerprint: str) -> None:
+  """
+  Informa a impressão digital atual de uma fonte lida. Se mudou desde a última
+  leitura (ex.: planilha editada fora do bot), as respostas dela são invalidadas.
+  """
+  with _lock:
+    previous = _source_fingerprints.get(source)
+    _source_fingerprints[source] = fingerprint
+  if previous is not None and previous != fingerprint:
+    invalidate_source(source)
+
+
+@contextlib.contextmanager
+def collect():
+  """Coleta as dependências declaradas pelas ferramentas durante o grafo."""
+  dependencies: list[Dependency] = []
+  token = _dependencies.set(dependencies)
+  try:
+    yield dependencies
+  finally:
+    _dependencies.reset(token)
+
+
+def _is_fresh(entry: _Entry, now: float) -> bool:
+  age = now - entry.created_at
+  if age > settings.answer_cache.TTL_SECONDS:
+    return False
+  # Mesmo relógio dos períodos consultados, que pode estar congelado nas fixtures
+  current = fixtures.now()
+  for dependency in entry.dependencies:
+    period = dependency.params.get("period")
+    if period is not None:
+      if dependency.window != _window(period, current):
+        return False
+      if period in CLOSED_PERIODS:
+        continue
+    elif _source_versions.get(dependency.source, 0) != dependency.version:
+      return False
+    # Períodos que incluem o agora e fontes editáveis mudam continuamente
+    if age > settings.answer_cache.LIVE_TTL_SECONDS:
+      return False
+  return True
+
+
+def _details(normalized: str) -> tuple[set[str], set[str], list[str]]:
+  """Ações e períodos do DataAccess citados na pergunta, e os números dela."""
+  # Import local: o intent_router importa este módulo
+  from src.graphs.response_generation.nodes.intent_router import (
+    ACTION_PATTERNS,
+    PERIOD_PATTERNS,
+  )
+
+  actions = {a for a, pattern in ACTION_PATTERNS.items() if re.search(pattern, normalized)}
+  periods = {p for p, pattern in PERIOD_PATTERNS.items() if re.search(pattern, normalized)}
+  return actions, periods, re.findall(r"\d+", normalized)
+
+
+def _same_request(details: tuple[set[str], set[str], list[str]], key: str, entry: _Entry) -> bool:
+  """
+  Uma pergunta apenas parecida só reaproveita a resposta se pede as mesmas
+  ações e períodos dos quais ela dependeu e cita os mesmos números (ex.: "fase
+  1" e "fase 2" ficam muito próximas por trigramas).
+  """
+  from src.graphs.response_generation.nodes.intent_router import ACTION_PATTERNS
+
+  actions, periods, numbers = details
+  if numbers != re.findall(r"\d+", key):
+    return False
+  entry_periods = {d.params["period"] for d in entry.dependencies if "period" in d.params}
+  entry_actions = {
+    d.params["action"]
+    for d in entry.dependencies
+    if d.params.get("action") in ACTION_PATTERNS
+  }
+  return periods == entry_periods and actions == entry_actions
+
+
+def lookup(chat_id: int, question: str) -> list[dict[str, str]] | None:
+  """
+  Procura uma resposta válida para a pergunta, por igualdade após normalização
+  ou por similaridade acima de SIMILARITY_THRESHOLD com as mesmas ações,
+  períodos e números.
+  """
+  if not settings.answer_cache.ENABLED:
+    return None
+  normalized = normalize(question)
+  scope = _scope(chat_id)
+  now = time.time()
+  best: tuple[float, tuple[str, str]] | None = None
+  fuzzy = len(normalized.split()) >= settings.answer_cache.MIN_WORDS
+  details = _details(normalized) if fuzzy else None
+  with _lock:
+    entry = _entries.get((scope, normalized))
+    if entry is not None:
+      best = (1.0, (scope, normalized))
+    elif details is not None:
+      vector = _vectorize(normalized)
+      for key, candidate in _entries.items():
+        if key[0] != scope:
+          continue
+        score = _cosine(vector, candidate.vector)
+        if (
+          score >= settings.answer_cache.SIMILARITY_THRESHOLD
+          and (best is None or score > best[0])
+          and _same_request(details, key[1], candidate)
+        ):
+          best = (score, key)
+    if best is not None:
+      entry = _entries[best[1]]
+      if _is_fresh(entry, now):
+        _entries.move_to_end(best[1])
+      else:
+        del _entries[best[1]]
+        entry = None
+  metrics.cache_requests.inc(cache="answer", result="hit" if entry else "miss")
+  if entry is None:
+    return None
+  logger.info(
+    "Answer cache hit (similarity %.2f) for question: %s", best[0], entry.question
+  )
+  return entry.answer
+
+
+def store(
+  chat_id: int,
+  question: str,
+  answer: list[dict[str, str]],
+  dependencies: list[Dependency],
+) -> None:
+  """
+  Guarda a resposta se ela dependeu apenas de fontes cacheáveis. Respostas sem
+  nenhuma dependência (conversa, saudações) não são guardadas, pois costumam
+  depender do contexto da conversa.
+  """
+  if not settings.answer_cache.ENABLED or not answer or not dependencies:
+    return
+  if not all(d.cacheable for d in dependencies):
+    return
+  normalized = normalize(question)
+  if len(normalized.split()) < settings.answer_cache.MIN_WORDS:
+    return
+  key = (_scope(chat_id), normalized)
+  entry = _Entry(question, _vectorize(normalized), answer, dependencies)
+  with _lock:
+    _entries[key] = entry
+    _entries.move_to_end(key)
+    while len(_entries) > settings.answer_cache.MAX_ENTRIES:
+      _entries.popitem(last=False)
+  logger.debug(
+    "Answer cached for question %s with dependencies %s",
+    normalized,
+    [(d.source, d.params) for d in dependencies],
+  )
+
+
+def forget_chat(chat_id: int) -> None:
+  """Remove as respostas do escopo de um chat (ex.: ao resetar a memória)."""
+  scope = str(chat_id)
+  with _lock:
+    for key in [k for k in _entries if k[0] == scope]:
+      del _entries[key]
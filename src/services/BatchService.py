@@ -0,0 +1,226 @@
+"""
+Executa um conjunto de perguntas pelo grafo de resposta, com concorrência
+limitada, para avaliações offline (ex.: suíte de regressão).
+
+Cada linha da entrada é um JSON com "chat_id" e "input"; campos extras (ex.:
+"id", "expected") são repetidos no resultado. Mensagens do mesmo chat rodam em
+ordem, uma de cada vez, e chats diferentes rodam em paralelo. Cada resultado
+traz a resposta, latência, tokens, ferramentas e nós executados, e sai assim
+que fica pronto (não na ordem da entrada).
+
+Uso (no processo, sem subir a API):
+  uv run python -m src.services.BatchService perguntas.jsonl -o resultados.jsonl
+  uv run python -m src.services.BatchService perguntas.jsonl --concurrency 8 --reset
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from collections.abc import AsyncIterator, Iterable
+from typing import Any
+
+from langgraph.graph.state import CompiledStateGraph
+from src.core import tracing
+from src.core.config import settings
+from src.graphs.memories.BaseCheckpointer import BaseCheckpointer
+from src.graphs.response_generation.schemas.MainState import (
+  InputState,
+  MainState,
+  OutputState,
+)
+from src.services import GraphService, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def parse_items(lines: Iterable[str]) -> list[dict[str, Any]]:
+  """Lê as linhas JSONL, ignorando linhas vazias. Levanta ValueError."""
+  items = []
+  for number, line in enumerate(lines, start=1):
+    if not line.strip():
+      continue
+    try:
+      item = json.loads(line)
+    except json.JSONDecodeError as e:
+      raise ValueError(f"Line {number}: invalid JSON ({e.msg})") from None
+    if not isinstance(item, dict) or "chat_id" not in item or "input" not in item:
+      raise ValueError(f"Line {number}: expected an object with chat_id and input")
+    try:
+      int(item["chat_id"])
+    except (TypeError, ValueError):
+      raise ValueError(f"Line {number}: chat_id must be an integer") from None
+    items.append(item)
+  if len(items) > settings.batch.MAX_ITEMS:
+    raise ValueError(f"Batch has {len(items)} items, limit is {settings.batch.MAX_ITEMS}")
+  return items
+
+
+def _describe(trace: tracing.Trace | None) -> dict[str, Any]:
+  if trace is None:
+    return {}
+  return {
+    "tokens": trace.tokens(),
+    "llm_calls": len(trace.llm_leaves()),
+    "tools": [s.attributes.get("tool") for s in trace.spans if s.kind == "tool"],
+    "nodes": [s.name for s in trace.spans if s.kind == "node"],
+    "cache_hit": any(
+      s.attributes.get("cache_hit") for s in trace.spans if s.name == "answer_cache.lookup"
+    ),
+  }
+
+
+async def _run_item(
+  graph: CompiledStateGraph[MainState, None, InputState, OutputState],
+  index: int,
+  item: dict[str, Any],
+) -> dict[str, Any]:
+  chat_id = int(item["chat_id"])
+  started_at = time.perf_counter()
+  result: dict[str, Any] = {**item, "index": index, "error": None}
+  async with tracing.trace(chat_id, index, name="batch_item") as current_trace:
+    try:
+      output = await GraphService.invoke_response_generation_graph(
+        graph,
+        chat_id,
+        index,
+        "",
+        item.get("user_name", "Avaliação"),
+        str(item["input"]),
+        admission_timeout=settings.batch.ADMISSION_TIMEOUT_SECONDS,
+      )
+    except RateLimiter.Overloaded as e:
+      output = []
+      result["error"] = f"overloaded: {e}"
+  if output == [GraphService.ERROR_REPLY]:
+    result["error"] = "graph_error"
+  result["output"] = output
+  result["latency_ms"] = round((time.perf_counter() - started_at) * 1000, 1)
+  result.update(_describe(current_trace))
+  return result
+
+
+async def run_batch(
+  graph: CompiledStateGraph[MainState, None, InputState, OutputState],
+  items: list[dict[str, Any]],
+  concurrency: int | None = None,
+  checkpointer: BaseCheckpointer | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+  """
+  Roda os itens e devolve os resultados conforme terminam, seguidos de um
+  {"summary": ...}. Com checkpointer, a memória de cada chat é apagada antes
+  da primeira mensagem dele, para que execuções repetidas sejam comparáveis.
+  """
+  concurrency = min(
+    concurrency or settings.batch.CONCURRENCY, settings.batch.MAX_CONCURRENCY
+  )
+  semaphore = asyncio.Semaphore(concurrency)
+  results: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+  by_chat: dict[int, list[tuple[int, dict[str, Any]]]] = {}
+  for index, item in enumerate(items):
+    by_chat.setdefault(int(item["chat_id"]), []).append((index, item))
+
+  async def run_chat(chat_id: int, chat_items: list[tuple[int, dict[str, Any]]]):
+    if checkpointer is not None:
+      try:
+        await GraphService.reset_conversation_memory(checkpointer, chat_id)
+      except Exception as e:
+        # Sem o reset a execução não seria comparável; cada item vira um erro
+        logger.error("Batch reset of chat %s failed: %s", chat_id, e, exc_info=True)
+        for index, item in chat_items:
+          await results.put(
+            {**item, "index": index, "error": f"reset failed: {type(e).__name__}: {e}"}
+          )
+        return
+    for index, item in chat_items:
+      async with semaphore:
+        try:
+          result = await _run_item(graph, index, item)
+        except Exception as e:
+          logger.error("Batch item %s failed: %s", index, e, exc_info=True)
+          result = {**item, "index": index, "error": f"{type(e).__name__}: {e}"}
+      await results.put(result)
+
+  started_at = time.perf_counter()
+  logger.info(
+    "Running batch of %s items in %s chats with concurrency %s",
+    len(items),
+    len(by_chat),
+    concurrency,
+  )
+  tasks = [asyncio.create_task(run_chat(c, i)) for c, i in by_chat.items()]
+  latencies: list[float] = []
+  errors = 0
+  try:
+    for _ in range(len(items)):
+      result = await results.get()
+      if result.get("error"):
+        errors += 1
+      elif "latency_ms" in result:
+        latencies.append(result["latency_ms"])
+      yield result
+  finally:
+    for task in tasks:
+      task.cancel()
+
+  yield {
+    "summary": {
+      "items": len(items),
+      "errors": errors,
+      "concurrency": concurrency,
+      "wall_seconds": round(time.perf_counter() - started_at, 2),
+      "latency_ms_avg": round(statistics.fmean(latencies), 1) if latencies else None,
+      "latency_ms_p50": round(statistics.median(latencies), 1) if latencies else None,
+      "latency_ms_p95": (
+        round(sorted(latencies)[int(len(latencies) * 0.95)], 1) if latencies else None
+      ),
+    }
+  }
+
+
+async def _main(args: argparse.Namespace) -> None:
+  from src.graphs.builder import get_response_generation_workflow
+  from src.graphs.memories.checkpointer import get_base_checkpointer
+
+  with open(args.input, encoding="utf-8") as f:
+    items = parse_items(f)
+
+  base_checkpointer = get_base_checkpointer()
+  await base_checkpointer.open()
+  output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+  try:
+    graph = get_response_generation_workflow(await base_checkpointer.get_checkpointer())
+    async for result in run_batch(
+      graph,
+      items,
+      args.concurrency,
+      base_checkpointer if args.reset else None,
+    ):
+      output.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+      output.flush()
+      if "summary" in result and output is not sys.stdout:
+        print(json.dumps(result["summary"], ensure_ascii=False))
+  finally:
+    if output is not sys.stdout:
+      output.close()
+    await base_checkpointer.close()
+
+
+def main() -> None:
+  parser = argparse.ArgumentParser(
+    description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+  )
+  parser.add_argument("input", help="Arquivo JSONL com chat_id e input por linha")
+  parser.add_argument("-o", "--output", help="Arquivo JSONL de resultados (padrão: stdout)")
+  parser.add_argument("--concurrency", type=int, default=None)
+  parser.add_argument(
+    "--reset", action="store_true", help="Apaga a memória de cada chat antes de começar"
+  )
+  asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+  main()
@@ -1,22 +1,63 @@
 import logging
+from typing import Any
 
-from googleapiclient.discovery import build
-from google.oauth2.service_account import Credentials
-
+from src.core import fixtures
 from src.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
 
+
+class FixtureSheetsService:
+    """
+    Imita o objeto de serviço do Sheets guardando a cadeia de chamadas (ex.:
+    spreadsheets().values().get(range=...)) até o execute(), que passa pelas
+    fixtures. No replay não há serviço real por trás.
+    """
+
+    def __init__(self, service: Any = None, calls: tuple = ()):
+        self._service = service
+        self._calls = calls
+
+    def __getattr__(self, name: str):
+        def call(*args: Any, **kwargs: Any) -> "FixtureSheetsService":
+            return FixtureSheetsService(self._service, (*self._calls, (name, args, kwargs)))
+
+        return call
+
+    def execute(self) -> Any:
+        def request() -> Any:
+            target = self._service
+            for name, args, kwargs in self._calls:
+                target = getattr(target, name)(*args, **kwargs)
+            return target.execute()
+
+        # O ID da planilha fica fora da chave, como a URL base da API de medições
+        described = [
+            [name, list(args), {k: v for k, v in kwargs.items() if k != "spreadsheetId"}]
+            for name, args, kwargs in self._calls
+        ]
+        return fixtures.through("sheets", described, request)
+
+
 def get_sheets_service():
     """Cria e retorna o objeto de serviço para a API do Google Sheets usando uma Conta de Serviço."""
+    if fixtures.mode() == "replay":
+        return FixtureSheetsService()
+
+    # googleapiclient é pesado, então só é importado quando a planilha é usada
+    from googleapiclient.discovery import build
+    from google.oauth2.service_account import Credentials
+
     try:
         creds = Credentials.from_service_account_file(
             settings.google_sheets.SERVICE_ACCOUNT_KEY_PATH, scopes=SCOPES)
         
         service = build('sheets', 'v4', credentials=creds)
+        if fixtures.mode() == "record":
+            return FixtureSheetsService(service)
         return service
     except Exception as e:
-        logger.error(f"Error authenticating Google Service Account: {e}")
+        logger.error("Error authenticating Google Service Account: %s", e)
         return None
@@ -1,4 +1,5 @@
 import logging
+import time
 from langgraph.graph.state import CompiledStateGraph
 from src.graphs.response_generation.schemas.MainState import (
   InputState,
@@ -6,10 +7,16 @@ from src.graphs.response_generation.schemas.MainState import (
   MainState,
 )
 from src.graphs.memories.BaseCheckpointer import BaseCheckpointer
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
+from src.core import metrics, tracing
+from src.core.config import settings
+from src.services import AnswerCache, RateLimiter
 
 logger = logging.getLogger(__name__)
 
+ERROR_REPLY = {"output": "Ops! Tive um problema, gostaria que eu tentasse novamente?"}
+
 
 def _build_config(chat_id: int | None) -> RunnableConfig:
   return {
@@ -36,6 +43,34 @@ def validate_input(chat_input: str) -> None:
   return
 
 
+async def _record_cached_answer(
+  graph: CompiledStateGraph[MainState, None, InputState, OutputState],
+  config: RunnableConfig,
+  user_input: str,
+  answer: list[dict[str, str]],
+) -> None:
+  """
+  Registra na memória da conversa a pergunta respondida pelo cache, para que
+  as próximas mensagens tenham o mesmo contexto que teriam sem ele.
+  """
+  snapshot = await graph.aget_state(config)
+  history = list(snapshot.values.get("messages_history") or [])
+  history.append(HumanMessage(content=user_input))
+  await graph.aupdate_state(
+    config,
+    {
+      "messages": [
+        HumanMessage(content=user_input),
+        AIMessage(
+          content="\n\n".join(p["output"] for p in answer if p.get("output"))
+        ),
+      ],
+      "messages_history": history[-settings.bot.MAX_HISTORY :],
+    },
+    as_node="formatter",
+  )
+
+
 async def invoke_response_generation_graph(
   graph: CompiledStateGraph[MainState, None, InputState, OutputState],
   chat_id: int,
@@ -43,11 +78,15 @@ async def invoke_response_generation_graph(
   phone_number: str,
   user_name: str,
   user_input: str,
+  admission_timeout: float | None = None,
 ) -> list[dict[str, str]]:
   """
   Invoca o grafo LangGraph com a entrada do usuário e retorna a resposta.
+  Levanta RateLimiter.Overloaded se não houver vaga para executar o grafo em
+  admission_timeout segundos (padrão: RATE_LIMIT__ADMISSION_TIMEOUT_SECONDS).
   """
-  logger.info(f"Invoking LangGraph with user input: {user_input}")
+  logger.debug("Invoking LangGraph with user input: %s", user_input)
+  started_at = time.perf_counter()
   try:
     validate_input(user_input)
     state: InputState = {
@@ -57,26 +96,47 @@ async def invoke_response_generation_graph(
       "phone_number": phone_number,
       "user_name": user_name
     }
-    result = await graph.ainvoke(state, config=_build_config(chat_id))
+    async with tracing.trace(chat_id, message_id) as current_trace:
+      config = _build_config(chat_id)
+      with tracing.span("answer_cache.lookup") as lookup_span:
+        cached = AnswerCache.lookup(chat_id, user_input)
+        if lookup_span is not None:
+          lookup_span.attributes["cache_hit"] = cached is not None
+      if cached is not None:
+        await _record_cached_answer(graph, config, user_input, cached)
+        result = {"formatted_output": cached}
+      else:
+        if current_trace is not None:
+          config["callbacks"] = [tracing.TracingCallbackHandler(current_trace)]
+        async with RateLimiter.admission(
+          settings.rate_limit.ADMISSION_TIMEOUT_SECONDS
+          if admission_timeout is None
+          else admission_timeout
+        ):
+          with AnswerCache.collect() as dependencies:
+            # "exit" grava só o estado final; "async" grava cada passo em background.
+            # Nos dois casos o ainvoke espera a última gravação antes de retornar
+            result = await graph.ainvoke(
+              state,
+              config=config,
+              durability=settings.memory.DURABILITY,
+            )
+        AnswerCache.store(
+          chat_id, user_input, result.get("formatted_output", []), dependencies
+        )
+    metrics.graph_runs.inc(status="ok")
+  except RateLimiter.Overloaded:
+    metrics.graph_runs.inc(status="rejected")
+    raise
   except Exception as e:
-    logger.error(f"Error invoking LangGraph: {e}", exc_info=True)
-    result = {
-      "formatted_output": [
-        {
-          "output": "Ops! Tive um problema, gostaria que eu tentasse novamente?"
-        }
-      ]
-    }
-  logger.info(f"LangGraph response: {result}")
+    logger.error("Error invoking LangGraph: %s", e, exc_info=True)
+    metrics.graph_runs.inc(status="error")
+    result = {"formatted_output": [ERROR_REPLY]}
+  metrics.graph_latency.observe(time.perf_counter() - started_at)
+  logger.debug("LangGraph response: %s", result)
   formatted_output = result.get("formatted_output", [])
-  agent_reply = (
-    formatted_output
-    if len(formatted_output) > 0
-    else [
-      {"output": "Ops! Tive um problema, gostaria que eu tentasse novamente?"}
-    ]
-  )
-  logger.info(f"Agent reply: {agent_reply}")
+  agent_reply = formatted_output if len(formatted_output) > 0 else [ERROR_REPLY]
+  logger.debug("Agent reply: %s", agent_reply)
   return agent_reply
 
 
@@ -86,5 +146,6 @@ async def reset_conversation_memory(
   """
   Deleta todas as chaves associadas a um chat ID no checkpointer.
   """
-  logger.info(f"Resetting conversation memory for chat ID: {chat_id}")
+  logger.info("Resetting conversation memory for chat ID: %s", chat_id)
   await checkpointer.reset_thread(chat_id)
+  AnswerCache.forget_chat(chat_id)
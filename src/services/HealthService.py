@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+import httpx
+from src.core import readings_database
+from src.core.config import settings
+from src.core.prompt import PromptHandler
+from src.graphs.memories.BaseCheckpointer import BaseCheckpointer
+
+logger = logging.getLogger(__name__)
+
+# Último resultado do readiness e o instante (monotônico) em que foi medido
+_cached: tuple[float, dict] | None = None
+# Garante que requisições simultâneas compartilhem uma única rodada de probes
+_lock = asyncio.Lock()
+
+
+async def _probe_measurement_api() -> None:
+  url = (
+    settings.readings_database.MEASUREMENT_API_URL.rstrip("/")
+    + settings.health.MEASUREMENT_API_HEALTH_PATH
+  )
+  async with httpx.AsyncClient(
+    timeout=settings.health.PROBE_TIMEOUT_SECONDS
+  ) as client:
+    response = await client.get(url)
+  if response.status_code >= 500:
+    raise RuntimeError(f"status {response.status_code}")
+
+
+async def _probe_prompts() -> None:
+  names = {
+    settings.main_llm.PROMPT_NAME,
+    settings.formatter_llm.PROMPT_NAME,
+    settings.audio_model.PROMPT_NAME,
+    settings.omni_model.PROMPT_NAME,
+    settings.bot.SUMMARY_PROMPT_NAME,
+  }
+  handler = PromptHandler()
+  missing = sorted(name for name in names if not handler.has_prompt(name))
+  if missing:
+    raise RuntimeError(f"missing prompts: {missing}")
+
+
+async def _run_probe(name: str, probe: Callable[[], Awaitable[None]]) -> dict:
+  start = time.perf_counter()
+  try:
+    await asyncio.wait_for(probe(), settings.health.PROBE_TIMEOUT_SECONDS)
+    status = {"ok": True}
+  except asyncio.TimeoutError:
+    status = {"ok": False, "error": "timeout"}
+  except Exception as e:
+    status = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+  status["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+  status["required"] = name in settings.health.REQUIRED_PROBES
+  if not status["ok"]:
+    logger.warning("Readiness probe %s failed: %s", name, status['error'])
+  return status
+
+
+async def check_readiness(checkpointer: BaseCheckpointer) -> dict:
+  """
+  Executa as probes de dependências em paralelo, com timeout individual, e
+  reaproveita o resultado por CACHE_TTL_SECONDS para que health checks
+  frequentes não gerem carga nas dependências.
+  """
+  global _cached
+  async with _lock:
+    now = time.monotonic()
+    if _cached and now - _cached[0] < settings.health.CACHE_TTL_SECONDS:
+      return _cached[1]
+
+    probes = {
+      "checkpointer": checkpointer.ping,
+      "readings_database": readings_database.ping,
+      "measurement_api": _probe_measurement_api,
+      "prompts": _probe_prompts,
+    }
+    results = await asyncio.gather(
+      *(_run_probe(name, probe) for name, probe in probes.items())
+    )
+    checks = dict(zip(probes, results))
+    report = {
+      "ready": all(c["ok"] for c in checks.values() if c["required"]),
+      "degraded": not all(c["ok"] for c in checks.values()),
+      "checks": checks,
+    }
+    _cached = (time.monotonic(), report)
+    return report
@@ -1,94 +1,113 @@
+import asyncio
+import hashlib
 import logging
 import base64
 import io
-from telegram import Message, Bot
+from telegram import Message
 from src.graphs.llm.model import create_groq_client
+from src.core import fixtures
 from src.core.config import settings
 from src.graphs.response_generation.schemas.MainState import InputState
 from src.core.prompt import PromptHandler
+from src.services.TelegramBot import get_bot
 
 logger = logging.getLogger(__name__)
-bot = Bot(token=settings.bot.TELEGRAM_TOKEN.get_secret_value())
 
 
 async def download_file(file_id: str) -> bytearray:
   try:
-    file = await bot.get_file(file_id)
+    file = await get_bot().get_file(file_id)
     data = await file.download_as_bytearray()
     return data
   except Exception as e:
-    logger.error(f"Error downloading file {file_id}: {e}")
+    logger.error("Error downloading file %s: %s", file_id, e)
     return bytearray()
 
 def transcribe_audio(audio: bytearray) -> str:
   try:
-    logger.info(f"Transcribing audio of size: {len(audio)} bytes")
-    
-    client = create_groq_client(settings.audio_model.API_KEY)
-    audio_file = io.BytesIO(audio)
-    audio_file.name = "audio.ogg"
-    
-    transcription = client.audio.transcriptions.create(
-      file=audio_file,
-      model=settings.audio_model.MODEL,
-      prompt=PromptHandler().get_prompt(
-        settings.audio_model.PROMPT_NAME
-      ),
-      response_format="verbose_json",
-      language="pt",
-      temperature=settings.audio_model.TEMPERATURE,
+    logger.info("Transcribing audio of size: %s bytes", len(audio))
+
+    def request() -> str:
+      client = create_groq_client(settings.audio_model.API_KEY)
+      audio_file = io.BytesIO(audio)
+      audio_file.name = "audio.ogg"
+
+      transcription = client.audio.transcriptions.create(
+        file=audio_file,
+        model=settings.audio_model.MODEL,
+        prompt=PromptHandler().get_prompt(
+          settings.audio_model.PROMPT_NAME
+        ),
+        response_format="verbose_json",
+        language="pt",
+        temperature=settings.audio_model.TEMPERATURE,
+      )
+      if not transcription or not transcription.text:
+        raise ValueError("Transcription response is empty or malformed.")
+      return transcription.text
+
+    text = fixtures.through(
+      "transcription",
+      {"model": settings.audio_model.MODEL, "audio_sha256": hashlib.sha256(audio).hexdigest()},
+      request,
     )
-    if not transcription or not transcription.text:
-      raise ValueError("Transcription response is empty or malformed.")
-    return "Transcrição de Áudio: " + transcription.text
+    return "Transcrição de Áudio: " + text
   except Exception as e:
-    logger.error(f"Error transcribing audio: {e}")
+    logger.error("Error transcribing audio: %s", e)
     return "Transcrição de Áudio: Não foi possível transcrever o áudio recebido. Ele pode ser vazio, estar corrompido ou mesmo protegido por senha."
 
 
 def interpret_image(image: bytearray) -> str:
   try:
-    logger.info(f"Interpreting image of size: {len(image)} bytes")
-    logger.info(f"Encoding image to base64")
-    
-    base64_image = base64.b64encode(image).decode('utf-8')
-    
-    logger.info(f"Image encoded to base64, length: {len(base64_image)} characters")
+    logger.info("Interpreting image of size: %s bytes", len(image))
+    logger.info("Encoding image to base64")
     
-    client = create_groq_client(settings.audio_model.API_KEY)
-    completion = client.chat.completions.create(
-      model=settings.omni_model.MODEL,
-      messages=[
-        {
-          "role": "user",
-          "content": [
-            {
-              "type": "text",
-              "text": PromptHandler().get_prompt(
-                settings.omni_model.PROMPT_NAME
-              ),
-            },
-            {
-              "type": "image_url",
-              "image_url": {
-                "url": f"data:image/jpeg;base64,{base64_image}",
+    def request() -> str:
+      base64_image = base64.b64encode(image).decode('utf-8')
+
+      logger.info("Image encoded to base64, length: %s characters", len(base64_image))
+
+      client = create_groq_client(settings.audio_model.API_KEY)
+      completion = client.chat.completions.create(
+        model=settings.omni_model.MODEL,
+        messages=[
+          {
+            "role": "user",
+            "content": [
+              {
+                "type": "text",
+                "text": PromptHandler().get_prompt(
+                  settings.omni_model.PROMPT_NAME
+                ),
               },
-            },
-          ]
-        }
-      ],
-      temperature=settings.omni_model.TEMPERATURE,
-      max_completion_tokens=settings.omni_model.MAX_COMPLETION_TOKENS,
-      top_p=settings.omni_model.TOP_P,
-      stream=False,
-      stop=None,
-    )
+              {
+                "type": "image_url",
+                "image_url": {
+                  "url": f"data:image/jpeg;base64,{base64_image}",
+                },
+              },
+            ]
+          }
+        ],
+        temperature=settings.omni_model.TEMPERATURE,
+        max_completion_tokens=settings.omni_model.MAX_COMPLETION_TOKENS,
+        top_p=settings.omni_model.TOP_P,
+        stream=False,
+        stop=None,
+      )
+
+      if not completion or not completion.choices or not completion.choices[0].message or not completion.choices[0].message.content:
+        raise ValueError("Completion response is empty or malformed.")
+      return completion.choices[0].message.content
 
-    if not completion or not completion.choices or not completion.choices[0].message or not completion.choices[0].message.content:
-      raise ValueError("Completion response is empty or malformed.")
-    return "Descrição de Imagem: " + completion.choices[0].message.content
+    content = fixtures.through(
+      "vision",
+      {"model": settings.omni_model.MODEL, "image_sha256": hashlib.sha256(image).hexdigest()},
+      request,
+    )
+    return "Descrição de Imagem: " + content
   except Exception as e:
-    logger.error(f"Error interpreting image: {e}")
+    logger.error("Error interpreting image: %s", e)
     return "Descrição de Imagem: Não foi possível interpretar a imagem recebida. Ela pode ser vazia, estar corrompida ou mesmo protegida por senha."
 
 
@@ -100,13 +119,13 @@ async def process_input(message: Message) -> InputState:
     chat_input = message.text
   elif message.audio:
     audio = await download_file(message.audio.file_id)
-    chat_input = transcribe_audio(audio)
+    chat_input = await asyncio.to_thread(transcribe_audio, audio)
   elif message.voice:
     voice = await download_file(message.voice.file_id)
-    chat_input = transcribe_audio(voice)
+    chat_input = await asyncio.to_thread(transcribe_audio, voice)
   elif message.photo:
     photo = await download_file(message.photo[-1].file_id)
-    chat_input = interpret_image(photo)
+    chat_input = await asyncio.to_thread(interpret_image, photo)
   else:
     chat_input = "O usuário enviou um tipo de mensagem não suportado. Informe que apenas mensagens de texto, áudio e fotos são aceitas."
     
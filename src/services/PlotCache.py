@@ -0,0 +1,83 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+
+from src.core import metrics
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Imagens renderizadas, indexadas pela impressão digital dos dados
+_renders: OrderedDict[str, bytes] = OrderedDict()
+# Caminho de arquivo gerado -> impressão digital que o originou
+_path_keys: OrderedDict[str, str] = OrderedDict()
+# Impressão digital -> file_id retornado pelo Telegram no primeiro upload
+_file_ids: dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def fingerprint(
+  plot_type: str, periodo: str, data: list[dict], style_version: int
+) -> str:
+  """
+  Gera a chave do cache a partir do tipo de gráfico, período, linhas de dados
+  e versão de estilo.
+  """
+  payload = json.dumps(
+    [plot_type, periodo, style_version, data],
+    sort_keys=True,
+    default=str,
+    separators=(",", ":"),
+  )
+  return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_render(key: str) -> bytes | None:
+  """Retorna os bytes de uma imagem já renderizada, se existir."""
+  with _lock:
+    image = _renders.get(key)
+    if image is not None:
+      _renders.move_to_end(key)
+  metrics.cache_requests.inc(cache="plot_render", result="hit" if image else "miss")
+  return image
+
+
+def store_render(key: str, image: bytes) -> None:
+  """Armazena uma imagem renderizada, descartando as menos usadas."""
+  with _lock:
+    _renders[key] = image
+    _renders.move_to_end(key)
+    while len(_renders) > settings.plotter.CACHE_MAX_ENTRIES:
+      evicted, _ = _renders.popitem(last=False)
+      _file_ids.pop(evicted, None)
+      logger.debug("Evicted plot render %s from cache", evicted)
+
+
+def register_path(path: str, key: str) -> None:
+  """Associa um arquivo gerado à impressão digital da imagem."""
+  with _lock:
+    _path_keys[path] = key
+    _path_keys.move_to_end(path)
+    while len(_path_keys) > settings.plotter.CACHE_MAX_ENTRIES * 8:
+      _path_keys.popitem(last=False)
+
+
+def get_file_id(path: str) -> str | None:
+  """Retorna o file_id do Telegram de uma imagem já enviada anteriormente."""
+  with _lock:
+    key = _path_keys.get(path)
+    file_id = _file_ids.get(key) if key else None
+  metrics.cache_requests.inc(
+    cache="telegram_file_id", result="hit" if file_id else "miss"
+  )
+  return file_id
+
+
+def store_file_id(path: str, file_id: str) -> None:
+  """Guarda o file_id do Telegram para reaproveitar em envios repetidos."""
+  with _lock:
+    key = _path_keys.get(path)
+    if key and key in _renders:
+      _file_ids[key] = file_id
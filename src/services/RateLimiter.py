@@ -0,0 +1,189 @@
+import asyncio
+import contextlib
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from src.core import metrics
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimited(Exception):
+  """A chave excedeu seu token bucket; retry_after em segundos."""
+
+  def __init__(self, scope: str, retry_after: float):
+    super().__init__(f"Rate limit exceeded for {scope}")
+    self.scope = scope
+    self.retry_after = retry_after
+
+
+class Overloaded(Exception):
+  """Não há vaga para executar o grafo dentro do tempo de admissão."""
+
+
+class InMemoryBuckets:
+  """Token buckets no processo, limitados às MAX_TRACKED_KEYS chaves mais recentes."""
+
+  def __init__(self):
+    # chave -> (tokens, instante da última atualização)
+    self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+    self.lock = threading.Lock()
+
+  async def take(self, key: str, capacity: float, rate: float) -> float:
+    now = time.monotonic()
+    with self.lock:
+      tokens, updated_at = self.buckets.get(key, (capacity, now))
+      tokens = min(capacity, tokens + (now - updated_at) * rate)
+      retry_after = 0.0
+      if tokens >= 1:
+        tokens -= 1
+      else:
+        retry_after = (1 - tokens) / rate
+      self.buckets[key] = (tokens, now)
+      self.buckets.move_to_end(key)
+      while len(self.buckets) > settings.rate_limit.MAX_TRACKED_KEYS:
+        self.buckets.popitem(last=False)
+    return retry_after
+
+
+# Token bucket atômico no Redis: devolve 0 se liberou ou os segundos de espera
+_REDIS_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+else
+  retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisBuckets:
+  """
+  Token buckets compartilhados entre réplicas. Se o Redis falhar, libera a
+  requisição: o limite é proteção de custo, não deve derrubar o bot.
+  """
+
+  def __init__(self, client: Any = None):
+    if client is None:
+      try:
+        from redis.asyncio import Redis
+      except ImportError as e:
+        raise ImportError(
+          "The redis rate limit backend requires the 'redis' extra: uv pip install '.[redis]'"
+        ) from e
+      url = settings.rate_limit.REDIS_URL or settings.memory.URL
+      client = Redis.from_url(url.get_secret_value())
+    self.client = client
+    self.script = client.register_script(_REDIS_SCRIPT)
+
+  async def take(self, key: str, capacity: float, rate: float) -> float:
+    try:
+      retry_after = await self.script(
+        keys=[f"{settings.rate_limit.KEY_PREFIX}:{key}"],
+        args=[capacity, rate, time.time()],
+      )
+    except Exception as e:
+      logger.warning("Rate limit backend unavailable, allowing request: %s", e)
+      return 0.0
+    return float(retry_after)
+
+
+_backend: InMemoryBuckets | RedisBuckets | None = None
+_semaphore: asyncio.Semaphore | None = None
+# Execuções em andamento mais as que aguardam vaga
+_admitted = 0
+
+
+def _get_backend() -> InMemoryBuckets | RedisBuckets:
+  global _backend
+  if _backend is None:
+    _backend = (
+      RedisBuckets() if settings.rate_limit.BACKEND == "redis" else InMemoryBuckets()
+    )
+  return _backend
+
+
+def api_key_id(api_key: str | None) -> str:
+  """Identificador da API key para os buckets, sem guardar o segredo."""
+  return hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+
+
+async def check(scope: str, key: Any) -> None:
+  """
+  Consome um token do bucket de (scope, key). scope é "chat" ou "api_key",
+  cada um com capacidade e reposição próprias. Levanta RateLimited.
+  """
+  if not settings.rate_limit.ENABLED:
+    return
+  capacity, per_minute = {
+    "chat": (settings.rate_limit.CHAT_CAPACITY, settings.rate_limit.CHAT_REFILL_PER_MINUTE),
+    "api_key": (
+      settings.rate_limit.API_KEY_CAPACITY,
+      settings.rate_limit.API_KEY_REFILL_PER_MINUTE,
+    ),
+    "notice": (1, settings.rate_limit.NOTICES_PER_MINUTE),
+  }[scope]
+  retry_after = await _get_backend().take(f"{scope}:{key}", capacity, per_minute / 60)
+  if retry_after > 0:
+    metrics.rate_limited.inc(scope=scope)
+    raise RateLimited(scope, retry_after)
+
+
+async def should_notify(chat_id: Any) -> bool:
+  """Limita os avisos de limite enviados a um chat, para não virarem flood."""
+  try:
+    await check("notice", chat_id)
+  except RateLimited:
+    return False
+  return True
+
+
+@contextlib.asynccontextmanager
+async def admission(timeout: float):
+  """
+  Limita as execuções simultâneas do grafo a MAX_CONCURRENT_RUNS. Com a fila
+  cheia (MAX_PENDING_RUNS) ou sem vaga em timeout segundos, levanta Overloaded.
+  """
+  global _semaphore, _admitted
+  if not settings.rate_limit.ENABLED:
+    yield
+    return
+  if _semaphore is None:
+    _semaphore = asyncio.Semaphore(settings.rate_limit.MAX_CONCURRENT_RUNS)
+  limit = settings.rate_limit.MAX_CONCURRENT_RUNS + settings.rate_limit.MAX_PENDING_RUNS
+  if _admitted >= limit:
+    metrics.rate_limited.inc(scope="admission")
+    raise Overloaded("Too many pending graph runs")
+  _admitted += 1
+  try:
+    try:
+      if timeout <= 0 and _semaphore.locked():
+        # wait_for com timeout 0 falha mesmo com vaga livre
+        raise asyncio.TimeoutError
+      await asyncio.wait_for(_semaphore.acquire(), timeout if timeout > 0 else None)
+    except asyncio.TimeoutError:
+      metrics.rate_limited.inc(scope="admission")
+      raise Overloaded("Timed out waiting for a graph run slot") from None
+    metrics.graph_runs_in_flight.inc()
+    try:
+      yield
+    finally:
+      metrics.graph_runs_in_flight.dec()
+      _semaphore.release()
+  finally:
+    _admitted -= 1
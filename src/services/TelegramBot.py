@@ -0,0 +1,20 @@
+import functools
+import logging
+from telegram import Bot
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@functools.cache
+def get_bot() -> Bot:
+  """
+  Retorna o cliente do Bot do Telegram, criado apenas no primeiro uso para não
+  pesar na inicialização da aplicação.
+  """
+  logger.info("Creating Telegram Bot client")
+  return Bot(
+    token=settings.bot.TELEGRAM_TOKEN.get_secret_value(),
+    base_url=settings.bot.TELEGRAM_API_URL,
+    base_file_url=settings.bot.TELEGRAM_FILE_URL,
+  )
@@ -1,13 +1,50 @@
 import logging
-from telegram import Message, Bot
+from telegram import Message
+from src.core import tracing
 from src.graphs.response_generation.schemas.MainState import InputState, MainState, OutputState
-from src.services import GraphService, InputProcessor
 from src.core.config import settings
+from src.services import GraphService, InputProcessor, PlotCache, RateLimiter
+from src.services.TelegramBot import get_bot
 from langgraph.graph.state import CompiledStateGraph
 from src.graphs.memories.BaseCheckpointer import BaseCheckpointer
 
 logger = logging.getLogger(__name__)
-bot = Bot(token=settings.bot.TELEGRAM_TOKEN.get_secret_value())
+
+RATE_LIMITED_REPLY = (
+  "Você enviou muitas mensagens em pouco tempo. "
+  "Aguarde alguns segundos e tente novamente, por favor!"
+)
+OVERLOADED_REPLY = (
+  "Estou atendendo muitas pessoas agora. Pode tentar de novo em alguns instantes?"
+)
+
+
+async def _send_photo(chat_id: int, path: str) -> None:
+  """
+  Envia uma imagem, reaproveitando o file_id do Telegram quando a mesma
+  imagem já foi enviada antes, evitando um novo upload.
+  """
+  file_id = PlotCache.get_file_id(path)
+  if file_id:
+    logger.info("Reusing Telegram file_id for image %s", path)
+    with tracing.span("telegram.send_photo", "telegram", cached=True):
+      await get_bot().send_photo(chat_id=chat_id, photo=file_id)
+    return
+
+  with open(path, "rb") as photo, tracing.span(
+    "telegram.send_photo", "telegram", cached=False
+  ):
+    sent = await get_bot().send_photo(chat_id=chat_id, photo=photo)
+  if sent.photo:
+    PlotCache.store_file_id(path, sent.photo[-1].file_id)
+
+
+async def send_notice(chat_id: int, text: str) -> None:
+  """Envia um aviso de limite, no máximo RATE_LIMIT__NOTICES_PER_MINUTE por chat."""
+  if not await RateLimiter.should_notify(chat_id):
+    return
+  with tracing.span("telegram.send_message", "telegram", notice=True):
+    await get_bot().send_message(chat_id=chat_id, text=text)
 
 
 async def generate_and_send_response(
@@ -18,39 +55,56 @@ async def generate_and_send_response(
   """
   Invokes the response generation graph and returns the replies.
   """
-  logger.info(f"Processing message from chat ID: {message.chat.id}")
-  processed_input = await InputProcessor.process_input(message)
-  
+  async with tracing.trace(message.chat.id, message.message_id):
+    await _generate_and_send_response(graph, checkpointer, message)
+
+
+async def _generate_and_send_response(
+  graph: CompiledStateGraph[MainState, None, InputState, OutputState],
+  checkpointer: BaseCheckpointer,
+  message: Message,
+) -> None:
+  logger.info("Processing message from chat ID: %s", message.chat.id)
+  with tracing.span("input_processing", "input"):
+    processed_input = await InputProcessor.process_input(message)
+
   if processed_input["chat_input"] == "!reset":
-    logger.info(f"Received reset request for chat ID: {message.chat.id}")
+    logger.info("Received reset request for chat ID: %s", message.chat.id)
     await GraphService.reset_conversation_memory(
       checkpointer, message.chat.id
     )
     replies = [{"output": "Conversa reiniciada!"}]
   else:
-    logger.info(f"Invoking response generation graph for chat ID: {message.chat.id}")
-    replies = await GraphService.invoke_response_generation_graph(
-      graph,
-      processed_input["chat_id"],
-      processed_input["message_id"],
-      processed_input["phone_number"],
-      processed_input["user_name"],
-      processed_input["chat_input"],
-    )
-  
+    logger.info("Invoking response generation graph for chat ID: %s", message.chat.id)
+    try:
+      replies = await GraphService.invoke_response_generation_graph(
+        graph,
+        processed_input["chat_id"],
+        processed_input["message_id"],
+        processed_input["phone_number"],
+        processed_input["user_name"],
+        processed_input["chat_input"],
+        admission_timeout=settings.rate_limit.TELEGRAM_ADMISSION_TIMEOUT_SECONDS,
+      )
+    except RateLimiter.Overloaded:
+      logger.warning("Rejected message from chat ID %s: server overloaded", message.chat.id)
+      await send_notice(message.chat.id, OVERLOADED_REPLY)
+      return
+
   for reply in replies:
     if reply.get("output"):
-      logger.info(f"Sending message to chat ID {processed_input['chat_id']}")
-      await bot.send_message(chat_id=processed_input["chat_id"], text=reply["output"])
+      logger.info("Sending message to chat ID %s", processed_input['chat_id'])
+      with tracing.span("telegram.send_message", "telegram"):
+        await get_bot().send_message(chat_id=processed_input["chat_id"], text=reply["output"])
     elif reply.get("filePath"):
       path = f"data/plots/{processed_input['message_id']}_{processed_input['message_id']}.png"
-      logger.info(f"Sending image with path {reply['filePath']} to chat ID {processed_input['chat_id']}")
+      logger.info("Sending image with path %s to chat ID %s", reply['filePath'], processed_input['chat_id'])
       try:
-        await bot.send_photo(chat_id=processed_input["chat_id"], photo=open(reply["filePath"], 'rb'))
+        await _send_photo(processed_input["chat_id"], reply["filePath"])
       except Exception:
-        logger.error(f"Failed to send image with path {reply['filePath']} to chat ID {processed_input['chat_id']}")
-        logger.info(f"Trying again with message ID based path {path}")
-        await bot.send_photo(chat_id=processed_input["chat_id"], photo=open(path, 'rb'))
-      
-  
+        logger.error("Failed to send image with path %s to chat ID %s", reply['filePath'], processed_input['chat_id'])
+        logger.info("Trying again with message ID based path %s", path)
+        await _send_photo(processed_input["chat_id"], path)
+    
+
   return
\ No newline at end of file
@@ -0,0 +1,287 @@
+import logging
+import uuid
+import os
+from datetime import datetime
+from matplotlib.figure import Figure
+from matplotlib import colormaps
+import matplotlib.dates as mdates
+import matplotlib.colors as mcolors
+
+# Configuração de Logger
+logger = logging.getLogger(__name__)
+
+# Backend leve: desenha direto com a API de Figure do matplotlib (Agg), sem
+# pandas, seaborn ou pyplot, reproduzindo o visual "whitegrid" do seaborn.
+GRID_COLOR = "#e5e5e5"
+PHASE_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
+
+# Garante que o diretório existe
+os.makedirs("data/plots", exist_ok=True)
+
+def _new_figure():
+    """Cria uma figura com eixos no estilo whitegrid."""
+    fig = Figure(figsize=(10, 6))
+    ax = fig.add_subplot()
+    ax.set_axisbelow(True)
+    ax.grid(True, color=GRID_COLOR)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    ax.title.set_fontsize(14)
+    ax.xaxis.label.set_fontsize(12)
+    ax.yaxis.label.set_fontsize(12)
+    return fig, ax
+
+def _save_plot(fig, image_name):
+    """Função auxiliar para salvar a figura."""
+    plot_path = f"data/plots/{image_name}.png"
+    fig.savefig(plot_path, bbox_inches='tight', dpi=100)
+    return plot_path
+
+def _title(periodo):
+    return periodo.replace("_", " ").title()
+
+def _palette(name, n):
+    """Cores igualmente espaçadas de um colormap, como o seaborn faz."""
+    cmap = colormaps[name]
+    return [cmap((i + 0.5) / n) for i in range(n)]
+
+def _as_float(value):
+    return float("nan") if value is None else value
+
+def plot_consumo_total_kwh(data: list[dict], periodo: str, image_name: str) -> str:
+    """
+    Gera um gráfico de barras comparando o consumo acumulado (kWh) entre as fases.
+    """
+    try:
+        logger.info("Plotting consumo total para %s...", periodo)
+
+        if not data:
+            return "Sem dados para gerar o gráfico."
+
+        fig, ax = _new_figure()
+        fases = [d['fase'] for d in data]
+        valores = [d['total_kwh'] for d in data]
+
+        bars = ax.bar(fases, valores, color=_palette('viridis', len(data)))
+
+        ax.set_title(f'Consumo Total de Energia por Fase ({_title(periodo)})')
+        ax.set_ylabel('Energia Acumulada (kWh)')
+        ax.set_xlabel('Fase')
+        ax.bar_label(bars, fmt='%.1f', padding=3)
+
+        return _save_plot(fig, image_name)
+
+    except Exception as e:
+        logger.error("Error in plot_consumo_total_kwh: %s", e)
+        return "Erro ao gerar gráfico."
+
+
+def plot_picos_demanda(data: list[dict], periodo: str, image_name: str) -> str:
+    """
+    Gera um gráfico de dispersão mostrando QUANDO e QUANTO foi o pico de cada fase.
+    """
+    try:
+        logger.info("Plotting picos de demanda para %s...", periodo)
+
+        if not data:
+            return "Sem dados para gerar o gráfico."
+
+        fig, ax = _new_figure()
+
+        # Tamanho das bolinhas proporcional ao pico, entre 100 e 400
+        picos = [d['pico_kw'] for d in data]
+        low, high = min(picos), max(picos)
+        span = (high - low) or 1
+
+        for i, d in enumerate(data):
+            ax.scatter(
+                datetime.fromisoformat(d['momento']),
+                d['pico_kw'],
+                s=100 + 300 * (d['pico_kw'] - low) / span,
+                color=PHASE_COLORS[i % len(PHASE_COLORS)],
+                alpha=0.7,
+                label=d['fase'],
+            )
+
+        ax.set_title(f'Momentos de Pico de Demanda Máxima ({_title(periodo)})')
+        ax.set_xlabel('Horário da Ocorrência')
+        ax.set_ylabel('Potência (kW)')
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M\n%d/%m'))
+        ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left')
+
+        return _save_plot(fig, image_name)
+
+    except Exception as e:
+        logger.error("Error in plot_picos_demanda: %s", e)
+        return "Erro ao gerar gráfico."
+
+
+def plot_saude_eletrica(data: list[dict], periodo: str, image_name: str) -> str:
+    """
+    Gera um gráfico de barras do Fator de Potência com linha de corte e cor gradiente.
+    """
+    try:
+        logger.info("Plotting saude eletrica para %s...", periodo)
+
+        if not data:
+            return "Sem dados para gerar o gráfico."
+
+        fig, ax = _new_figure()
+
+        fases = [d['fase'] for d in data]
+        fps = [d['fator_potencia_medio'] for d in data]
+        norm = mcolors.Normalize(vmin=0.8, vmax=1.0)
+        cmap = colormaps['RdYlGn']
+
+        ax.bar(fases, fps, color=[cmap(norm(val)) for val in fps])
+
+        ax.set_title(f'Eficiência Energética (Fator de Potência) - {_title(periodo)}')
+        ax.set_ylim(0.5, 1.1)
+        ax.set_ylabel('Fator de Potência Médio')
+        ax.axhline(y=0.92, color='red', linestyle='--', linewidth=2, label='Limite Multa (0.92)')
+        ax.text(
+            x=len(data)-0.6, y=0.93, s="Limite Multa (0.92)",
+            color="red", fontsize=10, fontweight='bold'
+        )
+
+        return _save_plot(fig, image_name)
+
+    except Exception as e:
+        logger.error("Error in plot_saude_eletrica: %s", e)
+        return "Erro ao gerar gráfico."
+
+
+def plot_perfil_horario(data: list[dict], periodo: str, image_name: str) -> str:
+    """
+    Gera um gráfico de linhas multivariado (00-23h).
+    """
+    try:
+        logger.info("Plotting perfil horario para %s...", periodo)
+
+        if not data:
+            return "Sem dados para gerar o gráfico."
+
+        cols_map = {
+            'media_kw_f1': 'Fase 1',
+            'media_kw_f2': 'Fase 2',
+            'media_kw_f3': 'Fase 3',
+            'media_geral_kw': 'Média Geral'
+        }
+
+        fig, ax = _new_figure()
+        horas = [d['hora'] for d in data]
+
+        for col, label in cols_map.items():
+            if col in data[0]:
+                style = '--' if col == 'media_geral_kw' else '-'
+                width = 2.5 if col == 'media_geral_kw' else 1.5
+                valores = [_as_float(d.get(col)) for d in data]
+                ax.plot(horas, valores, label=label, linestyle=style, linewidth=width)
+
+        ax.set_title(f'Perfil de Carga Horária Médio ({_title(periodo)})')
+        ax.set_xlabel('Hora do Dia')
+        ax.set_ylabel('Potência Média (kW)')
+        ax.set_xticks(range(0, 24))
+        ax.tick_params(axis='x', labelrotation=90)
+        ax.legend()
+
+        return _save_plot(fig, image_name)
+
+    except Exception as e:
+        logger.error("Error in plot_perfil_horario: %s", e)
+        return "Erro ao gerar gráfico."
+
+
+def plot_desbalanceamento(data: list[dict], periodo: str, image_name: str) -> str:
+    """
+    Gera um gráfico comparativo das correntes (Amperes).
+    """
+    try:
+        logger.info("Plotting desbalanceamento para %s...", periodo)
+
+        if not data:
+            return "Sem dados para gerar o gráfico."
+
+        row = data[0]
+        fases = ['Fase 1', 'Fase 2', 'Fase 3']
+        correntes = [row['avg_amp_f1'], row['avg_amp_f2'], row['avg_amp_f3']]
+
+        fig, ax = _new_figure()
+        bars = ax.bar(fases, correntes, color=PHASE_COLORS[:3])
+
+        ax.set_title(f'Desbalanceamento de Corrente ({_title(periodo)})')
+        ax.set_ylabel('Corrente Média (A)')
+        ax.bar_label(bars, fmt='%.1f', padding=3)
+
+        max_diff = row['diferenca_max_amperes']
+        max_val = max(correntes)
+
+        ax.annotate(
+            f"Diferença Máx: {max_diff}A",
+            xy=(1, max_val),
+            xytext=(1, max_val * 1.1),
+            ha='center',
+            color='red',
+            fontsize=12,
+            fontweight='bold',
+            arrowprops=dict(arrowstyle='-')
+        )
+        ax.set_ylim(top=max_val * 1.25)
+
+        return _save_plot(fig, image_name)
+
+    except Exception as e:
+        logger.error("Error in plot_desbalanceamento: %s", e)
+        return "Erro ao gerar gráfico."
+
+
+def plot_anomalias_voltagem(data: list[dict], periodo: str, image_name: str) -> str:
+    """
+    Gera um gráfico timeline mostrando eventos de sub/sobretensão.
+    """
+    try:
+        logger.info("Plotting anomalias voltagem para %s...", periodo)
+
+        if not data:
+            fig, ax = _new_figure()
+            ax.text(0.5, 0.5, "Nenhuma anomalia detectada no período!",
+                    ha='center', va='center', fontsize=14, color='green', transform=ax.transAxes)
+            ax.set_title(f"Registro de Anomalias ({_title(periodo)})")
+            ax.set_axis_off()
+
+            final_name = str(uuid.uuid4()) if not image_name else image_name
+            return _save_plot(fig, final_name)
+
+        fig, ax = _new_figure()
+        ax.axhspan(198, 242, color='green', alpha=0.1, label='Zona Segura (220V ±10%)')
+
+        # Cor pelo tipo da anomalia e marcador pelo sensor
+        palette = {'ALTA': 'red', 'BAIXA': 'orange'}
+        markers = ['o', 'X', 's', '^', 'D', 'P']
+        sensores = sorted({d['sensor'] for d in data})
+        groups: dict[tuple[str, str], tuple[list, list]] = {}
+        for d in data:
+            xs, ys = groups.setdefault((d['tipo'], d['sensor']), ([], []))
+            xs.append(datetime.fromisoformat(d['timestamp']))
+            ys.append(d['voltage'])
+
+        for (tipo, sensor), (xs, ys) in groups.items():
+            ax.scatter(
+                xs, ys,
+                s=100,
+                color=palette.get(tipo, 'gray'),
+                marker=markers[sensores.index(sensor) % len(markers)],
+                label=f"{tipo} - {sensor}",
+            )
+
+        ax.set_title(f'Eventos de Anomalia de Tensão ({_title(periodo)})')
+        ax.set_ylabel('Voltagem (V)')
+        ax.set_xlabel('Data/Hora')
+        ax.legend()
+        fig.autofmt_xdate()
+
+        return _save_plot(fig, image_name)
+
+    except Exception as e:
+        logger.error("Error in plot_anomalias_voltagem: %s", e)
+        return "Erro ao gerar gráfico."